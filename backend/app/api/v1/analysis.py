@@ -3,13 +3,13 @@
 from fastapi import APIRouter, HTTPException, Query, Depends
 from sqlalchemy.orm import Session
 from app.core.database import get_db
+from app.core import codec
 from app.core.cache import get_cache
 from app.engines.analyzer import StockAnalyzer
 from app.schemas.analysis import AnalysisReport, AIAnalysisReport
 from app.agents.orchestrator import OrchestratorAgent
 from app.services.llm_service import LLMService
 from app.core.llm_config import LLMSettings
-import json
 import logging
 
 logger = logging.getLogger(__name__)
@@ -78,7 +78,7 @@ async def get_analysis_report(
     """
     try:
         cache_key = f"analysis:report:{stock_code}"
-        cached = cache.get(cache_key)
+        cached = await cache.get(cache_key)
 
         if not cached:
             raise HTTPException(
@@ -86,7 +86,7 @@ async def get_analysis_report(
                 detail=f"Report not found for stock {stock_code}. Please generate a new report first."
             )
 
-        return AnalysisReport(**json.loads(cached))
+        return AnalysisReport(**codec.decode(cached))
     except HTTPException:
         raise
     except Exception as e:
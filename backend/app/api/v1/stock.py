@@ -3,6 +3,7 @@ from fastapi import APIRouter, HTTPException, Query
 from typing import List, Optional
 from app.schemas.stock import StockResponse, QuoteResponse, KLineItem
 from app.services.data_service import DataService
+from app.core import upstream
 
 router = APIRouter()
 data_service = DataService()
@@ -23,6 +24,13 @@ async def search_stocks(
     limit: int = Query(10, ge=1, le=50)
 ):
     """Search stocks by code or name"""
+    # Fast path: search the decoded snapshot directly (indexed, no API call)
+    view = await data_service.get_cached_snapshot_view()
+    if view:
+        hits = view.search(q, limit)
+        if hits:
+            return hits
+
     stocks = await data_service.fetch_stock_list()
     if not stocks:
         raise HTTPException(status_code=503, detail="Failed to fetch stock list")
@@ -37,11 +45,8 @@ async def search_stocks(
         return []
 
     # Try to enrich with cached snapshot (instant, no API call)
-    codes = {m['stock_code'] for m in matches}
-    snapshot = data_service.get_cached_snapshot()
-    if snapshot:
-        snapshot_map = {s.get("stock_code"): s for s in snapshot}
-        enriched = [snapshot_map[c] for c in codes if c in snapshot_map]
+    if view:
+        enriched = view.get_many(m['stock_code'] for m in matches)
         if enriched:
             return enriched
 
@@ -151,7 +156,7 @@ async def get_market_indices():
 
         results = []
         try:
-            df = ak.stock_zh_index_spot_em()
+            df = await upstream.call(ak.stock_zh_index_spot_em)
             for idx in indices:
                 row = df[df["代码"] == idx["code"]]
                 if row.empty:
@@ -4,6 +4,7 @@ from typing import List, Dict
 from sqlalchemy.orm import Session
 from app.schemas.strategy import (
     StrategyExecuteRequest, StockPickResult,
+    StrategyEstimateRequest, StrategyEstimateResponse,
     UserStrategyCreate, UserStrategyUpdate, UserStrategyResponse,
     StrategyExecutionResponse,
 )
@@ -30,6 +31,7 @@ from app.engines.strategy_parser import StrategyParser
 from app.services.llm_service import LLMService
 from app.core.llm_config import LLMSettings
 from app.core.cache import cache_manager
+from app.services.reference_data import reference_registry
 import logging
 
 logger = logging.getLogger(__name__)
@@ -65,7 +67,7 @@ async def execute_strategy(request: StrategyExecuteRequest):
 
         # Try to get from cache
         if not request.force_refresh:
-            cached_result = cache_manager.get(cache_key)
+            cached_result = await cache_manager.get(cache_key)
             if cached_result:
                 return cached_result
 
@@ -80,7 +82,9 @@ async def execute_strategy(request: StrategyExecuteRequest):
                     include=request.include_industries,
                     exclude=request.exclude_industries,
                 )
-            results = await filter_engine.apply_filter(request.conditions.conditions)
+            results = await filter_engine.apply_filter(
+                request.conditions.conditions, logic=request.conditions.logic
+            )
         elif request.strategy_type in STRATEGY_REGISTRY:
             strategy_info = STRATEGY_REGISTRY[request.strategy_type]
             strategy = strategy_info["cls"]()
@@ -119,7 +123,7 @@ async def execute_strategy(request: StrategyExecuteRequest):
         ]
 
         # Cache the result
-        cache_manager.set(cache_key, [r.dict() for r in response_data])
+        await cache_manager.set(cache_key, [r.dict() for r in response_data])
 
         return response_data
     except HTTPException:
@@ -130,6 +134,28 @@ async def execute_strategy(request: StrategyExecuteRequest):
         logger.error(f"Strategy execution failed: {e}", exc_info=True)
         raise HTTPException(status_code=500, detail=f"Strategy execution failed: {str(e)}")
 
+@router.post("/estimate", response_model=StrategyEstimateResponse)
+async def estimate_strategy(request: StrategyEstimateRequest):
+    """Match counts for custom conditions without running the screen (for live counts while editing)"""
+    try:
+        filter_engine = StockFilter()
+        if request.include_industries or request.exclude_industries:
+            filter_engine.risk_filter.set_industry_filter(
+                include=request.include_industries,
+                exclude=request.exclude_industries,
+            )
+        index = await filter_engine.match_index(request.apply_risk_filters)
+        if index is None:
+            raise HTTPException(status_code=503, detail="Market snapshot unavailable")
+        return index.estimate(request.conditions.conditions, request.conditions.logic)
+    except HTTPException:
+        raise
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        logger.error(f"Strategy estimate failed: {e}", exc_info=True)
+        raise HTTPException(status_code=500, detail=f"Strategy estimate failed: {str(e)}")
+
 @router.get("", response_model=List[Dict])
 async def list_strategies():
     """List all available strategies"""
@@ -148,11 +174,8 @@ async def list_strategies():
 async def list_industries():
     """获取申万行业分类列表（用于行业筛选下拉框）"""
     try:
-        import akshare as ak
-        df = ak.stock_board_industry_name_em()
-        if not df.empty and "板块名称" in df.columns:
-            return sorted(df["板块名称"].tolist())
-        return []
+        ref = await reference_registry.get()
+        return ref.industries()
     except Exception as e:
         logger.warning(f"Failed to fetch industry list: {e}")
         return []
@@ -1,70 +1,138 @@
 # backend/app/core/cache.py
+import asyncio
 import json
 import hashlib
-from typing import Optional, Dict, Any
-import redis
+import logging
+import weakref
+from typing import Optional, Dict, Any, List
+import redis.asyncio as aioredis
 from app.core.config import settings
+from app.core import codec
 
-redis_client = redis.from_url(settings.REDIS_URL, decode_responses=True)
+logger = logging.getLogger(__name__)
+
+# One pooled client per (event loop, response mode). redis.asyncio connections
+# are bound to the loop that opened them, and Celery tasks run each job in a
+# fresh ``asyncio.run`` loop, so clients cannot be shared across loops.
+_clients: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, Dict[bool, aioredis.Redis]]" = (
+    weakref.WeakKeyDictionary()
+)
+
+
+def get_async_redis(decode_responses: bool = False) -> aioredis.Redis:
+    """
+    Pooled asyncio Redis client for the running event loop.
+
+    Binary clients (the default) carry codec-encoded cache payloads; text
+    clients (``decode_responses=True``) serve counters, sessions and rate limits.
+    """
+    loop = asyncio.get_running_loop()
+    clients = _clients.setdefault(loop, {})
+    client = clients.get(decode_responses)
+    if client is None:
+        pool = aioredis.ConnectionPool.from_url(
+            settings.REDIS_URL,
+            max_connections=settings.REDIS_POOL_SIZE,
+            decode_responses=decode_responses,
+        )
+        client = aioredis.Redis(connection_pool=pool)
+        clients[decode_responses] = client
+    return client
+
+
+async def get_cache() -> aioredis.Redis:
+    """FastAPI dependency: binary client for encoded cache payloads"""
+    return get_async_redis()
+
+
+def get_redis() -> aioredis.Redis:
+    """Get text-mode asyncio Redis client (call from a running event loop)"""
+    return get_async_redis(decode_responses=True)
+
+
+async def cache_mget(keys: List[str], client: Optional[aioredis.Redis] = None) -> List[Any]:
+    """Decode many cache entries in one round trip; missing or undecodable keys yield None"""
+    if not keys:
+        return []
+    client = client or get_async_redis()
+    values = await client.mget(keys)
+    decoded = []
+    for key, raw in zip(keys, values):
+        try:
+            decoded.append(codec.decode(raw) if raw else None)
+        except Exception as e:
+            logger.debug(f"Cache decode failed for {key}: {e}")
+            decoded.append(None)
+    return decoded
+
+
+async def cache_mset(items: Dict[str, Any], ttl: int, client: Optional[aioredis.Redis] = None):
+    """Encode and write many cache entries with one pipelined round trip"""
+    if not items:
+        return
+    client = client or get_async_redis()
+    async with client.pipeline(transaction=False) as pipe:
+        for key, value in items.items():
+            pipe.setex(key, ttl, codec.encode(value))
+        await pipe.execute()
 
-def get_cache():
-    return redis_client
 
 class CacheManager:
     """Redis cache manager for strategy results"""
 
     def __init__(self):
-        self.redis = redis_client
         self.default_ttl = 1800  # 30 minutes
 
+    @property
+    def redis(self) -> aioredis.Redis:
+        return get_async_redis()
+
     def generate_cache_key(self, strategy_type: str, params: Dict[str, Any]) -> str:
         """Generate cache key from strategy type and parameters"""
         params_str = json.dumps(params, sort_keys=True)
         params_hash = hashlib.md5(params_str.encode()).hexdigest()
         return f"strategy:result:{strategy_type}:{params_hash}"
 
-    def get(self, key: str) -> Optional[Any]:
+    async def get(self, key: str) -> Optional[Any]:
         """Get value from cache"""
         try:
-            value = self.redis.get(key)
+            value = await self.redis.get(key)
             if value:
-                self.redis.incr("stats:cache:hits")
-                return json.loads(value)
+                await self.redis.incr("stats:cache:hits")
+                return codec.decode(value)
             else:
-                self.redis.incr("stats:cache:misses")
+                await self.redis.incr("stats:cache:misses")
                 return None
         except Exception as e:
             print(f"Cache get error: {e}")
             return None
 
-    def set(self, key: str, value: Any, ttl: Optional[int] = None) -> bool:
+    async def set(self, key: str, value: Any, ttl: Optional[int] = None) -> bool:
         """Set value in cache with TTL"""
         try:
             ttl = ttl or self.default_ttl
-            value_str = json.dumps(value)
-            self.redis.setex(key, ttl, value_str)
+            await self.redis.setex(key, ttl, codec.encode(value))
             return True
         except Exception as e:
             print(f"Cache set error: {e}")
             return False
 
-    def delete(self, key: str) -> bool:
+    async def delete(self, key: str) -> bool:
         """Delete key from cache"""
         try:
-            self.redis.delete(key)
+            await self.redis.delete(key)
             return True
         except Exception as e:
             print(f"Cache delete error: {e}")
             return False
 
-    def get_stats(self) -> Dict[str, int]:
+    async def get_stats(self) -> Dict[str, int]:
         """Get cache statistics"""
         try:
-            hits = self.redis.get("stats:cache:hits") or "0"
-            misses = self.redis.get("stats:cache:misses") or "0"
+            hits, misses = await self.redis.mget(["stats:cache:hits", "stats:cache:misses"])
 
-            hits_int = int(hits)
-            misses_int = int(misses)
+            hits_int = int(hits or 0)
+            misses_int = int(misses or 0)
             total = hits_int + misses_int
 
             hit_rate = (hits_int / total * 100) if total > 0 else 0
@@ -81,7 +149,3 @@ class CacheManager:
 
 # Global cache manager instance
 cache_manager = CacheManager()
-
-def get_redis():
-    """Get Redis client for async operations"""
-    return redis_client
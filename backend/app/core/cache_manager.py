@@ -1,19 +1,24 @@
 # backend/app/core/cache_manager.py
 
 from typing import Optional, Any
-import json
 from collections import OrderedDict
-from app.core.cache import redis_client
+from app.core import codec
+from app.core.cache import get_async_redis
 
 
 class MultiLevelCacheManager:
     """Multi-level cache manager with L1 (local memory) + L2 (Redis)"""
 
-    def __init__(self, redis_client, local_cache_size: int = 1000):
-        self.redis = redis_client
+    def __init__(self, redis_client=None, local_cache_size: int = 1000):
+        self._redis = redis_client
         self.local_cache: OrderedDict = OrderedDict()
         self.local_cache_size = local_cache_size
 
+    @property
+    def redis(self):
+        """Injected client, else the pooled client of the running event loop"""
+        return self._redis if self._redis is not None else get_async_redis()
+
     async def get(self, key: str) -> Optional[Any]:
         """Get cache (L1 local first, then L2 Redis)"""
         # L1: Local memory cache
@@ -23,9 +28,9 @@ class MultiLevelCacheManager:
             return self.local_cache[key]
 
         # L2: Redis cache
-        value = self.redis.get(key)
+        value = await self.redis.get(key)
         if value:
-            data = json.loads(value)
+            data = codec.decode(value)
             # Backfill local cache
             self._set_local(key, data)
             return data
@@ -41,7 +46,7 @@ class MultiLevelCacheManager:
     ):
         """Set cache (write to both local and Redis)"""
         # Write to Redis
-        self.redis.setex(key, ttl, json.dumps(value))
+        await self.redis.setex(key, ttl, codec.encode(value))
 
         # Write to local cache
         self._set_local(key, value)
@@ -61,7 +66,7 @@ class MultiLevelCacheManager:
             del self.local_cache[key]
 
         # Delete from Redis
-        self.redis.delete(key)
+        await self.redis.delete(key)
 
     async def clear_local(self):
         """Clear local cache only"""
@@ -77,7 +82,7 @@ class MultiLevelCacheManager:
 
 
 # Global multi-level cache manager instance
-multi_level_cache = MultiLevelCacheManager(redis_client)
+multi_level_cache = MultiLevelCacheManager()
 
 
 def get_multi_level_cache():
@@ -36,12 +36,21 @@ celery_app.conf.beat_schedule = {
     },
     'sync-all-stocks-daily': {
         'task': 'sync_all_stocks_data',
-        'schedule': crontab(hour=16, minute=0),  # Daily at 16:00
+        'schedule': crontab(hour=16, minute=0, day_of_week='mon-fri'),  # Weekdays at 16:00
     },
     'calculate-indicators-daily': {
         'task': 'calculate_all_indicators',
         'schedule': crontab(hour=16, minute=30),  # Daily at 16:30
     },
+    'build-technical-factors-daily': {
+        'task': 'build_technical_factors',
+        'schedule': crontab(hour=16, minute=15),  # Daily at 16:15, after the EOD bars
+    },
+    'refresh-technical-factors-intraday': {
+        'task': 'build_technical_factors',
+        'schedule': crontab(minute='*/5', hour='9-15'),  # Every 5 minutes during the session
+        'kwargs': {'live': True},
+    },
     'warmup-hot-stocks': {
         'task': 'warmup_hot_stocks',
         'schedule': crontab(minute='*/30'),  # Every 30 minutes
@@ -54,6 +63,14 @@ celery_app.conf.beat_schedule = {
         'task': 'sync_all_financial_data',
         'schedule': crontab(hour=2, minute=0),  # Daily at 02:00
     },
+    'refresh-reference-data-daily': {
+        'task': 'refresh_reference_data',
+        'schedule': crontab(hour=8, minute=30),  # Daily at 08:30, before the open
+    },
+    'refresh-northbound-holdings-daily': {
+        'task': 'refresh_northbound_holdings',
+        'schedule': crontab(hour=9, minute=0),  # Daily at 09:00, after the disclosure update
+    },
 }
 
 # Auto-discover tasks
@@ -0,0 +1,153 @@
+# backend/app/core/codec.py
+"""Compact encoding for cache payloads.
+
+Encoded values start with a 4-byte header::
+
+    MAGIC (2 bytes) | layout (1 byte) | compression (1 byte) | body
+
+``layout`` is ``J`` for plain JSON or ``C`` for the columnar form used for
+tabular payloads (lists of dicts sharing the same keys, e.g. the market
+snapshot or K-lines): key names are written once, constant columns (such as
+the snapshot timestamp) are stored as a single value, and the remaining
+columns as arrays. ``compression`` is ``-`` (none), ``z`` (zlib), ``s``
+(zstd) or ``4`` (lz4 frame); zstd/lz4 are used when importable.
+
+Values that do not start with MAGIC are treated as legacy JSON text, so
+entries written before the codec rollout are still readable.
+"""
+import json
+import zlib
+from typing import Any, Callable, Dict, Optional, Tuple
+
+try:
+    import zstandard as _zstd
+except ImportError:  # optional
+    _zstd = None
+
+try:
+    import lz4.frame as _lz4
+except ImportError:  # optional
+    _lz4 = None
+
+MAGIC = b"\x00\xc5"
+LAYOUT_JSON = b"J"
+LAYOUT_COLUMNAR = b"C"
+
+COMPRESS_NONE = b"-"
+COMPRESS_ZLIB = b"z"
+COMPRESS_ZSTD = b"s"
+COMPRESS_LZ4 = b"4"
+
+# Bodies smaller than this are stored uncompressed (header overhead dominates)
+COMPRESS_MIN_BYTES = 1024
+
+
+def _compressors() -> Dict[bytes, Tuple[Callable[[bytes], bytes], Callable[[bytes], bytes]]]:
+    codecs = {COMPRESS_ZLIB: (lambda b: zlib.compress(b, 6), zlib.decompress)}
+    if _zstd is not None:
+        codecs[COMPRESS_ZSTD] = (
+            _zstd.ZstdCompressor(level=3).compress,
+            lambda b: _zstd.ZstdDecompressor().decompress(b),
+        )
+    if _lz4 is not None:
+        codecs[COMPRESS_LZ4] = (_lz4.compress, _lz4.decompress)
+    return codecs
+
+
+_CODECS = _compressors()
+
+
+def default_compression() -> bytes:
+    """Best available compressor: zstd > lz4 > zlib"""
+    for tag in (COMPRESS_ZSTD, COMPRESS_LZ4, COMPRESS_ZLIB):
+        if tag in _CODECS:
+            return tag
+    return COMPRESS_NONE
+
+
+def _to_columnar(value: Any) -> Optional[Dict]:
+    """List of same-keyed dicts → {"n", "keys", "const", "cols"}; None if not tabular"""
+    if not isinstance(value, list) or len(value) < 2 or not isinstance(value[0], dict):
+        return None
+    keys = list(value[0])
+    key_tuple = tuple(keys)
+    for row in value:
+        if not isinstance(row, dict) or tuple(row) != key_tuple:
+            return None
+
+    const: Dict[str, Any] = {}
+    cols: Dict[str, list] = {}
+    for key in keys:
+        column = [row[key] for row in value]
+        first = column[0]
+        if all(v == first and type(v) is type(first) for v in column):
+            const[key] = first
+        else:
+            cols[key] = column
+    return {"n": len(value), "keys": keys, "const": const, "cols": cols}
+
+
+def _from_columnar(table: Dict) -> list:
+    n = table["n"]
+    const = table["const"]
+    cols = table["cols"]
+    keys = table["keys"]
+    columns = [cols[k] if k in cols else [const[k]] * n for k in keys]
+    return [dict(zip(keys, row)) for row in zip(*columns)]
+
+
+def _dumps(value: Any) -> bytes:
+    return json.dumps(value, default=str, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+
+
+def encode(value: Any, compression: Optional[bytes] = None) -> bytes:
+    """
+    Serialize a cache value.
+
+    Args:
+        value: JSON-compatible value (non-JSON types fall back to ``str``)
+        compression: Compression tag; defaults to the best available
+
+    Returns:
+        Header-prefixed bytes
+    """
+    table = _to_columnar(value)
+    if table is not None:
+        layout, body = LAYOUT_COLUMNAR, _dumps(table)
+    else:
+        layout, body = LAYOUT_JSON, _dumps(value)
+
+    tag = default_compression() if compression is None else compression
+    if tag != COMPRESS_NONE and len(body) >= COMPRESS_MIN_BYTES:
+        body = _CODECS[tag][0](body)
+    else:
+        tag = COMPRESS_NONE
+    return MAGIC + layout + tag + body
+
+
+def decode(raw: Any) -> Any:
+    """
+    Deserialize a cache value written by :func:`encode` or legacy ``json.dumps`` text.
+
+    Raises:
+        ValueError: Unknown header or a compressor that is not installed here
+    """
+    if raw is None:
+        return None
+    if isinstance(raw, str):
+        return json.loads(raw)
+    raw = bytes(raw)
+    if not raw.startswith(MAGIC):
+        return json.loads(raw)
+
+    layout, tag, body = raw[2:3], raw[3:4], raw[4:]
+    if tag != COMPRESS_NONE:
+        if tag not in _CODECS:
+            raise ValueError(f"Cache payload compressed with unavailable codec {tag!r}")
+        body = _CODECS[tag][1](body)
+    data = json.loads(body)
+    if layout == LAYOUT_COLUMNAR:
+        return _from_columnar(data)
+    if layout == LAYOUT_JSON:
+        return data
+    raise ValueError(f"Unknown cache payload layout {layout!r}")
@@ -15,11 +15,57 @@ class Settings(BaseSettings):
 
     SECRET_KEY: str
 
+    # asyncio Redis 连接池大小（每个事件循环）
+    REDIS_POOL_SIZE: int = 50
+
     # JWT 配置
     ALGORITHM: str = "HS256"
     ACCESS_TOKEN_EXPIRE_MINUTES: int = 30
     REFRESH_TOKEN_EXPIRE_DAYS: int = 7
 
+    # 本地 K 线存储（按股票/周期的 mmap 文件，增量更新）
+    KLINE_STORE_DIR: str = "data/kline"
+    KLINE_HISTORY_DAYS: int = 1000
+    # 复权因子表刷新周期（秒）；收盘日线发现除权时会提前失效
+    ADJUST_FACTOR_TTL: int = 7 * 86400
+
+    # 本地因子表存储（全市场每股一行，如财务因子表）
+    FACTOR_STORE_DIR: str = "data/factors"
+    # 交易时段内是否每 5 分钟用实时快照刷新技术因子表
+    TECHNICAL_FACTOR_INTRADAY: bool = True
+
+    # 批量拉取（K线/财务）时的最大并发上游请求数
+    DATA_BATCH_CONCURRENCY: int = 8
+
+    # 多数据源对冲请求：主源超过其延迟分位数（无样本时用默认值）仍未返回，则并行启动备用源
+    HEDGE_DELAY_QUANTILE: float = 0.9
+    HEDGE_MIN_DELAY: float = 0.5
+    HEDGE_MAX_DELAY: float = 15.0
+
+    # DataService 进程内兜底缓存（按序列化字节数计量）
+    MEMORY_CACHE_MAX_MB: int = 256
+    MEMORY_CACHE_TTL: int = 86400
+
+    # 阻塞任务线程/进程池大小（CPU_WORKERS=0 表示按 CPU 核数）
+    UPSTREAM_IO_WORKERS: int = 32
+    LOCAL_IO_WORKERS: int = 8
+    CPU_WORKERS: int = 0
+    CPU_EXECUTOR_KIND: str = "process"  # process | thread
+
+    # 负缓存：上游对某代码返回空/报错后的短期屏蔽，连续 N 次后登记为"已知无数据"
+    NEGATIVE_CACHE_TTL: int = 900
+    KNOWN_BAD_AFTER: int = 3
+    KNOWN_BAD_TTL: int = 7 * 86400
+
+    # 参考数据（行业成分、股票名称/板块/上市日期）进程内有效期，过期后后台从 Redis 重新加载
+    REFERENCE_DATA_TTL: int = 3600
+
+    # 行情快照来源：standalone 各进程自行拉取；consumer 只读行情网关发布的快照
+    MARKET_DATA_MODE: str = "standalone"  # standalone | consumer
+    # 行情网关轮询间隔（秒）：交易时段 / 非交易时段（须小于快照 Redis TTL 120s）
+    MARKET_GATEWAY_INTERVAL: float = 3.0
+    MARKET_GATEWAY_IDLE_INTERVAL: float = 60.0
+
     class Config:
         env_file = ".env"
         case_sensitive = True
@@ -82,6 +82,23 @@ class InfluxDBManager:
 
         self.write_api.write(bucket=self.bucket, record=points)
 
+    async def write_daily_bars(self, bars: List[Dict]):
+        """Write one daily bar per stock (``stock_code`` in each dict) in a single batch"""
+        points = [
+            Point("kline")
+            .tag("stock_code", bar["stock_code"])
+            .tag("period", "1d")
+            .field("open", bar["open"])
+            .field("high", bar["high"])
+            .field("low", bar["low"])
+            .field("close", bar["close"])
+            .field("volume", bar["volume"])
+            .field("amount", bar["amount"])
+            .time(bar["date"])
+            for bar in bars
+        ]
+        self.write_api.write(bucket=self.bucket, record=points)
+
     async def write_indicators(self, stock_code: str, indicators: Dict):
         """Write technical indicators to InfluxDB"""
         points = []
@@ -0,0 +1,132 @@
+# backend/app/core/executors.py
+"""Named, sized executors for blocking work.
+
+Keeping blocking work off the loop's default executor means a strategy scan
+cannot starve unrelated requests:
+
+- ``upstream`` — threads for blocking network calls (akshare), used by the
+  upstream governor;
+- ``local`` — threads for local disk I/O and short frame conversions that
+  are not worth pickling to another process;
+- ``cpu`` — a process pool (or threads, per ``CPU_EXECUTOR_KIND``) for
+  pandas-heavy indicator and analysis work. Functions and arguments sent
+  here must be picklable (module-level functions, plain data).
+
+Each executor admits at most ``max_workers`` jobs at a time from a given
+event loop; the rest wait in an asyncio queue, so queue depth and wait time
+are measured the same way for thread and process pools and exported as
+Prometheus metrics.
+"""
+import asyncio
+import logging
+import multiprocessing
+import os
+import time
+import weakref
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from functools import partial
+from typing import Any, Callable, Dict, Optional
+
+from app.core.config import settings
+from app.core.metrics import (
+    executor_active,
+    executor_queue_depth,
+    executor_run_seconds,
+    executor_wait_seconds,
+)
+
+logger = logging.getLogger(__name__)
+
+
+class NamedExecutor:
+    """Lazily created executor with bounded admission and queue metrics"""
+
+    def __init__(self, name: str, max_workers: int, kind: str = "thread"):
+        self.name = name
+        self.max_workers = max(1, max_workers)
+        self.kind = kind
+        self._executor: Optional[Executor] = None
+        self._slots: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, asyncio.Semaphore]" = (
+            weakref.WeakKeyDictionary()
+        )
+
+    @property
+    def executor(self) -> Executor:
+        if self._executor is None:
+            if self.kind == "process" and multiprocessing.current_process().daemon:
+                # Celery prefork children are daemonic and may not spawn processes
+                logger.info(f"Executor {self.name}: daemon process, using threads instead")
+                self.kind = "thread"
+            if self.kind == "process":
+                # spawn: forking a process that already runs threads can deadlock
+                self._executor = ProcessPoolExecutor(
+                    max_workers=self.max_workers, mp_context=multiprocessing.get_context("spawn")
+                )
+            else:
+                self._executor = ThreadPoolExecutor(
+                    max_workers=self.max_workers, thread_name_prefix=f"{self.name}-pool"
+                )
+        return self._executor
+
+    def _semaphore(self) -> asyncio.Semaphore:
+        loop = asyncio.get_running_loop()
+        sem = self._slots.get(loop)
+        if sem is None:
+            sem = self._slots[loop] = asyncio.Semaphore(self.max_workers)
+        return sem
+
+    async def run(self, func: Callable, *args: Any, **kwargs: Any) -> Any:
+        """Run ``func(*args, **kwargs)`` in this executor"""
+        sem = self._semaphore()
+        queued_at = time.monotonic()
+        depth = executor_queue_depth.labels(executor=self.name)
+        depth.inc()
+        try:
+            await sem.acquire()
+        finally:
+            depth.dec()
+
+        started = time.monotonic()
+        executor_wait_seconds.labels(executor=self.name).observe(started - queued_at)
+        active = executor_active.labels(executor=self.name)
+        active.inc()
+        try:
+            loop = asyncio.get_running_loop()
+            return await loop.run_in_executor(self.executor, partial(func, *args, **kwargs))
+        finally:
+            active.dec()
+            executor_run_seconds.labels(executor=self.name).observe(time.monotonic() - started)
+            sem.release()
+
+    def shutdown(self, wait: bool = False):
+        if self._executor is not None:
+            self._executor.shutdown(wait=wait, cancel_futures=True)
+            self._executor = None
+
+
+upstream_executor = NamedExecutor("upstream", settings.UPSTREAM_IO_WORKERS)
+local_executor = NamedExecutor("local", settings.LOCAL_IO_WORKERS)
+cpu_executor = NamedExecutor(
+    "cpu", settings.CPU_WORKERS or os.cpu_count() or 1, kind=settings.CPU_EXECUTOR_KIND
+)
+
+EXECUTORS: Dict[str, NamedExecutor] = {
+    e.name: e for e in (upstream_executor, local_executor, cpu_executor)
+}
+
+
+async def run_upstream(func: Callable, *args: Any, **kwargs: Any) -> Any:
+    return await upstream_executor.run(func, *args, **kwargs)
+
+
+async def run_local(func: Callable, *args: Any, **kwargs: Any) -> Any:
+    return await local_executor.run(func, *args, **kwargs)
+
+
+async def run_cpu(func: Callable, *args: Any, **kwargs: Any) -> Any:
+    return await cpu_executor.run(func, *args, **kwargs)
+
+
+def shutdown_all(wait: bool = False):
+    for executor in EXECUTORS.values():
+        executor.shutdown(wait=wait)
@@ -0,0 +1,115 @@
+# backend/app/core/hedging.py
+"""Hedged fetches across fallback data sources.
+
+Fetchers with more than one upstream source (e.g. THS then Sina financials)
+used to try them in sequence, so a slow primary added its full timeout to
+the fallback's latency. A :class:`HedgePolicy` starts the primary, and if it
+has not produced a usable result within the hedge delay — the primary's
+recent p90 latency by default — starts the next source alongside it. The
+first usable result wins and the other calls are cancelled (the upstream
+governor does not count cancellation against a family's health). A source
+that fails or returns nothing starts the next one immediately.
+
+Per-source latency, wins and fired hedges are exported as Prometheus metrics.
+"""
+import asyncio
+import logging
+from collections import deque
+from typing import Any, Awaitable, Callable, Deque, Dict, Optional, Sequence, Tuple
+
+from app.core.config import settings
+from app.core.metrics import hedge_fired, hedge_source_latency, hedge_wins
+
+logger = logging.getLogger(__name__)
+
+# (source name, zero-argument coroutine factory)
+Source = Tuple[str, Callable[[], Awaitable[Any]]]
+
+_MIN_SAMPLES = 20
+
+
+class HedgePolicy:
+    """Hedge delay and metrics for one multi-source fetcher"""
+
+    def __init__(
+        self,
+        name: str,
+        initial_delay: float,
+        quantile: Optional[float] = None,
+        window: int = 200,
+        valid: Callable[[Any], bool] = bool,
+    ):
+        self.name = name
+        self.initial_delay = initial_delay
+        self.quantile = quantile if quantile is not None else settings.HEDGE_DELAY_QUANTILE
+        self.valid = valid
+        self._samples: Deque[float] = deque(maxlen=window)  # primary latencies (usable results)
+
+    def delay(self) -> float:
+        """Seconds to wait for the primary before starting the next source"""
+        if len(self._samples) < _MIN_SAMPLES:
+            delay = self.initial_delay
+        else:
+            ordered = sorted(self._samples)
+            delay = ordered[min(len(ordered) - 1, int(self.quantile * len(ordered)))]
+        return min(max(delay, settings.HEDGE_MIN_DELAY), settings.HEDGE_MAX_DELAY)
+
+    def observe(self, source: str, latency: float, primary: bool):
+        hedge_source_latency.labels(policy=self.name, source=source).observe(latency)
+        if primary:
+            self._samples.append(latency)
+
+    async def run(self, sources: Sequence[Source]) -> Any:
+        """
+        Return the first usable result across ``sources`` (primary first).
+
+        When no source produces a usable result, returns the last unusable
+        one, or re-raises the last exception if every source raised.
+        """
+        pending: Dict[asyncio.Future, Tuple[str, bool, float]] = {}
+        started = 0
+        last_result: Any = None
+        last_error: Optional[BaseException] = None
+        loop = asyncio.get_running_loop()
+
+        def start_next(reason: str):
+            nonlocal started
+            if started > 0:
+                hedge_fired.labels(policy=self.name, reason=reason).inc()
+            name, factory = sources[started]
+            task = asyncio.ensure_future(factory())
+            pending[task] = (name, started == 0, loop.time())
+            started += 1
+
+        start_next("")
+        try:
+            while pending:
+                timeout = self.delay() if started < len(sources) else None
+                done, _ = await asyncio.wait(pending, timeout=timeout, return_when=asyncio.FIRST_COMPLETED)
+                if not done:
+                    start_next("slow")
+                    continue
+                for task in done:
+                    name, primary, began = pending.pop(task)
+                    try:
+                        result = task.result()
+                    except Exception as e:
+                        logger.warning(f"{self.name}: source {name} failed: {e}")
+                        last_error = e
+                    else:
+                        if self.valid(result):
+                            self.observe(name, loop.time() - began, primary)
+                            hedge_wins.labels(policy=self.name, source=name).inc()
+                            return result
+                        last_result = result
+                    if started < len(sources):
+                        start_next("failed")
+        finally:
+            for task, (_, primary, began) in pending.items():
+                task.cancel()
+                if primary:
+                    # Lower bound on the lost primary's latency; keeps the p90 from drifting down
+                    self._samples.append(loop.time() - began)
+        if last_result is None and last_error is not None:
+            raise last_error
+        return last_result
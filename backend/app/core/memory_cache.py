@@ -0,0 +1,182 @@
+# backend/app/core/memory_cache.py
+"""Bounded in-process cache used as the DataService memory fallback.
+
+Entries are accounted by their serialized size, expire after a TTL, and are
+evicted least-recently-used first when either the global byte budget or the
+quota of their namespace (the first two ``:``-separated key segments, e.g.
+``data:financial``) is exceeded. Hits, misses, evictions and the current size
+are exported through the Prometheus metrics in ``app.core.metrics``.
+"""
+import json
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Optional, Tuple
+
+from app.core.metrics import cache_evictions, cache_hits, cache_misses, cache_size
+
+
+def namespace_of(key: str) -> str:
+    return ":".join(key.split(":", 2)[:2])
+
+
+def estimate_size(data: Any) -> int:
+    """Serialized JSON length in bytes, used as a stable proxy for memory footprint"""
+    try:
+        return len(json.dumps(data, default=str, separators=(",", ":")))
+    except (TypeError, ValueError):
+        return 0
+
+
+class _Entry:
+    __slots__ = ("data", "ts", "expires_at", "size", "namespace")
+
+    def __init__(self, data: Any, ts: float, expires_at: float, size: int, namespace: str):
+        self.data = data
+        self.ts = ts
+        self.expires_at = expires_at
+        self.size = size
+        self.namespace = namespace
+
+
+class BoundedMemoryCache:
+    """Size-aware TTL + LRU cache with per-namespace byte quotas"""
+
+    def __init__(
+        self,
+        max_bytes: int,
+        default_ttl: float,
+        namespace_quotas: Optional[Dict[str, int]] = None,
+        cache_type: str = "memory",
+    ):
+        self.max_bytes = max_bytes
+        self.default_ttl = default_ttl
+        self.namespace_quotas = dict(namespace_quotas or {})
+        self.cache_type = cache_type
+        self._entries: "OrderedDict[str, _Entry]" = OrderedDict()
+        self._namespace_bytes: Dict[str, int] = {}
+        self._total_bytes = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def __contains__(self, key: str) -> bool:
+        return self.get_with_age(key, record=False)[0] is not None
+
+    @property
+    def total_bytes(self) -> int:
+        return self._total_bytes
+
+    # ------------------------------------------------------------------
+    # Reads
+    # ------------------------------------------------------------------
+    def get(self, key: str, max_age: Optional[float] = None) -> Any:
+        """Value for ``key`` if present, not expired and (optionally) younger than ``max_age``"""
+        data, age = self.get_with_age(key)
+        if data is None or (max_age is not None and age >= max_age):
+            return None
+        return data
+
+    def get_with_age(self, key: str, record: bool = True) -> Tuple[Any, float]:
+        """(value, age in seconds), or (None, 0.0) on a miss"""
+        now = time.time()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry.expires_at <= now:
+                self._remove(key, "expired")
+                self._publish_size()
+                entry = None
+            if entry is None:
+                if record:
+                    self.misses += 1
+                    cache_misses.labels(cache_type=self.cache_type).inc()
+                return None, 0.0
+            self._entries.move_to_end(key)
+            if record:
+                self.hits += 1
+                cache_hits.labels(cache_type=self.cache_type).inc()
+            return entry.data, now - entry.ts
+
+    # ------------------------------------------------------------------
+    # Writes
+    # ------------------------------------------------------------------
+    def set(self, key: str, data: Any, ttl: Optional[float] = None, size: Optional[int] = None):
+        """Insert/replace ``key``; values larger than their quota are not cached"""
+        size = estimate_size(data) if size is None else size
+        namespace = namespace_of(key)
+        quota = self.namespace_quotas.get(namespace, self.max_bytes)
+        now = time.time()
+        with self._lock:
+            if key in self._entries:
+                self._remove(key, None)
+            if size > min(quota, self.max_bytes):
+                return
+            self._entries[key] = _Entry(data, now, now + (ttl or self.default_ttl), size, namespace)
+            self._namespace_bytes[namespace] = self._namespace_bytes.get(namespace, 0) + size
+            self._total_bytes += size
+            self._evict(namespace, quota)
+            self._publish_size()
+
+    def delete(self, key: str):
+        with self._lock:
+            if key in self._entries:
+                self._remove(key, None)
+                self._publish_size()
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._namespace_bytes.clear()
+            self._total_bytes = 0
+            self._publish_size()
+
+    def purge_expired(self) -> int:
+        """Drop all expired entries; returns how many were removed"""
+        now = time.time()
+        with self._lock:
+            expired = [k for k, e in self._entries.items() if e.expires_at <= now]
+            for key in expired:
+                self._remove(key, "expired")
+            self._publish_size()
+        return len(expired)
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "entries": len(self._entries),
+                "bytes": self._total_bytes,
+                "max_bytes": self.max_bytes,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "namespaces": dict(self._namespace_bytes),
+            }
+
+    # ------------------------------------------------------------------
+    # Internals (caller holds the lock)
+    # ------------------------------------------------------------------
+    def _remove(self, key: str, reason: Optional[str]):
+        entry = self._entries.pop(key)
+        self._namespace_bytes[entry.namespace] -= entry.size
+        if not self._namespace_bytes[entry.namespace]:
+            del self._namespace_bytes[entry.namespace]
+        self._total_bytes -= entry.size
+        if reason:
+            self.evictions += 1
+            cache_evictions.labels(cache_type=self.cache_type, reason=reason).inc()
+
+    def _evict(self, namespace: str, quota: int):
+        if self._namespace_bytes.get(namespace, 0) > quota:
+            for key in [k for k, e in self._entries.items() if e.namespace == namespace]:
+                if self._namespace_bytes.get(namespace, 0) <= quota:
+                    break
+                self._remove(key, "quota")
+        while self._total_bytes > self.max_bytes and self._entries:
+            self._remove(next(iter(self._entries)), "capacity")
+
+    def _publish_size(self):
+        cache_size.labels(cache_type=self.cache_type).set(self._total_bytes)
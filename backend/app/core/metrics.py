@@ -37,6 +37,85 @@ cache_size = Gauge(
     ['cache_type']
 )
 
+cache_evictions = Counter(
+    'cache_evictions_total',
+    'Total cache evictions',
+    ['cache_type', 'reason']
+)
+
+# Upstream (akshare) governor metrics
+upstream_calls = Counter(
+    'upstream_calls_total',
+    'Total upstream data source calls',
+    ['family', 'outcome']
+)
+
+upstream_latency = Histogram(
+    'upstream_call_duration_seconds',
+    'Upstream data source call duration in seconds',
+    ['family'],
+    buckets=(0.1, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+)
+
+upstream_concurrency_limit = Gauge(
+    'upstream_concurrency_limit',
+    'Current adaptive concurrency limit per upstream family',
+    ['family']
+)
+
+upstream_circuit_open = Gauge(
+    'upstream_circuit_open',
+    'Whether the circuit breaker for an upstream family is open (1) or not (0)',
+    ['family']
+)
+
+# Hedged multi-source fetch metrics
+hedge_source_latency = Histogram(
+    'hedge_source_duration_seconds',
+    'Time for a source in a hedged fetch to return a usable result',
+    ['policy', 'source'],
+    buckets=(0.1, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+)
+
+hedge_wins = Counter(
+    'hedge_wins_total',
+    'Hedged fetches won by each source',
+    ['policy', 'source']
+)
+
+hedge_fired = Counter(
+    'hedge_fired_total',
+    'Hedged fetches that started a fallback source',
+    ['policy', 'reason']
+)
+
+# Executor pool metrics
+executor_queue_depth = Gauge(
+    'executor_queue_depth',
+    'Jobs waiting for a slot in a named executor',
+    ['executor']
+)
+
+executor_active = Gauge(
+    'executor_active_jobs',
+    'Jobs currently running in a named executor',
+    ['executor']
+)
+
+executor_wait_seconds = Histogram(
+    'executor_wait_seconds',
+    'Time jobs spent queued before a named executor started them',
+    ['executor'],
+    buckets=(0.001, 0.01, 0.05, 0.1, 0.5, 1.0, 5.0, 10.0, 30.0)
+)
+
+executor_run_seconds = Histogram(
+    'executor_run_seconds',
+    'Job run time in a named executor',
+    ['executor'],
+    buckets=(0.001, 0.01, 0.05, 0.1, 0.5, 1.0, 5.0, 10.0, 30.0)
+)
+
 # Database metrics
 db_query_duration = Histogram(
     'db_query_duration_seconds',
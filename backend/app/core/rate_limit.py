@@ -21,13 +21,13 @@ class RateLimiter:
         window_start = current - self.window
 
         # 使用 Redis Sorted Set 存储请求时间戳
-        pipe = redis.pipeline()
-        pipe.zremrangebyscore(key, 0, window_start)  # 删除过期记录
-        pipe.zadd(key, {str(current): current})  # 添加当前请求
-        pipe.zcount(key, window_start, current)  # 统计窗口内请求数
-        pipe.expire(key, self.window)  # 设置过期时间
+        async with redis.pipeline() as pipe:
+            pipe.zremrangebyscore(key, 0, window_start)  # 删除过期记录
+            pipe.zadd(key, {str(current): current})  # 添加当前请求
+            pipe.zcount(key, window_start, current)  # 统计窗口内请求数
+            pipe.expire(key, self.window)  # 设置过期时间
 
-        results = pipe.execute()
+            results = await pipe.execute()
         request_count = results[2]
 
         return request_count <= self.requests
@@ -66,14 +66,14 @@ async def store_session(user_id: int, token: str, expires_in: int = 1800):
         "created_at": datetime.utcnow().isoformat()
     }
 
-    redis.setex(session_key, expires_in, json.dumps(session_data))
+    await redis.setex(session_key, expires_in, json.dumps(session_data))
 
 async def get_session(user_id: int) -> dict:
     """从 Redis 获取会话"""
     redis = get_redis()
     session_key = f"user:session:{user_id}"
 
-    session_data = redis.get(session_key)
+    session_data = await redis.get(session_key)
     if session_data:
         return json.loads(session_data)
     return None
@@ -82,4 +82,4 @@ async def delete_session(user_id: int):
     """删除会话"""
     redis = get_redis()
     session_key = f"user:session:{user_id}"
-    redis.delete(session_key)
+    await redis.delete(session_key)
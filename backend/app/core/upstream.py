@@ -0,0 +1,430 @@
+# backend/app/core/upstream.py
+"""Central governor for upstream (akshare) calls.
+
+Every blocking akshare call goes through :func:`call`, which runs it in the
+``upstream`` executor behind four layers, per endpoint *family* (the site actually
+serving the request — Eastmoney, THS, Sina, ...):
+
+1. **Circuit breaker** — after consecutive transient failures the family is
+   opened for ``reset_timeout`` seconds and calls fail fast with
+   :class:`CircuitOpenError` (callers fall back to stale data). The open
+   state is mirrored to Redis so other processes fail fast as well; once the
+   timeout passes a single probe call decides whether to close it again.
+2. **Token bucket** — a Redis-side Lua script shared by every uvicorn and
+   Celery process caps the request rate to the family. Falls back to a
+   per-process bucket while Redis is unreachable.
+3. **Adaptive concurrency** — AIMD: the per-process in-flight limit grows by
+   ``1/limit`` on each fast success and halves on errors or slow calls.
+4. **Retry** — transient failures are retried with full-jitter backoff while
+   the family's retry budget allows.
+
+Only transient failures (network errors, timeouts, an open circuit) count
+against a family's health; an akshare error for a bad symbol does not.
+"""
+import asyncio
+import logging
+import time
+import weakref
+from typing import Any, Callable, Dict, Optional
+
+from app.core.executors import upstream_executor
+from app.core.metrics import (
+    upstream_calls,
+    upstream_circuit_open,
+    upstream_concurrency_limit,
+    upstream_latency,
+)
+from app.utils.retry import RetryBudget, backoff_delay
+
+logger = logging.getLogger(__name__)
+
+
+class UpstreamUnavailable(ConnectionError):
+    """The upstream could not be reached (counts as a transient failure)"""
+
+
+class CircuitOpenError(UpstreamUnavailable):
+    """Raised without calling the upstream while its circuit is open"""
+
+
+def is_transient(exc: BaseException) -> bool:
+    """Network-level failures say nothing about the requested symbol"""
+    return isinstance(exc, (OSError, asyncio.TimeoutError))
+
+
+class UpstreamPolicy:
+    """Limits for one endpoint family"""
+
+    def __init__(
+        self,
+        rate: float,
+        burst: int,
+        max_concurrency: int,
+        min_concurrency: int = 1,
+        latency_target: float = 10.0,
+        timeout: float = 60.0,
+        failure_threshold: int = 5,
+        reset_timeout: float = 30.0,
+        max_retries: int = 2,
+    ):
+        self.rate = rate                        # tokens/second across all processes
+        self.burst = burst                      # bucket capacity
+        self.max_concurrency = max_concurrency  # per-process AIMD ceiling
+        self.min_concurrency = min_concurrency
+        self.latency_target = latency_target    # slower calls count as congestion
+        self.timeout = timeout
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.max_retries = max_retries
+
+
+POLICIES: Dict[str, UpstreamPolicy] = {
+    "eastmoney": UpstreamPolicy(rate=5, burst=10, max_concurrency=8),
+    "ths": UpstreamPolicy(rate=2, burst=4, max_concurrency=4),
+    "sina": UpstreamPolicy(rate=2, burst=4, max_concurrency=4),
+    "baidu": UpstreamPolicy(rate=2, burst=4, max_concurrency=4),
+    "exchange": UpstreamPolicy(rate=1, burst=2, max_concurrency=2),
+    "default": UpstreamPolicy(rate=2, burst=4, max_concurrency=4),
+}
+
+# Eastmoney-backed endpoints whose names do not end in ``_em``
+_EASTMONEY = {
+    "stock_zh_a_hist", "stock_individual_fund_flow", "stock_individual_fund_flow_rank",
+    "stock_sector_fund_flow_rank",
+}
+_EXCHANGE = {"stock_info_sh_name_code", "stock_info_sz_name_code", "stock_info_bj_name_code"}
+_SINA = {"stock_financial_analysis_indicator", "stock_zh_a_daily"}
+
+
+def family_of(func: Callable) -> str:
+    """Endpoint family of an akshare function, from its name"""
+    name = getattr(func, "__name__", "")
+    if name.endswith("_em") or name in _EASTMONEY:
+        return "eastmoney"
+    if name.endswith("_ths"):
+        return "ths"
+    if "baidu" in name:
+        return "baidu"
+    if name in _EXCHANGE:
+        return "exchange"
+    if name in _SINA or name.endswith("_sina"):
+        return "sina"
+    return "default"
+
+
+# KEYS[1] bucket hash, KEYS[2] shared circuit flag; ARGV[1] rate/s, ARGV[2] burst.
+# Returns -1 if the circuit is open, 0 if a token was taken, else ms to wait.
+_TOKEN_BUCKET_LUA = """
+if redis.call('EXISTS', KEYS[2]) == 1 then return -1 end
+local t = redis.call('TIME')
+local now = tonumber(t[1]) + tonumber(t[2]) / 1000000
+local rate = tonumber(ARGV[1])
+local burst = tonumber(ARGV[2])
+local state = redis.call('HMGET', KEYS[1], 'tokens', 'ts')
+local tokens = tonumber(state[1]) or burst
+local ts = tonumber(state[2]) or now
+tokens = math.min(burst, tokens + math.max(0, now - ts) * rate)
+local wait = 0
+if tokens >= 1 then
+  tokens = tokens - 1
+else
+  wait = math.ceil((1 - tokens) / rate * 1000)
+end
+redis.call('HSET', KEYS[1], 'tokens', tokens, 'ts', now)
+redis.call('PEXPIRE', KEYS[1], math.ceil(burst / rate * 1000) + 1000)
+return wait
+"""
+
+# How long to use local buckets after Redis failed before trying it again
+_REDIS_RETRY_AFTER = 30.0
+
+
+class LocalTokenBucket:
+    """Per-process token bucket used while Redis is unreachable"""
+
+    def __init__(self, rate: float, burst: int):
+        self.rate = rate
+        self.burst = burst
+        self.tokens = float(burst)
+        self.ts = time.monotonic()
+
+    def take(self) -> float:
+        """0 if a token was taken, else seconds to wait"""
+        now = time.monotonic()
+        self.tokens = min(self.burst, self.tokens + (now - self.ts) * self.rate)
+        self.ts = now
+        if self.tokens >= 1:
+            self.tokens -= 1
+            return 0.0
+        return (1 - self.tokens) / self.rate
+
+
+class CircuitBreaker:
+    """Closed → open after ``failure_threshold`` consecutive failures → half-open probe"""
+
+    CLOSED, OPEN, HALF_OPEN = "closed", "open", "half_open"
+
+    def __init__(self, failure_threshold: int, reset_timeout: float):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.state = self.CLOSED
+        self.failures = 0
+        self.opened_at = 0.0
+        self._probing = False
+
+    def allow(self) -> bool:
+        if self.state == self.OPEN:
+            if time.monotonic() - self.opened_at < self.reset_timeout:
+                return False
+            self.state = self.HALF_OPEN
+            self._probing = False
+        if self.state == self.HALF_OPEN:
+            if self._probing:
+                return False
+            self._probing = True
+        return True
+
+    def release_probe(self):
+        """Give back a half-open probe slot whose call never completed"""
+        if self.state == self.HALF_OPEN:
+            self._probing = False
+
+    def record_success(self):
+        self.state = self.CLOSED
+        self.failures = 0
+        self._probing = False
+
+    def record_failure(self) -> bool:
+        """Count a transient failure; True if this opened the circuit"""
+        self.failures += 1
+        if self.state == self.HALF_OPEN or self.failures >= self.failure_threshold:
+            was_open = self.state == self.OPEN
+            self.state = self.OPEN
+            self.opened_at = time.monotonic()
+            self._probing = False
+            return not was_open
+        return False
+
+
+class _LoopSlots:
+    __slots__ = ("cond", "in_flight")
+
+    def __init__(self):
+        self.cond = asyncio.Condition()
+        self.in_flight = 0
+
+
+class AdaptiveLimiter:
+    """AIMD in-flight limit; waiters are tracked per event loop"""
+
+    def __init__(self, family: str, max_limit: int, min_limit: int, latency_target: float):
+        self.family = family
+        self.max_limit = max_limit
+        self.min_limit = min_limit
+        self.latency_target = latency_target
+        self.limit = float(max_limit)
+        self._slots: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, _LoopSlots]" = (
+            weakref.WeakKeyDictionary()
+        )
+        upstream_concurrency_limit.labels(family=family).set(self.limit)
+
+    def _for_loop(self) -> _LoopSlots:
+        loop = asyncio.get_running_loop()
+        slots = self._slots.get(loop)
+        if slots is None:
+            slots = self._slots[loop] = _LoopSlots()
+        return slots
+
+    async def acquire(self):
+        slots = self._for_loop()
+        async with slots.cond:
+            await slots.cond.wait_for(lambda: slots.in_flight < int(self.limit))
+            slots.in_flight += 1
+
+    async def release(self, healthy: bool, latency: float):
+        if healthy and latency <= self.latency_target:
+            self.limit = min(self.max_limit, self.limit + 1 / self.limit)
+        else:
+            self.limit = max(self.min_limit, self.limit / 2)
+        upstream_concurrency_limit.labels(family=self.family).set(self.limit)
+
+        slots = self._for_loop()
+        async with slots.cond:
+            slots.in_flight -= 1
+            slots.cond.notify_all()
+
+
+class _Family:
+    """Governor state for one endpoint family"""
+
+    def __init__(self, name: str, policy: UpstreamPolicy):
+        self.name = name
+        self.policy = policy
+        self.breaker = CircuitBreaker(policy.failure_threshold, policy.reset_timeout)
+        self.limiter = AdaptiveLimiter(
+            name, policy.max_concurrency, policy.min_concurrency, policy.latency_target
+        )
+        self.local_bucket = LocalTokenBucket(policy.rate, policy.burst)
+        self.retry_budget = RetryBudget()
+        self.bucket_key = f"upstream:bucket:{name}"
+        self.circuit_key = f"upstream:circuit:{name}"
+
+
+class UpstreamGovernor:
+    """Rate limiting, adaptive concurrency, circuit breaking and retry for akshare calls"""
+
+    def __init__(self, policies: Dict[str, UpstreamPolicy]):
+        self.policies = policies
+        self._families: Dict[str, _Family] = {}
+        self._redis_down_until = 0.0
+
+    def family(self, name: str) -> _Family:
+        family = self._families.get(name)
+        if family is None:
+            policy = self.policies.get(name) or self.policies["default"]
+            family = self._families[name] = _Family(name, policy)
+        return family
+
+    def _redis(self):
+        if time.monotonic() < self._redis_down_until:
+            return None
+        try:
+            from app.core.cache import get_async_redis
+            return get_async_redis()
+        except Exception:
+            return None
+
+    def _redis_failed(self, e: Exception):
+        logger.debug(f"Upstream governor falling back to local limits: {e}")
+        self._redis_down_until = time.monotonic() + _REDIS_RETRY_AFTER
+
+    async def _take_token(self, family: _Family):
+        """Wait for a token; raises CircuitOpenError if another process opened the circuit"""
+        while True:
+            wait: Optional[float] = None
+            redis = self._redis()
+            if redis is not None:
+                try:
+                    script = redis.register_script(_TOKEN_BUCKET_LUA)
+                    result = await script(
+                        keys=[family.bucket_key, family.circuit_key],
+                        args=[family.policy.rate, family.policy.burst],
+                    )
+                    if int(result) < 0:
+                        raise CircuitOpenError(f"{family.name} circuit open (shared)")
+                    wait = int(result) / 1000
+                except CircuitOpenError:
+                    raise
+                except Exception as e:
+                    self._redis_failed(e)
+            if wait is None:
+                wait = family.local_bucket.take()
+            if wait <= 0:
+                return
+            upstream_calls.labels(family=family.name, outcome="throttled").inc()
+            await asyncio.sleep(wait)
+
+    async def _open_circuit(self, family: _Family):
+        logger.warning(
+            f"Upstream {family.name} circuit opened for {family.policy.reset_timeout}s "
+            f"after {family.breaker.failures} failures"
+        )
+        upstream_circuit_open.labels(family=family.name).set(1)
+        redis = self._redis()
+        if redis is not None:
+            try:
+                await redis.set(family.circuit_key, 1, px=int(family.policy.reset_timeout * 1000))
+            except Exception as e:
+                self._redis_failed(e)
+
+    async def _attempt(self, family: _Family, func: Callable, args: tuple, kwargs: dict) -> Any:
+        if not family.breaker.allow():
+            upstream_calls.labels(family=family.name, outcome="rejected").inc()
+            raise CircuitOpenError(f"{family.name} circuit open")
+        probe = family.breaker.state == CircuitBreaker.HALF_OPEN
+        try:
+            await self._take_token(family)
+            await family.limiter.acquire()
+        except BaseException as e:
+            # No call was made (shared circuit open, or cancelled while waiting):
+            # the probe slot must not stay claimed or the breaker never closes
+            if probe:
+                family.breaker.release_probe()
+            if isinstance(e, CircuitOpenError):
+                upstream_calls.labels(family=family.name, outcome="rejected").inc()
+            raise
+
+        start = time.monotonic()
+        healthy = False
+        cancelled = False
+        try:
+            result = await asyncio.wait_for(
+                upstream_executor.run(func, *args, **kwargs), family.policy.timeout
+            )
+            healthy = True
+            return result
+        except asyncio.CancelledError:
+            # Abandoned by the caller (e.g. a hedged fetch another source won):
+            # says nothing about the family's health
+            cancelled = True
+            raise
+        except Exception as e:
+            # The upstream answered: a bad-symbol error is not an availability problem
+            healthy = not is_transient(e)
+            raise
+        finally:
+            latency = time.monotonic() - start
+            if cancelled:
+                upstream_calls.labels(family=family.name, outcome="cancelled").inc()
+                if probe:
+                    family.breaker.release_probe()
+                await family.limiter.release(True, latency)
+            else:
+                upstream_latency.labels(family=family.name).observe(latency)
+                upstream_calls.labels(family=family.name, outcome="ok" if healthy else "error").inc()
+                await family.limiter.release(healthy, latency)
+                if healthy:
+                    if family.breaker.state != CircuitBreaker.CLOSED:
+                        upstream_circuit_open.labels(family=family.name).set(0)
+                    family.breaker.record_success()
+                elif family.breaker.record_failure():
+                    await self._open_circuit(family)
+
+    async def call(self, func: Callable, *args: Any, family: Optional[str] = None, **kwargs: Any) -> Any:
+        """
+        Run a blocking upstream function in the upstream executor under the governor.
+
+        Raises:
+            CircuitOpenError: The family's circuit is open (no call was made)
+        """
+        fam = self.family(family or family_of(func))
+        attempt = 0
+        while True:
+            fam.retry_budget.record_call()
+            try:
+                return await self._attempt(fam, func, args, kwargs)
+            except CircuitOpenError:
+                raise
+            except Exception as e:
+                attempt += 1
+                if (
+                    not is_transient(e)
+                    or attempt > fam.policy.max_retries
+                    or not fam.retry_budget.try_spend()
+                ):
+                    raise
+                wait = backoff_delay(attempt, 0.5, 2, 8)
+                logger.info(f"Retrying {getattr(func, '__name__', func)} ({fam.name}) in {wait:.2f}s: {e}")
+                await asyncio.sleep(wait)
+
+    def reset(self):
+        self._families.clear()
+        self._redis_down_until = 0.0
+
+
+governor = UpstreamGovernor(POLICIES)
+
+
+async def call(func: Callable, *args: Any, family: Optional[str] = None, **kwargs: Any) -> Any:
+    """Shortcut for ``governor.call``"""
+    return await governor.call(func, *args, family=family, **kwargs)
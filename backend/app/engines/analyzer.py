@@ -1,12 +1,11 @@
 # backend/app/engines/analyzer.py
 
 import asyncio
-import json
 import logging
 import time
 from typing import Optional, Dict, Any, List
 from sqlalchemy.orm import Session
-from redis import Redis
+from redis.asyncio import Redis
 import pandas as pd
 import numpy as np
 
@@ -18,6 +17,8 @@ from app.schemas.analysis import (
     IndustryComparison,
     DuPontAnalysis
 )
+from app.core import codec
+from app.core.executors import run_cpu
 from app.services.data_service import DataService
 from app.engines.industry_comparator import IndustryComparator
 from app.utils.indicators import (
@@ -610,6 +611,12 @@ class StockAnalyzer:
         }
 
     async def _analyze_technical(self, data: Dict) -> TechnicalAnalysis:
+        """技术面分析 — indicator math runs in the CPU executor, off the event loop"""
+        return await run_cpu(
+            _run_technical_analysis, data.get('kline_data', []), data.get('quote', {})
+        )
+
+    def _technical_analysis(self, data: Dict) -> TechnicalAnalysis:
         """技术面分析 — multi-indicator confluence scoring
 
         Best-practice enhancements:
@@ -1256,9 +1263,9 @@ class StockAnalyzer:
     async def _get_from_cache(self, key: str) -> Optional[Dict]:
         """从缓存获取数据"""
         try:
-            cached = self.cache.get(key)
+            cached = await self.cache.get(key)
             if cached:
-                return json.loads(cached)
+                return codec.decode(cached)
             return None
         except Exception as e:
             logger.warning(f"Cache get error: {e}")
@@ -1267,8 +1274,17 @@ class StockAnalyzer:
     async def _set_to_cache(self, key: str, value: Dict, ttl: int) -> bool:
         """设置缓存"""
         try:
-            self.cache.setex(key, ttl, json.dumps(value, default=str))
+            await self.cache.setex(key, ttl, codec.encode(value))
             return True
         except Exception as e:
             logger.warning(f"Cache set error: {e}")
             return False
+
+
+def _run_technical_analysis(kline_data: List[Dict], quote: Dict) -> TechnicalAnalysis:
+    """CPU-executor entry point (module-level so it pickles into worker processes).
+
+    The technical helpers are stateless, so no db/cache handles are needed.
+    """
+    analyzer = StockAnalyzer.__new__(StockAnalyzer)
+    return analyzer._technical_analysis({'kline_data': kline_data, 'quote': quote})
@@ -0,0 +1,253 @@
+# backend/app/engines/condition_expr.py
+"""Compiled boolean expressions over screening conditions.
+
+Custom conditions (AND/OR groups, NOT, BETWEEN, IN and field-to-field
+comparisons) compile into one expression tree that evaluates to a single
+boolean mask over the candidate frame's columns:
+
+- NOT is pushed down to the leaves (De Morgan), so every node can answer
+  both "which rows match" and "which rows definitely do not". A missing
+  value never matches, negated or not, as in SQL.
+- AND children run most selective first and OR children most inclusive
+  first (selectivity is estimated on a small sample of rows); each child
+  only evaluates the rows still undecided, and evaluation stops once none
+  are left.
+- Columns are converted to float arrays once per evaluation and shared by
+  every predicate on the same field.
+"""
+from typing import Dict, Iterable, List, Optional, Sequence, Set, Union
+
+import numpy as np
+import pandas as pd
+
+from app.schemas.strategy import ConditionGroup, ConditionOperator, FilterCondition
+
+Condition = Union[FilterCondition, ConditionGroup]
+
+# Rows sampled to estimate each predicate's selectivity
+_SAMPLE_ROWS = 256
+
+_COMPARE = {
+    ConditionOperator.GT: np.greater,
+    ConditionOperator.LT: np.less,
+    ConditionOperator.GTE: np.greater_equal,
+    ConditionOperator.LTE: np.less_equal,
+    ConditionOperator.EQ: np.equal,
+    ConditionOperator.NE: np.not_equal,
+}
+
+
+class Columns:
+    """Float views of a frame's columns, converted on first use"""
+
+    def __init__(self, df: pd.DataFrame):
+        self.df = df
+        self.size = len(df)
+        self.names = set(df.columns)
+        self._arrays: Dict[str, np.ndarray] = {}
+        self.estimates: Dict[int, float] = {}  # id(predicate) -> selectivity on this frame
+        self._sample = np.linspace(0, self.size - 1, min(self.size, _SAMPLE_ROWS)).astype(np.int64)
+
+    def __getitem__(self, name: str) -> np.ndarray:
+        array = self._arrays.get(name)
+        if array is None:
+            array = pd.to_numeric(self.df[name], errors="coerce").to_numpy(dtype=float, na_value=np.nan)
+            self._arrays[name] = array
+        return array
+
+    @property
+    def sample(self) -> np.ndarray:
+        """Evenly spaced row positions used for selectivity estimates"""
+        return self._sample
+
+
+class Expr:
+    """Expression node: ``matches`` / ``refutes`` return masks restricted to ``rows``"""
+
+    def fields(self) -> Set[str]:
+        raise NotImplementedError
+
+    def matches(self, cols: Columns, rows: np.ndarray) -> np.ndarray:
+        raise NotImplementedError
+
+    def refutes(self, cols: Columns, rows: np.ndarray) -> np.ndarray:
+        raise NotImplementedError
+
+    def selectivity(self, cols: Columns) -> float:
+        """Estimated fraction of rows matching"""
+        raise NotImplementedError
+
+    def negated(self) -> "Expr":
+        return Not(self)
+
+    def mask(self, df: pd.DataFrame) -> np.ndarray:
+        """Boolean mask of the frame's rows matching the expression"""
+        return self.evaluate(Columns(df))
+
+    def evaluate(self, cols: Columns) -> np.ndarray:
+        """Like :meth:`mask`, over columns that may be shared across evaluations"""
+        missing = self.fields() - cols.names
+        if missing:
+            raise ValueError(f"Invalid field: {', '.join(sorted(missing))}. Field does not exist in stock data.")
+        cols.estimates.clear()
+        return self.matches(cols, np.ones(cols.size, dtype=bool))
+
+
+class Predicate(Expr):
+    """One comparison of a field against constants or another field"""
+
+    def __init__(self, field: str, operator: ConditionOperator, value=None, value_field: Optional[str] = None):
+        self.field = field
+        self.operator = operator
+        self.value = value
+        self.value_field = value_field
+
+    def fields(self) -> Set[str]:
+        return {self.field} | ({self.value_field} if self.value_field else set())
+
+    def _operands(self, cols: Columns, positions: np.ndarray):
+        values = cols[self.field][positions]
+        other = cols[self.value_field][positions] if self.value_field else None
+        return values, other
+
+    def _evaluate(self, cols: Columns, positions: np.ndarray):
+        """(known, true) over the given row positions"""
+        values, other = self._operands(cols, positions)
+        known = ~np.isnan(values)
+        op = self.operator
+        if other is not None:
+            known &= ~np.isnan(other)
+            result = _COMPARE[op](values, other)
+        elif op == ConditionOperator.BETWEEN:
+            result = (values >= self.value[0]) & (values <= self.value[1])
+        elif op == ConditionOperator.IN:
+            result = np.isin(values, self.value)
+        else:
+            result = _COMPARE[op](values, self.value)
+        return known, result
+
+    def _apply(self, cols: Columns, rows: np.ndarray, want: bool) -> np.ndarray:
+        out = np.zeros(cols.size, dtype=bool)
+        positions = np.flatnonzero(rows)
+        if len(positions) == 0:
+            return out
+        known, result = self._evaluate(cols, positions)
+        out[positions] = known & (result if want else ~result)
+        return out
+
+    def matches(self, cols: Columns, rows: np.ndarray) -> np.ndarray:
+        return self._apply(cols, rows, True)
+
+    def refutes(self, cols: Columns, rows: np.ndarray) -> np.ndarray:
+        return self._apply(cols, rows, False)
+
+    def selectivity(self, cols: Columns) -> float:
+        estimate = cols.estimates.get(id(self))
+        if estimate is None:
+            if cols.size == 0:
+                estimate = 1.0
+            else:
+                known, result = self._evaluate(cols, cols.sample)
+                estimate = float((known & result).mean())
+            cols.estimates[id(self)] = estimate
+        return estimate
+
+
+class And(Expr):
+    def __init__(self, children: Sequence[Expr]):
+        self.children = list(children)
+
+    def fields(self) -> Set[str]:
+        return set().union(*(c.fields() for c in self.children))
+
+    def matches(self, cols: Columns, rows: np.ndarray) -> np.ndarray:
+        # Most selective first; each child only sees the rows still matching
+        for child in sorted(self.children, key=lambda c: c.selectivity(cols)):
+            rows = child.matches(cols, rows)
+            if not rows.any():
+                break
+        return rows
+
+    def refutes(self, cols: Columns, rows: np.ndarray) -> np.ndarray:
+        return _any(self.children, cols, rows, refute=True)
+
+    def selectivity(self, cols: Columns) -> float:
+        return float(np.prod([c.selectivity(cols) for c in self.children]))
+
+    def negated(self) -> Expr:
+        return Or([c.negated() for c in self.children])
+
+
+class Or(Expr):
+    def __init__(self, children: Sequence[Expr]):
+        self.children = list(children)
+
+    def fields(self) -> Set[str]:
+        return set().union(*(c.fields() for c in self.children))
+
+    def matches(self, cols: Columns, rows: np.ndarray) -> np.ndarray:
+        return _any(self.children, cols, rows, refute=False)
+
+    def refutes(self, cols: Columns, rows: np.ndarray) -> np.ndarray:
+        # A row is refuted only when every child refutes it
+        for child in sorted(self.children, key=lambda c: c.selectivity(cols), reverse=True):
+            rows = child.refutes(cols, rows)
+            if not rows.any():
+                break
+        return rows
+
+    def selectivity(self, cols: Columns) -> float:
+        return 1.0 - float(np.prod([1.0 - c.selectivity(cols) for c in self.children]))
+
+    def negated(self) -> Expr:
+        return And([c.negated() for c in self.children])
+
+
+class Not(Expr):
+    def __init__(self, child: Expr):
+        self.child = child
+
+    def fields(self) -> Set[str]:
+        return self.child.fields()
+
+    def matches(self, cols: Columns, rows: np.ndarray) -> np.ndarray:
+        return self.child.refutes(cols, rows)
+
+    def refutes(self, cols: Columns, rows: np.ndarray) -> np.ndarray:
+        return self.child.matches(cols, rows)
+
+    def selectivity(self, cols: Columns) -> float:
+        return 1.0 - self.child.selectivity(cols)
+
+    def negated(self) -> Expr:
+        return self.child
+
+
+def _any(children: List[Expr], cols: Columns, rows: np.ndarray, refute: bool) -> np.ndarray:
+    """Rows where some child matches (or refutes); most inclusive child first"""
+    hit = np.zeros(cols.size, dtype=bool)
+    pending = rows.copy()
+    key = (lambda c: 1.0 - c.selectivity(cols)) if refute else (lambda c: c.selectivity(cols))
+    for child in sorted(children, key=key, reverse=True):
+        found = child.refutes(cols, pending) if refute else child.matches(cols, pending)
+        hit |= found
+        pending &= ~found
+        if not pending.any():
+            break
+    return hit
+
+
+def compile_conditions(conditions: Iterable[Condition], logic: str = "AND") -> Expr:
+    """Compile request conditions (and nested groups) into one expression tree"""
+    children = [_compile(c) for c in conditions]
+    if len(children) == 1:
+        return children[0]
+    return Or(children) if logic == "OR" else And(children)
+
+
+def _compile(condition: Condition) -> Expr:
+    if isinstance(condition, ConditionGroup):
+        expr = compile_conditions(condition.conditions, condition.logic)
+    else:
+        expr = Predicate(condition.field, condition.operator, condition.value, condition.value_field)
+    return expr.negated() if condition.negate else expr
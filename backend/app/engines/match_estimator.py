@@ -0,0 +1,171 @@
+# backend/app/engines/match_estimator.py
+"""Match counts for screening conditions without running the screen.
+
+A :class:`MatchIndex` is built once per snapshot version over the screening
+universe (risk-filtered snapshot joined with the factor tables). Each field
+gets a sorted array of its known values on first use, so a constant
+comparison, BETWEEN or IN condition is counted exactly with binary searches
+— O(log n) per condition. Field-to-field comparisons and nested groups are
+counted with one vectorized pass, and the combined set is evaluated with the
+compiled expression over the index's cached columns.
+
+Fields the universe has no column for (a factor table that has not been
+built yet) are reported as unavailable instead of being counted.
+"""
+from typing import Awaitable, Callable, Dict, Iterable, List, Tuple, Union
+
+import numpy as np
+import pandas as pd
+
+from app.engines.condition_expr import Columns, compile_conditions
+from app.schemas.strategy import ConditionGroup, ConditionOperator, FilterCondition
+from app.utils.singleflight import SingleFlight
+
+Condition = Union[FilterCondition, ConditionGroup]
+
+# Universes (risk/industry filter combinations) kept in memory at once
+_MAX_UNIVERSES = 16
+
+
+class MatchIndex:
+    """Sorted per-field value arrays over one screening universe"""
+
+    def __init__(self, df: pd.DataFrame, version: str):
+        self.version = version
+        self.size = len(df)
+        self.columns = Columns(df)
+        self._sorted: Dict[str, np.ndarray] = {}
+
+    def sorted_values(self, field: str) -> np.ndarray:
+        values = self._sorted.get(field)
+        if values is None:
+            column = self.columns[field]
+            values = np.sort(column[~np.isnan(column)])
+            self._sorted[field] = values
+        return values
+
+    def _check(self, fields: Iterable[str]):
+        missing = set(fields) - self.columns.names
+        if missing:
+            raise ValueError(f"Invalid field: {', '.join(sorted(missing))}. Field does not exist in stock data.")
+
+    def count(self, condition: FilterCondition) -> Tuple[int, int]:
+        """(matching rows, rows with a known value) for one condition"""
+        if condition.value_field is not None:
+            self._check([condition.field, condition.value_field])
+            expr = compile_conditions([condition.model_copy(update={"negate": False})])
+            left, right = self.columns[condition.field], self.columns[condition.value_field]
+            known = int((~np.isnan(left) & ~np.isnan(right)).sum())
+            matches = int(expr.evaluate(self.columns).sum())
+        else:
+            self._check([condition.field])
+            values = self.sorted_values(condition.field)
+            known = len(values)
+            matches = _count_sorted(values, condition.operator, condition.value)
+        return (known - matches if condition.negate else matches), known
+
+    def estimate(self, conditions: List[Condition], logic: str = "AND") -> Dict:
+        """Per-condition and combined match counts with selectivities"""
+        if self.size == 0:
+            return self._empty(conditions, logic)
+        per_condition, unavailable = [], set()
+        for condition in conditions:
+            missing = compile_conditions([condition]).fields() - self.columns.names
+            if missing:
+                unavailable |= missing
+                per_condition.append({
+                    "condition": condition.model_dump(exclude_defaults=True),
+                    "matches": None, "known": None, "selectivity": None, "available": False,
+                })
+                continue
+            if isinstance(condition, ConditionGroup):
+                expr = compile_conditions([condition])
+                matches, known = int(expr.evaluate(self.columns).sum()), self.size
+            else:
+                matches, known = self.count(condition)
+            per_condition.append({
+                "condition": condition.model_dump(exclude_defaults=True),
+                "matches": matches,
+                "known": known,
+                "selectivity": round(matches / self.size, 4) if self.size else 0.0,
+                "available": True,
+            })
+
+        if unavailable:
+            total = None
+        elif conditions:
+            total = int(compile_conditions(conditions, logic).evaluate(self.columns).sum())
+        else:
+            total = self.size
+        return {
+            "version": self.version,
+            "universe": self.size,
+            "logic": logic,
+            "matches": total,
+            "selectivity": round(total / self.size, 4) if total is not None else None,
+            "conditions": per_condition,
+            "unavailable_fields": sorted(unavailable),
+        }
+
+    def _empty(self, conditions: List[Condition], logic: str) -> Dict:
+        return {
+            "version": self.version, "universe": 0, "logic": logic, "matches": 0, "selectivity": 0.0,
+            "conditions": [
+                {
+                    "condition": c.model_dump(exclude_defaults=True),
+                    "matches": 0, "known": 0, "selectivity": 0.0, "available": True,
+                }
+                for c in conditions
+            ],
+            "unavailable_fields": [],
+        }
+
+
+def _count_sorted(values: np.ndarray, operator: ConditionOperator, value) -> int:
+    """Rows of a sorted array satisfying ``operator value``, by binary search"""
+    n = len(values)
+    if operator == ConditionOperator.GT:
+        return n - int(np.searchsorted(values, value, side="right"))
+    if operator == ConditionOperator.GTE:
+        return n - int(np.searchsorted(values, value, side="left"))
+    if operator == ConditionOperator.LT:
+        return int(np.searchsorted(values, value, side="left"))
+    if operator == ConditionOperator.LTE:
+        return int(np.searchsorted(values, value, side="right"))
+    if operator == ConditionOperator.BETWEEN:
+        low, high = value
+        if low > high:
+            return 0
+        return int(np.searchsorted(values, high, side="right") - np.searchsorted(values, low, side="left"))
+    if operator == ConditionOperator.EQ:
+        return _count_sorted(values, ConditionOperator.BETWEEN, [value, value])
+    if operator == ConditionOperator.NE:
+        return n - _count_sorted(values, ConditionOperator.BETWEEN, [value, value])
+    if operator == ConditionOperator.IN:
+        return sum(_count_sorted(values, ConditionOperator.BETWEEN, [v, v]) for v in set(value))
+    raise ValueError(f"Unsupported operator: {operator}")
+
+
+class MatchIndexCache:
+    """The current MatchIndex per universe, rebuilt when the snapshot version changes"""
+
+    def __init__(self):
+        self._indexes: Dict[str, MatchIndex] = {}  # universe -> index of its latest version
+        self._inflight = SingleFlight()
+
+    async def get(self, universe: str, version: str, build: Callable[[], Awaitable[MatchIndex]]) -> MatchIndex:
+        index = self._indexes.get(universe)
+        if index is not None and index.version == version:
+            return index
+        index = await self._inflight.do(f"{universe}:{version}", build)
+        self._indexes.pop(universe, None)
+        self._indexes[universe] = index
+        while len(self._indexes) > _MAX_UNIVERSES:
+            del self._indexes[next(iter(self._indexes))]
+        return index
+
+    def clear(self):
+        self._indexes.clear()
+
+
+match_index_cache = MatchIndexCache()
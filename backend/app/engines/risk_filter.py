@@ -2,6 +2,7 @@
 from typing import List, Dict, Optional, Set
 import pandas as pd
 import logging
+from app.services.reference_data import reference_registry
 
 logger = logging.getLogger(__name__)
 
@@ -24,7 +25,6 @@ class RiskFilter:
         self.min_daily_volume = 1_000_000  # 100万日成交量
         self._industry_include: Optional[Set[str]] = None
         self._industry_exclude: Optional[Set[str]] = None
-        self._industry_stock_cache: Optional[Dict[str, str]] = None
 
     def set_industry_filter(
         self,
@@ -39,21 +39,11 @@ class RiskFilter:
         self._industry_include = set(include) if include else None
         self._industry_exclude = set(exclude) if exclude else None
 
-    async def _load_industry_map(self) -> Dict[str, str]:
-        """Load stock_code → industry_name mapping (cached)."""
-        if self._industry_stock_cache is not None:
-            return self._industry_stock_cache
-        try:
-            import akshare as ak
-            df = ak.stock_board_industry_cons_em(symbol="全部")
-            if not df.empty and "代码" in df.columns and "板块名称" in df.columns:
-                self._industry_stock_cache = dict(zip(df["代码"].astype(str), df["板块名称"].astype(str)))
-            else:
-                self._industry_stock_cache = {}
-        except Exception as e:
-            logger.warning(f"Failed to load industry map: {e}")
-            self._industry_stock_cache = {}
-        return self._industry_stock_cache
+    def industry_key(self) -> str:
+        """Stable description of the industry filter (distinguishes cached universes)"""
+        include = ",".join(sorted(self._industry_include or ()))
+        exclude = ",".join(sorted(self._industry_exclude or ()))
+        return f"{include}|{exclude}"
 
     async def apply_all_filters(self, stocks: List[Dict]) -> List[Dict]:
         """Apply all risk filters to stock list"""
@@ -80,12 +70,13 @@ class RiskFilter:
         """Filter stocks by industry include/exclude lists."""
         if df.empty:
             return df
-        industry_map = await self._load_industry_map()
-        if not industry_map:
+        try:
+            ref = await reference_registry.get()
+        except Exception as e:
+            logger.warning(f"Industry filter skipped, reference data unavailable: {e}")
             return df
 
-        codes = df['stock_code'].astype(str)
-        industries = codes.map(lambda c: industry_map.get(c, ''))
+        industries = df['stock_code'].astype(str).map(lambda c: ref.industry_of(c) or '')
 
         if self._industry_include:
             mask = industries.isin(self._industry_include)
@@ -1,9 +1,13 @@
 # backend/app/engines/stock_filter.py
 import pandas as pd
-from typing import List, Dict
-from app.schemas.strategy import FilterCondition, ConditionOperator
+from typing import Iterable, List, Dict, Optional, Set, Union
+from app.schemas.strategy import ConditionGroup, FilterCondition
 from app.services.data_service import DataService
+from app.engines.condition_expr import compile_conditions
+from app.engines.match_estimator import MatchIndex, match_index_cache
 from app.engines.risk_filter import RiskFilter
+from app.services.financial_factors import join_financial_factors
+from app.services.technical_factors import TECHNICAL_FACTOR_FIELDS, join_technical_factors
 
 class StockFilter:
     def __init__(self):
@@ -12,53 +16,75 @@ class StockFilter:
 
     async def apply_filter(
         self,
-        conditions: List[FilterCondition],
-        apply_risk_filters: bool = True
+        conditions: Iterable[Union[FilterCondition, ConditionGroup]],
+        apply_risk_filters: bool = True,
+        logic: str = "AND",
     ) -> List[Dict]:
-        """Apply filter conditions to stock universe"""
+        """Apply filter conditions (combined with ``logic``) to stock universe"""
+        expr = compile_conditions(conditions, logic)
+
         # Get full market snapshot with PE/PB/market_cap/turnover etc.
         stocks = await self.data_service.fetch_market_snapshot()
 
-        if not stocks:
+        df = await self._universe(stocks, apply_risk_filters, expr.fields())
+        if df is None:
             return []
 
-        # Apply risk filters first
-        if apply_risk_filters:
-            stocks = await self.risk_filter.apply_all_filters(stocks)
+        # One vectorized mask for the whole condition tree
+        return df[expr.mask(df)].to_dict('records')
 
-        # Convert to DataFrame for filtering
-        df = pd.DataFrame(stocks)
+    async def match_index(self, apply_risk_filters: bool = True) -> Optional[MatchIndex]:
+        """Sorted-array index over the screening universe, built once per snapshot version.
 
-        # Apply each condition
-        for condition in conditions:
-            df = self._apply_condition(df, condition)
+        Only factor tables that already exist are joined (estimates must not
+        start a table build); fields of missing tables are reported as
+        unavailable by the index.
+        """
+        view = await self.data_service.fetch_snapshot_view()
+        if not view:
+            return None
+        technical = await self.data_service.fetch_technical_factors(build=False)
+        financial = await self.data_service.fetch_financial_factors(build=False)
+        tables = ",".join(
+            name for name, table in (("technical", technical), ("financial", financial)) if table is not None
+        )
+        universe = f"risk:{apply_risk_filters}:{self.risk_filter.industry_key()}:tables:{tables}"
 
-        return df.to_dict('records')
+        async def build() -> MatchIndex:
+            df = await self._risk_filtered(view.rows, apply_risk_filters)
+            if df is not None:
+                df = join_financial_factors(join_technical_factors(df, technical), financial)
+            return MatchIndex(df if df is not None else pd.DataFrame(), view.version)
 
-    def _apply_condition(self, df: pd.DataFrame, condition: FilterCondition) -> pd.DataFrame:
-        """Apply single condition to DataFrame"""
-        field = condition.field
-        operator = condition.operator
-        value = condition.value
+        return await match_index_cache.get(universe, view.version, build)
 
-        if field not in df.columns:
-            raise ValueError(f"Invalid field: {field}. Field does not exist in stock data.")
+    async def _risk_filtered(self, stocks: List[Dict], apply_risk_filters: bool) -> Optional[pd.DataFrame]:
+        """Snapshot rows after the risk filters, as a frame"""
+        if not stocks:
+            return None
+
+        # Apply risk filters first
+        if apply_risk_filters:
+            stocks = await self.risk_filter.apply_all_filters(stocks)
+            if not stocks:
+                return None
 
-        # Filter out NaN values before comparison
-        valid_mask = pd.notna(df[field])
-        df_valid = df[valid_mask]
+        # Convert to DataFrame for filtering
+        return pd.DataFrame(stocks)
 
-        if operator == ConditionOperator.GT:
-            return df_valid[df_valid[field] > value]
-        elif operator == ConditionOperator.LT:
-            return df_valid[df_valid[field] < value]
-        elif operator == ConditionOperator.GTE:
-            return df_valid[df_valid[field] >= value]
-        elif operator == ConditionOperator.LTE:
-            return df_valid[df_valid[field] <= value]
-        elif operator == ConditionOperator.EQ:
-            return df_valid[df_valid[field] == value]
-        elif operator == ConditionOperator.BETWEEN:
-            return df_valid[(df_valid[field] >= value[0]) & (df_valid[field] <= value[1])]
+    async def _universe(
+        self, stocks: List[Dict], apply_risk_filters: bool, fields: Set[str]
+    ) -> Optional[pd.DataFrame]:
+        """Risk-filtered snapshot frame joined with the factor tables ``fields`` need"""
+        df = await self._risk_filtered(stocks, apply_risk_filters)
+        if df is None:
+            return None
 
-        return df_valid
+        # Financial and technical fields are not in the snapshot: join the universe-wide factor tables
+        missing = fields - set(df.columns)
+        if missing & set(TECHNICAL_FACTOR_FIELDS):
+            df = join_technical_factors(df, await self.data_service.fetch_technical_factors())
+        if missing - set(TECHNICAL_FACTOR_FIELDS):
+            factors = await self.data_service.fetch_financial_factors()
+            df = join_financial_factors(df, factors)
+        return df
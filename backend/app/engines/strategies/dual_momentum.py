@@ -8,115 +8,74 @@ Criteria:
 - 成交量确认：近5日均量 > 近20日均量
 - 市值 > 30亿, 非ST, 非停牌
 """
-from typing import List, Dict
+from typing import Dict, List
+import akshare as ak
 import pandas as pd
 import numpy as np
-from app.services.data_service import DataService
-from app.engines.stock_filter import StockFilter
+from app.core import upstream
+from app.engines.strategy_pipeline import PANEL, PipelineStrategy
+from app.schemas.strategy import FilterCondition, ConditionOperator
 
 
-class DualMomentumStrategy:
+class DualMomentumStrategy(PipelineStrategy):
     """双动量策略 — 绝对动量 + 相对动量 + 回撤控制"""
 
-    def __init__(self):
-        self.data_service = DataService()
-        self.filter_engine = StockFilter()
+    defaults = {
+        "abs_momentum_min": 10.0,       # 60日涨幅 > 10%
+        "max_drawdown": 15.0,           # 最大回撤 < 15%
+        "market_cap_min": 3_000_000_000,
+    }
 
-    async def execute(self, params: Dict = None) -> List[Dict]:
-        params = params or {}
-        abs_momentum_min = params.get("abs_momentum_min", 10.0)  # 60日涨幅 > 10%
-        max_drawdown = params.get("max_drawdown", 15.0)          # 最大回撤 < 15%
-        market_cap_min = params.get("market_cap_min", 3_000_000_000)
+    async def prepare(self, p: Dict):
+        # Benchmark (沪深300) 60-day return
+        p["benchmark_return"] = await self._get_benchmark_return()
 
-        # 1. Get benchmark (沪深300) 60-day return
-        benchmark_return = await self._get_benchmark_return()
-
-        # 2. Pre-filter from market snapshot
-        from app.schemas.strategy import FilterCondition, ConditionOperator
-        conditions = [
-            FilterCondition(field="market_cap", operator=ConditionOperator.GTE, value=market_cap_min),
+    def conditions(self, p: Dict) -> List[FilterCondition]:
+        return [
+            FilterCondition(field="market_cap", operator=ConditionOperator.GTE, value=p["market_cap_min"]),
             FilterCondition(field="price", operator=ConditionOperator.GT, value=0),
         ]
-        candidates = await self.filter_engine.apply_filter(conditions)
-        if not candidates:
-            return []
-
-        # 3. Filter by 60-day return from snapshot
-        df = pd.DataFrame(candidates)
-        if 'change_60d' in df.columns:
-            df = df[pd.notna(df['change_60d'])]
-            df = df[df['change_60d'] >= abs_momentum_min]
-        else:
-            return []
-
-        results = []
-        for stock in df.head(300).to_dict('records'):
-            try:
-                kline = await self.data_service.fetch_kline_data(
-                    stock['stock_code'], period='1d', days=80
-                )
-                if not kline or len(kline) < 20:
-                    continue
-
-                closes = [float(k['close']) for k in kline if k.get('close')]
-                if len(closes) < 20:
-                    continue
-
-                # Absolute momentum: 60-day return
-                ret_60d = stock.get('change_60d', 0)
-                if ret_60d < abs_momentum_min:
-                    continue
-
-                # Relative momentum: must beat benchmark
-                if benchmark_return is not None and ret_60d <= benchmark_return:
-                    continue
-
-                # Max drawdown in last 20 days
-                recent_closes = closes[:20]  # most recent 20 days
-                peak = recent_closes[0]
-                dd = 0
-                for c in recent_closes:
-                    if c > peak:
-                        peak = c
-                    dd = max(dd, (peak - c) / peak * 100)
-                if dd > max_drawdown:
-                    continue
-
-                # Volume confirmation: 5-day avg > 20-day avg
-                volumes = [float(k.get('volume', 0)) for k in kline[:20]]
-                if len(volumes) >= 20:
-                    vol_5 = np.mean(volumes[:5])
-                    vol_20 = np.mean(volumes[:20])
-                    vol_confirm = vol_5 > vol_20
-                else:
-                    vol_confirm = True
-
-                # Score
-                score = 50.0
-                score += min(ret_60d * 0.5, 25)         # momentum magnitude
-                if benchmark_return is not None:
-                    excess = ret_60d - benchmark_return
-                    score += min(excess * 0.3, 10)       # relative strength
-                score += max(0, (max_drawdown - dd)) * 0.5  # low drawdown bonus
-                if vol_confirm:
-                    score += 5
-
-                stock['score'] = round(min(score, 100), 1)
-                stock['return_60d'] = round(ret_60d, 2)
-                stock['max_drawdown_20d'] = round(dd, 2)
-                results.append(stock)
-
-            except Exception:
-                continue
 
-        results.sort(key=lambda x: x.get('score', 0), reverse=True)
-        return results[:50]
+    def prefilter(self, df: pd.DataFrame, p: Dict) -> pd.DataFrame:
+        # Absolute momentum from the snapshot's 60-day return
+        if 'change_60d' not in df.columns:
+            return df.iloc[0:0]
+        return df[pd.notna(df['change_60d']) & (df['change_60d'] >= p["abs_momentum_min"])]
+
+    def series(self, p: Dict) -> Dict[str, int]:
+        return {PANEL: 80}
+
+    def score_frame(self, df: pd.DataFrame, p: Dict) -> pd.DataFrame:
+        panel = p[PANEL]
+        codes = df['stock_code']
+        ret_60d = df['change_60d'].to_numpy(dtype=float)
+        benchmark_return = p.get("benchmark_return")
+        max_drawdown = p["max_drawdown"]
+
+        # Max drawdown over the most recent 20 bars
+        dd = panel.latest(panel.max_drawdown(20), codes)
+        # Volume confirmation: 5-day avg > 20-day avg
+        vol_confirm = panel.latest(panel.volume_ma(5), codes) > panel.latest(panel.volume_ma(20), codes)
+
+        keep = (panel.latest(panel.bars_available, codes) >= 20) & (dd <= max_drawdown)
+        score = 50.0 + np.minimum(ret_60d * 0.5, 25)  # momentum magnitude
+        if benchmark_return is not None:
+            # Relative momentum: must beat benchmark
+            keep &= ret_60d > benchmark_return
+            score += np.minimum((ret_60d - benchmark_return) * 0.3, 10)  # relative strength
+        score += np.maximum(0, max_drawdown - dd) * 0.5  # low drawdown bonus
+        score += np.where(vol_confirm, 5, 0)
+
+        return pd.DataFrame({
+            "score": np.minimum(score, 100).round(1),
+            "return_60d": ret_60d.round(2),
+            "max_drawdown_20d": dd.round(2),
+        }, index=df.index)[keep]
 
     async def _get_benchmark_return(self) -> float | None:
         """Get CSI 300 (沪深300) 60-day return."""
         try:
-            import akshare as ak
-            df = ak.stock_zh_index_daily_em(symbol="sh000300")
+            df = await upstream.call(ak.stock_zh_index_daily_em, symbol="sh000300")
             if df.empty or len(df) < 60:
                 return None
             closes = df['close'].astype(float).tolist()
@@ -1,10 +1,11 @@
 # backend/app/engines/strategies/earnings_surprise.py
-from typing import List, Dict
+from typing import Dict
+import numpy as np
 import pandas as pd
-from app.services.data_service import DataService
+from app.engines.strategy_pipeline import FINANCIAL_FACTORS, PipelineStrategy, tradable
 
 
-class EarningsSurpriseStrategy:
+class EarningsSurpriseStrategy(PipelineStrategy):
     """业绩预增/扭亏事件驱动策略
 
     Criteria (PRD 3.3):
@@ -14,69 +15,31 @@ class EarningsSurpriseStrategy:
     - 市值 > 30亿 (风险过滤)
 
     Note: Since AKShare earnings forecast data may vary,
-    this strategy uses financial growth metrics as a proxy.
+    this strategy uses financial growth metrics as a proxy,
+    read from the market-wide financial factor table.
     """
 
-    def __init__(self):
-        self.data_service = DataService()
-
-    async def execute(self, params: Dict = None) -> List[Dict]:
-        """Execute earnings surprise strategy"""
-        min_profit_growth = params.get("min_profit_growth", 30.0) if params else 30.0
-        pe_max = params.get("pe_max", 30.0) if params else 30.0
-        market_cap_min = params.get("market_cap_min", 3_000_000_000) if params else 3_000_000_000
-
-        snapshot = await self.data_service.fetch_market_snapshot()
-        if not snapshot:
-            return []
-
-        df = pd.DataFrame(snapshot)
-
-        # Pre-filter
-        df = df[df['price'] > 0]
-        df = df[df['market_cap'] >= market_cap_min]
-        df = df[~df['stock_name'].str.contains('ST', case=False, na=False)]
-        df = df[df['volume'] > 0]
+    defaults = {"min_profit_growth": 30.0, "pe_max": 30.0, "market_cap_min": 3_000_000_000}
+    tables = {FINANCIAL_FACTORS: ["net_profit_growth", "revenue_growth"]}
 
+    def prefilter(self, df: pd.DataFrame, p: Dict) -> pd.DataFrame:
+        df = tradable(df, p["market_cap_min"])
         # PE filter
-        df = df[pd.notna(df['pe'])]
-        df = df[(df['pe'] > 0) & (df['pe'] < pe_max)]
-
-        results = []
-        candidates = df.head(500).to_dict('records')
-
-        for stock in candidates:
-            try:
-                financials = await self.data_service.fetch_financial_data(
-                    stock['stock_code'], years=2
-                )
-                if not financials or len(financials) < 2:
-                    continue
-
-                latest = financials[0]
-                net_profit_growth = latest.get('net_profit_growth', 0)
-
-                # Check earnings growth
-                if net_profit_growth < min_profit_growth:
-                    continue
-
-                # Check revenue growth as confirmation
-                revenue_growth = latest.get('revenue_growth', 0)
-
-                # Score: weighted by growth magnitude
-                score = 50.0
-                score += min(net_profit_growth * 0.5, 30)  # Up to 30 pts for profit growth
-                score += min(max(revenue_growth, 0) * 0.3, 10)  # Up to 10 pts for revenue
-                if stock.get('pe') and stock['pe'] < 20:
-                    score += 10  # Low PE bonus
-
-                stock['score'] = round(min(score, 100), 1)
-                stock['net_profit_growth'] = net_profit_growth
-                stock['revenue_growth'] = revenue_growth
-                results.append(stock)
-
-            except Exception:
-                continue
-
-        results.sort(key=lambda x: x.get('score', 0), reverse=True)
-        return results[:50]
+        df = df[pd.notna(df['pe']) & (df['pe'] > 0) & (df['pe'] < p["pe_max"])]
+        # Check earnings growth
+        return df[df['net_profit_growth'] >= p["min_profit_growth"]]
+
+    def score_frame(self, df: pd.DataFrame, p: Dict) -> pd.DataFrame:
+        net_profit_growth = df['net_profit_growth']
+        # Revenue growth as confirmation
+        revenue_growth = df['revenue_growth'].fillna(0)
+
+        # Score: weighted by growth magnitude
+        score = 50.0 + np.minimum(net_profit_growth * 0.5, 30)  # Up to 30 pts for profit growth
+        score = score + np.minimum(revenue_growth.clip(lower=0) * 0.3, 10)  # Up to 10 pts for revenue
+        score = score + np.where(df['pe'] < 20, 10, 0)  # Low PE bonus
+        return pd.DataFrame({
+            'score': np.minimum(score, 100).round(1),
+            'net_profit_growth': net_profit_growth,
+            'revenue_growth': revenue_growth,
+        }, index=df.index)
@@ -1,11 +1,12 @@
 # backend/app/engines/strategies/peg.py
-from typing import List, Dict
-from app.engines.stock_filter import StockFilter
-from app.services.data_service import DataService
+from typing import Dict, List
+import numpy as np
+import pandas as pd
+from app.engines.strategy_pipeline import FINANCIAL_FACTORS, PipelineStrategy
 from app.schemas.strategy import FilterCondition, ConditionOperator
 
 
-class PEGStrategy:
+class PEGStrategy(PipelineStrategy):
     """PEG Growth Strategy (PRD 3.1)
 
     Criteria:
@@ -15,66 +16,38 @@ class PEGStrategy:
     - 市值 > 50亿
     """
 
-    def __init__(self):
-        self.filter_engine = StockFilter()
-        self.data_service = DataService()
+    defaults = {"peg_max": 1.0, "growth_min": 20.0, "market_cap_min": 5_000_000_000}
+    # Lower PEG = better
+    tables = {FINANCIAL_FACTORS: ["net_profit_growth", "roe"]}
+    sort_key = "peg"
+    ascending = True
 
-    async def execute(self, params: Dict = None) -> List[Dict]:
-        """Execute PEG growth strategy"""
-        peg_max = params.get("peg_max", 1.0) if params else 1.0
-        growth_min = params.get("growth_min", 20.0) if params else 20.0
-        market_cap_min = params.get("market_cap_min", 5_000_000_000) if params else 5_000_000_000
-
-        # Step 1: Screen by PE > 0 and market cap
-        conditions = [
+    def conditions(self, p: Dict) -> List[FilterCondition]:
+        # Screen by PE > 0 and market cap
+        return [
             FilterCondition(field="pe", operator=ConditionOperator.GT, value=0),
             FilterCondition(field="pe", operator=ConditionOperator.LT, value=50),
-            FilterCondition(field="market_cap", operator=ConditionOperator.GT, value=market_cap_min),
+            FilterCondition(field="market_cap", operator=ConditionOperator.GT, value=p["market_cap_min"]),
         ]
-        candidates = await self.filter_engine.apply_filter(conditions)
-
-        # Step 2: Compute PEG with financial data
-        results = []
-        for stock in candidates[:300]:
-            try:
-                financials = await self.data_service.fetch_financial_data(
-                    stock['stock_code'], years=2
-                )
-                if not financials or len(financials) < 2:
-                    continue
-
-                latest = financials[0]
-                net_profit_growth = latest.get('net_profit_growth', 0)
-                roe = latest.get('roe', 0)
-
-                # Must have positive growth above threshold
-                if net_profit_growth < growth_min:
-                    continue
-                if roe < 10:
-                    continue
-
-                # Compute PEG
-                pe = stock.get('pe', 0)
-                if pe <= 0 or net_profit_growth <= 0:
-                    continue
-                peg = pe / net_profit_growth
-                if peg > peg_max:
-                    continue
-
-                # Score: lower PEG = better
-                score = 50.0
-                score += max(0, (peg_max - peg) / peg_max * 25)  # PEG proximity
-                score += min(net_profit_growth / 50 * 15, 15)  # Growth bonus
-                score += min(roe / 20 * 10, 10)  # ROE bonus
-
-                stock['score'] = round(min(score, 100), 1)
-                stock['peg'] = round(peg, 2)
-                stock['roe'] = roe
-                stock['net_profit_growth'] = net_profit_growth
-                results.append(stock)
-
-            except Exception:
-                continue
 
-        results.sort(key=lambda x: x.get("peg", 999))
-        return results[:50]
+    def prefilter(self, df: pd.DataFrame, p: Dict) -> pd.DataFrame:
+        # Must have positive growth above threshold
+        return df[(df['net_profit_growth'] >= p["growth_min"]) & (df['roe'] >= 10)]
+
+    def score_frame(self, df: pd.DataFrame, p: Dict) -> pd.DataFrame:
+        """Compute PEG from the latest reported growth"""
+        net_profit_growth = df['net_profit_growth']
+        peg_max = p["peg_max"]
+        peg = df['pe'] / net_profit_growth.where(net_profit_growth > 0)
+        keep = (df['pe'] > 0) & (peg <= peg_max)
+
+        score = 50.0 + np.maximum(0, (peg_max - peg) / peg_max * 25)  # PEG proximity
+        score = score + np.minimum(net_profit_growth / 50 * 15, 15)  # Growth bonus
+        score = score + np.minimum(df['roe'] / 20 * 10, 10)  # ROE bonus
+        out = pd.DataFrame({
+            'score': np.minimum(score, 100).round(1),
+            'peg': peg.round(2),
+            'roe': df['roe'],
+            'net_profit_growth': net_profit_growth,
+        }, index=df.index)
+        return out[keep]
@@ -1,11 +1,12 @@
 # backend/app/engines/strategies/rs_momentum.py
-from typing import List, Dict
-from app.engines.stock_filter import StockFilter
-from app.services.data_service import DataService
+from typing import Dict, List
+import numpy as np
+import pandas as pd
+from app.engines.strategy_pipeline import PipelineStrategy
 from app.schemas.strategy import FilterCondition, ConditionOperator
 
 
-class RSMomentumStrategy:
+class RSMomentumStrategy(PipelineStrategy):
     """RS Relative Strength Momentum Strategy
 
     Criteria:
@@ -15,39 +16,29 @@ class RSMomentumStrategy:
     - YTD return positive
     """
 
-    def __init__(self):
-        self.filter_engine = StockFilter()
-        self.data_service = DataService()
-
-    async def execute(self, params: Dict = None) -> List[Dict]:
-        """Execute RS momentum strategy"""
-        min_change_60d = params.get("min_change_60d", 15.0) if params else 15.0
-        market_cap_min = params.get("market_cap_min", 3_000_000_000) if params else 3_000_000_000
+    defaults = {"min_change_60d": 15.0, "market_cap_min": 3_000_000_000}
 
+    def conditions(self, p: Dict) -> List[FilterCondition]:
         # Screen by 60-day return + market cap + volume ratio
-        conditions = [
-            FilterCondition(field="change_60d", operator=ConditionOperator.GT, value=min_change_60d),
-            FilterCondition(field="market_cap", operator=ConditionOperator.GT, value=market_cap_min),
+        return [
+            FilterCondition(field="change_60d", operator=ConditionOperator.GT, value=p["min_change_60d"]),
+            FilterCondition(field="market_cap", operator=ConditionOperator.GT, value=p["market_cap_min"]),
             FilterCondition(field="volume_ratio", operator=ConditionOperator.GT, value=0.8),
             FilterCondition(field="change_ytd", operator=ConditionOperator.GT, value=0),
         ]
-        candidates = await self.filter_engine.apply_filter(conditions)
-
-        # Score based on momentum strength
-        results = []
-        for stock in candidates[:200]:
-            change_60d = stock.get("change_60d", 0)
-            change_ytd = stock.get("change_ytd", 0)
-            volume_ratio = stock.get("volume_ratio", 1)
-            turnover = stock.get("turnover_rate", 0)
-
-            # Composite score: 60d momentum + YTD momentum + volume activity
-            score = min(change_60d * 1.5, 50) + min(change_ytd * 0.5, 25) + min(volume_ratio * 5, 15) + min(turnover * 2, 10)
-            score = max(0, min(100, score))
-
-            stock["score"] = round(score, 1)
-            stock["risk_level"] = "high" if change_60d > 50 else "medium"
-            results.append(stock)
 
-        results.sort(key=lambda x: x.get("score", 0), reverse=True)
-        return results[:50]
+    def score_frame(self, df: pd.DataFrame, p: Dict) -> pd.DataFrame:
+        """Composite score: 60d momentum + YTD momentum + volume activity"""
+        change_60d = df['change_60d'].fillna(0)
+        change_ytd = df['change_ytd'].fillna(0)
+        volume_ratio = df['volume_ratio'].fillna(1) if 'volume_ratio' in df.columns else 1
+        turnover = df['turnover_rate'].fillna(0) if 'turnover_rate' in df.columns else 0
+
+        score = (
+            np.minimum(change_60d * 1.5, 50) + np.minimum(change_ytd * 0.5, 25)
+            + np.minimum(volume_ratio * 5, 15) + np.minimum(turnover * 2, 10)
+        )
+        return pd.DataFrame({
+            'score': score.clip(0, 100).round(1),
+            'risk_level': np.where(change_60d > 50, 'high', 'medium'),
+        }, index=df.index)
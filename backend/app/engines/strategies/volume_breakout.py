@@ -1,12 +1,11 @@
 # backend/app/engines/strategies/volume_breakout.py
-from typing import List, Dict
-import pandas as pd
+from typing import Dict
 import numpy as np
-from app.services.data_service import DataService
-from app.utils.indicators import calculate_ma, calculate_boll
+import pandas as pd
+from app.engines.strategy_pipeline import PANEL, PipelineStrategy, tradable
 
 
-class VolumeBreakoutStrategy:
+class VolumeBreakoutStrategy(PipelineStrategy):
     """放量突破平台策略
 
     Criteria (PRD 3.2):
@@ -17,81 +16,49 @@ class VolumeBreakoutStrategy:
     - 市值 > 30亿 (风险过滤)
     """
 
-    def __init__(self):
-        self.data_service = DataService()
-
-    async def execute(self, params: Dict = None) -> List[Dict]:
-        """Execute volume breakout strategy"""
-        consolidation_days = params.get("consolidation_days", 20) if params else 20
-        volume_multiplier = params.get("volume_multiplier", 2.0) if params else 2.0
-        max_amplitude = params.get("max_amplitude", 15.0) if params else 15.0
-        market_cap_min = params.get("market_cap_min", 3_000_000_000) if params else 3_000_000_000
-
-        snapshot = await self.data_service.fetch_market_snapshot()
-        if not snapshot:
-            return []
+    defaults = {
+        "consolidation_days": 20,
+        "volume_multiplier": 2.0,
+        "max_amplitude": 15.0,
+        "market_cap_min": 3_000_000_000,
+    }
 
-        df = pd.DataFrame(snapshot)
-
-        # Pre-filter: active stocks with positive movement today
-        df = df[df['price'] > 0]
-        df = df[df['market_cap'] >= market_cap_min]
-        df = df[~df['stock_name'].str.contains('ST', case=False, na=False)]
-        df = df[df['volume'] > 0]
+    def prefilter(self, df: pd.DataFrame, p: Dict) -> pd.DataFrame:
+        # Active stocks with positive movement today
+        df = tradable(df, p["market_cap_min"])
         df = df[df['pct_change'] > 1.0]  # At least 1% up today
-
         # Volume ratio filter: high volume today
         if 'volume_ratio' in df.columns:
             df = df[df['volume_ratio'] >= 1.5]
-
-        results = []
-        candidates = df.head(200).to_dict('records')
-
-        for stock in candidates:
-            try:
-                kline = await self.data_service.fetch_kline_data(
-                    stock['stock_code'], period='1d', days=consolidation_days + 30
-                )
-                if len(kline) < consolidation_days + 5:
-                    continue
-
-                kdf = pd.DataFrame(kline)
-                closes = kdf['close']
-                highs = kdf['high']
-                lows = kdf['low']
-                volumes = kdf['volume']
-
-                # Check consolidation: low amplitude in prior period
-                prior = kdf.iloc[-(consolidation_days + 1):-1]
-                prior_high = prior['high'].max()
-                prior_low = prior['low'].min()
-                if prior_low <= 0:
-                    continue
-                amplitude = (prior_high - prior_low) / prior_low * 100
-                if amplitude > max_amplitude:
-                    continue
-
-                # Check price breakout above prior high
-                latest_close = closes.iloc[-1]
-                if latest_close <= prior_high:
-                    continue
-
-                # Check volume breakout
-                vol_avg = volumes.iloc[-(consolidation_days + 1):-1].mean()
-                latest_vol = volumes.iloc[-1]
-                if vol_avg <= 0 or latest_vol < vol_avg * volume_multiplier:
-                    continue
-
-                # Calculate score
-                breakout_pct = (latest_close - prior_high) / prior_high * 100
-                vol_ratio = latest_vol / vol_avg
-                score = 50.0 + min(breakout_pct * 5, 25) + min(vol_ratio * 5, 25)
-
-                stock['score'] = round(min(score, 100), 1)
-                results.append(stock)
-
-            except Exception:
-                continue
-
-        results.sort(key=lambda x: x.get('score', 0), reverse=True)
-        return results[:50]
+        return df
+
+    def series(self, p: Dict) -> Dict[str, int]:
+        return {PANEL: p["consolidation_days"] + 30}
+
+    def score_frame(self, df: pd.DataFrame, p: Dict) -> pd.DataFrame:
+        days = p["consolidation_days"]
+        panel = p[PANEL]
+        codes = df['stock_code']
+
+        # Consolidation range and volume over the prior period (excluding the latest bar)
+        prior_high = panel.latest(panel.highest(days), codes, ago=1)
+        prior_low = panel.latest(panel.lowest(days), codes, ago=1)
+        vol_avg = panel.latest(panel.volume_ma(days), codes, ago=1)
+        latest_close = panel.latest(panel.close, codes)
+        latest_vol = panel.latest(panel.volume, codes)
+
+        with np.errstate(divide="ignore", invalid="ignore"):
+            amplitude = (prior_high - prior_low) / prior_low * 100
+            breakout_pct = (latest_close - prior_high) / prior_high * 100
+            vol_ratio = latest_vol / vol_avg
+        keep = (
+            (panel.latest(panel.bars_available, codes) >= days + 5)
+            & (prior_low > 0)
+            & (amplitude <= p["max_amplitude"])
+            & (latest_close > prior_high)  # price breakout above prior high
+            & (vol_avg > 0)
+            & (latest_vol >= vol_avg * p["volume_multiplier"])
+        )
+
+        score = 50.0 + np.minimum(breakout_pct * 5, 25) + np.minimum(vol_ratio * 5, 25)
+        return pd.DataFrame({'score': np.minimum(score, 100).round(1)}, index=df.index)[keep]
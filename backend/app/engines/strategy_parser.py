@@ -21,7 +21,7 @@ VALID_FIELDS = {
     'market_cap', 'circulating_market_cap', 'price',
     'pct_change', 'turnover_rate', 'volume_ratio', 'amplitude',
     'change_60d', 'change_ytd',
-    # 技术指标 (需要由后续引擎计算)
+    # 技术指标 (收盘后预计算的技术因子表)
     'rsi', 'macd_dif', 'macd_dea', 'kdj_k', 'kdj_d',
     'ma5', 'ma10', 'ma20', 'ma60',
     # 资金面
@@ -68,7 +68,8 @@ class StrategyParser:
         response = await self.llm_service.structured_output(messages=messages)
 
         parsed = self._validate_and_convert(response)
-        conflicts = self._detect_conflicts(parsed['conditions'])
+        # 范围冲突只在 AND 组合下成立
+        conflicts = self._detect_conflicts(parsed['conditions']) if parsed.get('logic', 'AND') == 'AND' else []
 
         # Warn if too many conditions (likely over-filtering)
         if len(parsed['conditions']) > 8:
@@ -92,12 +93,13 @@ class StrategyParser:
 {fields_desc}
 
 【支持的运算符】
-  <, >, <=, >=, ==, between
+  <, >, <=, >=, ==, !=, between, in
 
 【支持的逻辑】
   AND — 所有条件同时满足（默认）
   OR  — 满足任一条件即可
   用户说"或者"/"或"时用 OR，否则用 AND
+  NOT — 用户说"不要"/"排除"某条件时，在该条件上设 "negate": true
 
 【模糊表达理解示例】
   "便宜的好公司" → pe < 20, roe > 15, debt_ratio < 50
@@ -125,7 +127,9 @@ class StrategyParser:
 【注意事项】
   - field 必须是上面列出的英文字段名之一
   - 如果用户的描述无法映射到任何字段，设 confidence 为低值并在 summary 中说明
-  - between 运算符的 value 为 [min, max] 数组"""
+  - between 运算符的 value 为 [min, max] 数组，in 运算符的 value 为数值数组
+  - 两个字段相互比较时（如"5日均线在20日均线之上"）用 value_field 代替 value：
+    {{"field": "ma5", "operator": ">", "value_field": "ma20", "description": "5日均线高于20日均线"}}"""
 
     def _build_parse_prompt(self, description: str) -> str:
         return f"""请解析以下选股策略描述，转换为结构化筛选条件：
@@ -141,16 +145,22 @@ class StrategyParser:
 
         for cond in conditions:
             field = cond.get('field', '')
-            if field in VALID_FIELDS:
-                valid_conditions.append(cond)
-            else:
+            if field not in VALID_FIELDS:
                 # Try fuzzy match
                 matched = self._fuzzy_match_field(field)
                 if matched:
                     cond['field'] = matched
-                    valid_conditions.append(cond)
                 else:
                     logger.warning(f"Dropping unknown field from NL parse: {field}")
+                    continue
+            value_field = cond.get('value_field')
+            if value_field and value_field not in VALID_FIELDS:
+                matched = self._fuzzy_match_field(value_field)
+                if not matched:
+                    logger.warning(f"Dropping comparison with unknown field from NL parse: {value_field}")
+                    continue
+                cond['value_field'] = matched
+            valid_conditions.append(cond)
 
         response['conditions'] = valid_conditions
         return response
@@ -190,6 +200,8 @@ class StrategyParser:
 
         field_conditions: Dict[str, List[Dict]] = {}
         for cond in conditions:
+            if cond.get('negate') or cond.get('value_field'):
+                continue
             field = cond.get('field', '')
             field_conditions.setdefault(field, []).append(cond)
 
@@ -0,0 +1,194 @@
+# backend/app/engines/strategy_pipeline.py
+"""Declarative runtime for stock-picking strategies.
+
+A strategy declares what it needs instead of orchestrating the fetches itself:
+
+- ``conditions`` — StockFilter conditions for the candidate universe (risk
+  filters applied), or None to start from the raw market snapshot;
+- ``tables`` — market-wide tables joined as columns in one lookup
+  (``capital_flow``, ``northbound``, ``financial_factors``);
+- ``prefilter`` — vectorized filtering of the joined candidate frame;
+- ``series`` — per-stock datasets (``kline`` days, ``financial`` years), or
+  ``panel`` days for a cross-sectional indicator panel over all candidates.
+  Latest-period financials come from the ``financial_factors`` table; the
+  per-stock ``financial`` history is only for multi-period checks on the
+  prefiltered candidates;
+- ``score`` (per stock, over that stock's arrays) or ``score_frame`` (over
+  the whole candidate frame, with the panel in ``p["panel"]``) — returns the
+  output fields, or rejects.
+
+The engine fetches each per-stock dataset for every candidate in one
+batched, concurrent pass, so candidate lists no longer need ``head(N)``
+caps, then ranks and returns the top ``top_k``.
+"""
+import asyncio
+import logging
+from typing import Any, AsyncIterator, Dict, List, Optional, Tuple
+
+import pandas as pd
+
+from app.engines.stock_filter import StockFilter
+from app.schemas.strategy import FilterCondition
+from app.services.data_service import DataService
+
+logger = logging.getLogger(__name__)
+
+KLINE = "kline"
+FINANCIAL = "financial"
+CAPITAL_FLOW = "capital_flow"
+NORTHBOUND = "northbound"
+FINANCIAL_FACTORS = "financial_factors"
+PANEL = "panel"
+
+
+def tradable(df: pd.DataFrame, market_cap_min: float) -> pd.DataFrame:
+    """Snapshot rows that are trading, not ST and at least ``market_cap_min``"""
+    return df[
+        (df["price"] > 0)
+        & (df["market_cap"] >= market_cap_min)
+        & ~df["stock_name"].str.contains("ST", case=False, na=False)
+        & (df["volume"] > 0)
+    ]
+
+
+class PipelineStrategy:
+    """Base class: subclasses declare candidates, datasets and scoring"""
+
+    defaults: Dict[str, Any] = {}
+    # table name -> columns joined onto the candidates (dropped from the output)
+    tables: Dict[str, List[str]] = {}
+    top_k = 50
+    sort_key = "score"
+    ascending = False
+
+    def __init__(self):
+        self.data_service = DataService()
+        self.filter_engine = StockFilter()
+
+    # ------------------------------------------------------------------
+    # Declarations (overridden by strategies)
+    # ------------------------------------------------------------------
+    def conditions(self, p: Dict) -> Optional[List[FilterCondition]]:
+        return None
+
+    def prefilter(self, df: pd.DataFrame, p: Dict) -> pd.DataFrame:
+        return df
+
+    def series(self, p: Dict) -> Dict[str, int]:
+        return {}
+
+    async def prepare(self, p: Dict):
+        """Fetch strategy-wide inputs (e.g. a benchmark) into ``p``; runs alongside the screen"""
+
+    def score(self, stock: Dict, data: Dict[str, Any], p: Dict) -> Optional[Dict]:
+        """Output fields (including ``score``) for one stock, or None to reject it"""
+        raise NotImplementedError
+
+    def score_frame(self, df: pd.DataFrame, p: Dict) -> Optional[pd.DataFrame]:
+        """Vectorized alternative to :meth:`score`: output columns for the kept rows"""
+        return None
+
+    # ------------------------------------------------------------------
+    # Engine
+    # ------------------------------------------------------------------
+    async def execute(self, params: Dict = None) -> List[Dict]:
+        p = {**self.defaults, **(params or {})}
+        df, _ = await asyncio.gather(self._candidates(p), self.prepare(p))
+        if df.empty:
+            return []
+        df = await self._join_tables(df)
+        if df is None:
+            return []
+        df = self.prefilter(df, p)
+        if df.empty:
+            return []
+
+        table_columns = [c for columns in self.tables.values() for c in columns]
+        base = df.drop(columns=table_columns, errors="ignore")
+        panel_days = self.series(p).get(PANEL)
+        if panel_days:
+            p[PANEL] = await self.data_service.fetch_indicator_panel(df["stock_code"].tolist(), days=panel_days)
+        scored = self.score_frame(df, p)
+        if scored is not None:
+            results = [
+                {**base.loc[idx].to_dict(), **out}
+                for idx, out in zip(scored.index, scored.to_dict("records"))
+            ]
+        else:
+            results = await self._score_each(df, base, p)
+
+        results.sort(key=self._rank_key, reverse=not self.ascending)
+        return results[: self.top_k]
+
+    def _rank_key(self, stock: Dict) -> float:
+        value = stock.get(self.sort_key)
+        if value is None or pd.isna(value):
+            return float("inf") if self.ascending else float("-inf")
+        return value
+
+    async def _candidates(self, p: Dict) -> pd.DataFrame:
+        conditions = self.conditions(p)
+        if conditions is not None:
+            rows = await self.filter_engine.apply_filter(conditions)
+        else:
+            rows = await self.data_service.fetch_market_snapshot()
+        df = pd.DataFrame(rows or [])
+        return df.reset_index(drop=True) if "stock_code" in df.columns else pd.DataFrame()
+
+    async def _join_tables(self, df: pd.DataFrame) -> Optional[pd.DataFrame]:
+        """Left-join the declared table columns; None when a required table is unavailable"""
+        names = list(self.tables)
+        loaded = await asyncio.gather(*(self._table_frame(name) for name in names))
+        for name, frame in zip(names, loaded):
+            if frame is None:
+                logger.warning(f"{type(self).__name__}: {name} table unavailable")
+                return None
+            columns = self.tables[name]
+            df = df.drop(columns=[c for c in columns if c in df.columns])
+            df = df.join(frame[columns], on="stock_code")
+        return df
+
+    async def _table_frame(self, name: str) -> Optional[pd.DataFrame]:
+        """A market-wide table as a frame indexed by stock_code"""
+        if name == FINANCIAL_FACTORS:
+            return await self.data_service.fetch_financial_factors()
+        loaders = {
+            CAPITAL_FLOW: self.data_service.fetch_capital_flow_table,
+            NORTHBOUND: self.data_service.fetch_northbound_holding_table,
+        }
+        table = await loaders[name]()
+        return table.frame if table else None
+
+    async def _score_each(self, df: pd.DataFrame, base: pd.DataFrame, p: Dict) -> List[Dict]:
+        codes = df["stock_code"].tolist()
+        data = await self._enrich(codes, p)
+        results = []
+        for stock, row in zip(df.to_dict("records"), base.to_dict("records")):
+            code = stock["stock_code"]
+            inputs = {name: values.get(code) for name, values in data.items()}
+            if KLINE in inputs and inputs[KLINE] is not None:
+                inputs[KLINE] = pd.DataFrame(inputs[KLINE])
+            try:
+                out = self.score(stock, inputs, p)
+            except Exception as e:
+                logger.debug(f"{type(self).__name__}: scoring {code} failed: {e}")
+                continue
+            if out is not None:
+                row.update(out)
+                results.append(row)
+        return results
+
+    async def _enrich(self, codes: List[str], p: Dict) -> Dict[str, Dict[str, Any]]:
+        """One batched, concurrent fetch per declared per-stock dataset"""
+        plan = self.series(p)
+        batches = {}
+        if KLINE in plan:
+            batches[KLINE] = self.data_service.fetch_kline_batch(codes, period="1d", days=plan[KLINE])
+        if FINANCIAL in plan:
+            batches[FINANCIAL] = self.data_service.fetch_financial_batch(codes, years=plan[FINANCIAL])
+        collected = await asyncio.gather(*(_collect(batch) for batch in batches.values()))
+        return dict(zip(batches, collected))
+
+
+async def _collect(batch: AsyncIterator[Tuple[str, Any]]) -> Dict[str, Any]:
+    return {code: value async for code, value in batch}
@@ -1,8 +1,8 @@
 # backend/app/schemas/strategy.py
 from enum import Enum
-from typing import Dict, List, Optional, Literal
+from typing import Dict, List, Optional, Literal, Union
 
-from pydantic import BaseModel, Field, field_validator
+from pydantic import BaseModel, Field, field_validator, model_validator
 
 class ConditionOperator(str, Enum):
     GT = ">"
@@ -10,22 +10,50 @@ class ConditionOperator(str, Enum):
     GTE = ">="
     LTE = "<="
     EQ = "=="
+    NE = "!="
     BETWEEN = "between"
+    IN = "in"
+
+FILTER_FIELDS = {
+    # Real-time market data
+    'pe', 'pb', 'market_cap', 'circulating_market_cap',
+    'price', 'pct_change', 'volume', 'amount', 'amplitude',
+    'volume_ratio', 'turnover_rate', 'change_60d', 'change_ytd',
+    # Financial data
+    'roe', 'debt_ratio', 'current_ratio', 'eps',
+    'revenue_growth', 'net_profit_growth', 'dividend_yield',
+    'gross_margin', 'net_margin',
+    # Technical factors (precomputed after the close)
+    'rsi', 'macd_dif', 'macd_dea', 'kdj_k', 'kdj_d',
+    'ma5', 'ma10', 'ma20', 'ma60',
+}
+
+def _check_field(name: str) -> str:
+    if name not in FILTER_FIELDS:
+        raise ValueError(f'Invalid field name: {name}. Allowed: {FILTER_FIELDS}')
+    return name
 
 class FilterCondition(BaseModel):
     field: str = Field(..., description="Field name (e.g., 'pe', 'roe', 'market_cap')")
     operator: ConditionOperator
-    value: float | List[float]
+    value: Optional[float | List[float]] = None
+    value_field: Optional[str] = Field(default=None, description="Compare against another field (e.g. ma5 > ma20)")
+    negate: bool = Field(default=False, description="NOT: match stocks failing the condition")
 
     @field_validator('value')
     @classmethod
     def validate_value_for_operator(cls, v, info):
         operator = info.data.get('operator')
+        if v is None:
+            return v
         if operator == ConditionOperator.BETWEEN:
             if not isinstance(v, list) or len(v) != 2:
                 raise ValueError('BETWEEN operator requires exactly 2 values')
             if not all(isinstance(x, (int, float)) for x in v):
                 raise ValueError('BETWEEN values must be numbers')
+        elif operator == ConditionOperator.IN:
+            if not isinstance(v, list) or not v:
+                raise ValueError('IN operator requires a non-empty list of values')
         else:
             if isinstance(v, list):
                 raise ValueError(f'{operator.value} operator requires a single value, not a list')
@@ -34,22 +62,29 @@ class FilterCondition(BaseModel):
     @field_validator('field')
     @classmethod
     def validate_field_name(cls, v):
-        allowed_fields = {
-            # Real-time market data
-            'pe', 'pb', 'market_cap', 'circulating_market_cap',
-            'price', 'pct_change', 'volume', 'amount', 'amplitude',
-            'volume_ratio', 'turnover_rate', 'change_60d', 'change_ytd',
-            # Financial data
-            'roe', 'debt_ratio', 'current_ratio', 'eps',
-            'revenue_growth', 'net_profit_growth', 'dividend_yield',
-            'gross_margin', 'net_margin',
-        }
-        if v not in allowed_fields:
-            raise ValueError(f'Invalid field name: {v}. Allowed: {allowed_fields}')
-        return v
+        return _check_field(v)
+
+    @field_validator('value_field')
+    @classmethod
+    def validate_value_field(cls, v):
+        return v if v is None else _check_field(v)
+
+    @model_validator(mode='after')
+    def validate_operand(self):
+        if (self.value is None) == (self.value_field is None):
+            raise ValueError('A condition requires exactly one of value or value_field')
+        if self.value_field is not None and self.operator in (ConditionOperator.BETWEEN, ConditionOperator.IN):
+            raise ValueError(f'{self.operator.value} operator cannot compare against a field')
+        return self
+
+class ConditionGroup(BaseModel):
+    """Nested AND/OR group of conditions, optionally negated"""
+    conditions: List[Union[FilterCondition, 'ConditionGroup']] = Field(..., min_length=1)
+    logic: Literal["AND", "OR"] = "AND"
+    negate: bool = False
 
 class StrategyConditions(BaseModel):
-    conditions: List[FilterCondition]
+    conditions: List[Union[FilterCondition, ConditionGroup]]
     logic: Literal["AND", "OR"] = "AND"
 
 class StrategyExecuteRequest(BaseModel):
@@ -77,6 +112,28 @@ class StrategyExecuteRequest(BaseModel):
             raise ValueError('Custom strategy requires conditions')
         return v
 
+class StrategyEstimateRequest(BaseModel):
+    conditions: StrategyConditions
+    apply_risk_filters: bool = True
+    include_industries: Optional[List[str]] = Field(default=None, description="Only include stocks in these industries (申万行业)")
+    exclude_industries: Optional[List[str]] = Field(default=None, description="Exclude stocks in these industries")
+
+class ConditionEstimate(BaseModel):
+    condition: Dict
+    matches: Optional[int] = None
+    known: Optional[int] = Field(default=None, description="Stocks with a value for the condition's field(s)")
+    selectivity: Optional[float] = None
+    available: bool = Field(default=True, description="False when a field's factor table is not built yet")
+
+class StrategyEstimateResponse(BaseModel):
+    version: str = Field(..., description="Market snapshot version the counts are based on")
+    universe: int
+    logic: Literal["AND", "OR"]
+    matches: Optional[int] = Field(default=None, description="None when any condition is unavailable")
+    selectivity: Optional[float] = None
+    conditions: List[ConditionEstimate]
+    unavailable_fields: List[str] = Field(default_factory=list)
+
 class StockPickResult(BaseModel):
     stock_code: str
     stock_name: str
@@ -13,7 +13,9 @@ class ParsedCondition(BaseModel):
     """解析后的条件"""
     field: str
     operator: str
-    value: float | List[float]
+    value: Optional[float | List[float]] = None
+    value_field: Optional[str] = None  # 与另一字段比较（如 ma5 > ma20）
+    negate: bool = False  # NOT：取反
     description: str  # 条件的中文描述
 
 
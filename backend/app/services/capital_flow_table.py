@@ -0,0 +1,100 @@
+# backend/app/services/capital_flow_table.py
+"""Market-wide capital-flow table.
+
+Built from the fund-flow ranking endpoint (``stock_individual_fund_flow_rank``)
+for the 今日 / 5日 / 10日 windows — three upstream calls for every listed
+stock — instead of one full-history ``stock_individual_fund_flow`` call per
+stock. Each build is a :class:`DailyTable` for its trade date.
+
+The ranking has no 20-day window; each trading day's main net inflow is kept
+as a small daily column and the 20-day figure is summed from the latest 20
+of them (None until that much history exists).
+"""
+from datetime import datetime, timedelta
+from functools import partial
+from typing import Dict, List, Optional
+
+import pandas as pd
+
+from app.services.daily_table import DailyTable, DailyTableHolder
+from app.utils import columnar
+
+FLOW_HISTORY_DAYS = 20
+
+# ranking column suffix → output field
+_FLOW_FIELDS = {
+    "主力净流入-净额": "main_net_inflow",
+    "主力净流入-净占比": "main_net_inflow_pct",
+    "超大单净流入-净额": "super_large_net_inflow",
+    "大单净流入-净额": "large_net_inflow",
+    "中单净流入-净额": "medium_net_inflow",
+    "小单净流入-净额": "small_net_inflow",
+}
+_WINDOW_FIELDS = ["主力净流入-净额", "超大单净流入-净额", "大单净流入-净额"]
+
+# ranking indicator → (field suffix, ranking columns to keep)
+RANK_WINDOWS = {
+    "今日": ("", list(_FLOW_FIELDS)),
+    "5日": ("_5d", _WINDOW_FIELDS),
+    "10日": ("_10d", _WINDOW_FIELDS),
+}
+
+FLOW_COLUMNS = [
+    _FLOW_FIELDS[name] + suffix
+    for suffix, names in RANK_WINDOWS.values()
+    for name in names
+] + ["main_net_inflow_20d"]
+
+
+def latest_trade_date(now: Optional[datetime] = None) -> str:
+    """Trade date the ranking currently reports: today once the market has opened, else the previous weekday"""
+    now = now or datetime.now()
+    day = now.date()
+    if now.weekday() < 5 and now.time() < datetime.strptime("09:30", "%H:%M").time():
+        day -= timedelta(days=1)
+    while day.weekday() >= 5:
+        day -= timedelta(days=1)
+    return day.isoformat()
+
+
+def _window_frame(df: pd.DataFrame, indicator: str) -> pd.DataFrame:
+    suffix, names = RANK_WINDOWS[indicator]
+    col = partial(columnar.column, df)
+    out = pd.DataFrame({"stock_code": columnar.normalize_code(col("代码", ""))})
+    for name in names:
+        out[_FLOW_FIELDS[name] + suffix] = columnar.to_float(col(f"{indicator}{name}", None), default=None)
+    out = out[out["stock_code"] != ""]
+    return out.drop_duplicates("stock_code").set_index("stock_code")
+
+
+def flow_frame(frames: Dict[str, pd.DataFrame]) -> pd.DataFrame:
+    """Join the ranking windows into one frame indexed by stock_code (今日 is required)"""
+    today = _window_frame(frames["今日"], "今日")
+    others = [_window_frame(df, ind) for ind, df in frames.items() if ind != "今日" and df is not None]
+    merged = today.join(others, how="left") if others else today
+    return merged.reindex(columns=FLOW_COLUMNS)
+
+
+def sum_daily_flows(today: pd.Series, history: List[Dict]) -> Optional[pd.Series]:
+    """20-day main net inflow: today plus the previous 19 daily columns, or None without enough history"""
+    if len(history) < FLOW_HISTORY_DAYS - 1:
+        return None
+    total = today.fillna(0.0)
+    for day in history[:FLOW_HISTORY_DAYS - 1]:
+        prior = pd.Series(day.get("main") or [], index=day.get("codes") or [], dtype=float)
+        total = total.add(prior[~prior.index.duplicated()], fill_value=0.0)
+    return total.reindex(today.index)
+
+
+class CapitalFlowTable(DailyTable):
+    """Market-wide flow table for one trade date"""
+
+    def daily_column(self) -> Dict:
+        """This day's main net inflow, the input for later 20-day sums"""
+        return {
+            "codes": [r["stock_code"] for r in self.rows],
+            "main": [r.get("main_net_inflow") or 0.0 for r in self.rows],
+        }
+
+
+capital_flow_holder = DailyTableHolder()
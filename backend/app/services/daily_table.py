@@ -0,0 +1,88 @@
+# backend/app/services/daily_table.py
+"""Per-trade-date, per-stock tables built from market-wide upstream endpoints.
+
+A table is one row per stock for one trade date, stored in Redis as a single
+column-oriented payload and decoded once per process into a code index, so
+lookups are dict hits and strategies can filter the whole market as a frame.
+"""
+import time
+from typing import Dict, Iterable, List, Optional, Type, TypeVar
+
+import pandas as pd
+
+from app.utils import columnar
+
+T = TypeVar("T", bound="DailyTable")
+
+
+class DailyTable:
+    """Immutable per-trade-date table with O(1) code lookups"""
+
+    def __init__(self, rows: List[Dict], trade_date: str, built_at: Optional[float] = None):
+        self.rows = rows
+        self.trade_date = trade_date
+        self.built_at = built_at if built_at is not None else time.time()
+        self.loaded_at = time.time()
+        self.by_code: Dict[str, Dict] = {r.get("stock_code"): r for r in rows}
+        self._frame: Optional[pd.DataFrame] = None
+
+    @classmethod
+    def from_frame(cls: Type[T], frame: pd.DataFrame, trade_date: str) -> T:
+        """Frame indexed by stock_code → table, with a constant ``date`` column"""
+        out = frame.reset_index()
+        out.insert(1, "date", trade_date)
+        return cls(columnar.to_records(out), trade_date)
+
+    def __len__(self) -> int:
+        return len(self.rows)
+
+    @property
+    def frame(self) -> pd.DataFrame:
+        """Columnar view indexed by stock_code (built lazily)"""
+        if self._frame is None:
+            self._frame = pd.DataFrame(self.rows).set_index("stock_code", drop=False)
+        return self._frame
+
+    def age(self) -> float:
+        """Seconds since the table was built upstream"""
+        return time.time() - self.built_at
+
+    def get(self, stock_code: str) -> Optional[Dict]:
+        return self.by_code.get(stock_code)
+
+    def get_many(self, stock_codes: Iterable[str]) -> List[Dict]:
+        by_code = self.by_code
+        return [by_code[c] for c in stock_codes if c in by_code]
+
+    def to_payload(self) -> Dict:
+        """Column-oriented form for Redis: field names are written once"""
+        keys = list(self.rows[0]) if self.rows else []
+        return {
+            "trade_date": self.trade_date,
+            "built_at": self.built_at,
+            "columns": {k: [r.get(k) for r in self.rows] for k in keys},
+        }
+
+    @classmethod
+    def from_payload(cls: Type[T], payload: Dict) -> T:
+        columns = payload.get("columns") or {}
+        rows = [dict(zip(columns, values)) for values in zip(*columns.values())]
+        return cls(rows, payload.get("trade_date", ""), payload.get("built_at"))
+
+
+class DailyTableHolder:
+    """Holds the current decoded table of one kind for this process"""
+
+    def __init__(self):
+        self._current: Optional[DailyTable] = None
+
+    @property
+    def current(self) -> Optional[DailyTable]:
+        return self._current
+
+    def publish(self, table: T) -> T:
+        self._current = table
+        return table
+
+    def clear(self):
+        self._current = None
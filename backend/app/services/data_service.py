@@ -1,29 +1,124 @@
 # backend/app/services/data_service.py
 import asyncio
-import json
 import time
 import akshare as ak
 import pandas as pd
 import numpy as np
 import logging
-from typing import List, Dict, Optional
-from datetime import datetime, timedelta
+from functools import partial
+from typing import Any, AsyncIterator, Awaitable, Callable, Iterable, List, Dict, Optional, Set, Tuple
+from datetime import date, datetime, timedelta
+from app.core import codec
+from app.core.cache import cache_mget, get_async_redis
+from app.core import executors, upstream
+from app.core.config import settings
+from app.core.hedging import HedgePolicy
+from app.core.upstream import is_transient
+from app.core.memory_cache import BoundedMemoryCache
+from app.utils import columnar
+from app.utils.singleflight import SingleFlight
+from app.services.market_snapshot import MarketSnapshot, snapshot_holder
+from app.services.capital_flow_table import (
+    RANK_WINDOWS,
+    CapitalFlowTable,
+    capital_flow_holder,
+    flow_frame,
+    latest_trade_date,
+    sum_daily_flows,
+)
+from app.services.factor_store import FactorStore
+from app.services.financial_factors import (
+    FINANCIAL_FACTOR_TABLE,
+    FINANCIAL_MIN_COVERAGE,
+    annual_period,
+    choose_period,
+    financial_factor_frame,
+    merge_with_previous,
+    report_periods,
+)
+from app.services.northbound_holdings import (
+    NorthboundHoldingTable,
+    disclosure_date,
+    holdings_frame,
+    northbound_holder,
+)
+from app.services.indicator_panel import IndicatorPanel, load_panel
+from app.services.negative_cache import negative_cache
+from app.services.technical_factors import (
+    TECHNICAL_FACTOR_DAYS,
+    TECHNICAL_FACTOR_TABLE,
+    technical_factor_frame,
+)
+from app.services.reference_data import exchange_symbol, reference_registry
+from app.services.kline_store import (
+    KlineStore,
+    adjust_bars,
+    bar_from_quote,
+    bars_from_frame,
+    bars_to_records,
+    factors_from_frame,
+)
 
 logger = logging.getLogger(__name__)
 
 # ---------------------------------------------------------------------------
 # In-memory L2 cache (for data that rarely changes / fallback)
 # ---------------------------------------------------------------------------
-_memory_cache: Dict[str, dict] = {}   # key → {"data": ..., "ts": float}
+_MB = 1024 * 1024
+# Per-namespace byte quotas so per-stock keys cannot crowd out market-wide ones
+MEMORY_CACHE_QUOTAS = {
+    "data:financial": 48 * _MB,
+    "data:capital_flow": 16 * _MB,
+    "data:valuation_hist": 8 * _MB,
+    "data:peers": 8 * _MB,
+    "data:news": 32 * _MB,
+    "data:northbound_hold": 8 * _MB,
+}
+_memory_cache = BoundedMemoryCache(
+    max_bytes=settings.MEMORY_CACHE_MAX_MB * _MB,
+    default_ttl=settings.MEMORY_CACHE_TTL,
+    namespace_quotas=MEMORY_CACHE_QUOTAS,
+)
+
+# Coalesces concurrent upstream fetches per cache key (one AKShare call in flight)
+_inflight = SingleFlight()
+# Strong refs to refresh-ahead tasks so they are not garbage-collected mid-flight
+_background_refreshes: Set[asyncio.Task] = set()
+# On-disk K-line history, synced incrementally and sliced per request
+kline_store = KlineStore(settings.KLINE_STORE_DIR)
+factor_store = FactorStore(settings.FACTOR_STORE_DIR)
 
 SNAPSHOT_CACHE_KEY = "market:snapshot"
-SNAPSHOT_TTL = 30           # Redis TTL seconds (real-time, refresh often)
-SNAPSHOT_MEMORY_TTL = 120   # L2 memory fallback TTL
+SNAPSHOT_VERSION_KEY = "market:snapshot:version"
+SNAPSHOT_TTL = 30           # soft TTL: older snapshots are served while refreshing
+SNAPSHOT_MEMORY_TTL = 120   # hard TTL for the Redis payload and L2 memory copy
+SNAPSHOT_CHANNEL = "market:snapshot:events"  # pub/sub: new snapshot versions
+GATEWAY_HEARTBEAT_KEY = "market:gateway:heartbeat"
 SECTOR_TTL = 300            # sectors change slower
 STOCK_LIST_TTL = 3600       # stock list changes daily at most
-KLINE_TTL = 600
+KLINE_TTL = 600            # local K-line store is re-synced at most this often
+EOD_HOLIDAY_SAMPLE = 200   # stocks checked to tell a holiday snapshot from a new session
+KLINE_PERIOD_MAP = {'1d': 'daily', '1w': 'weekly', '1M': 'monthly'}
 FINANCIAL_TTL = 3600
 CAPITAL_FLOW_TTL = 300
+CAPITAL_FLOW_TABLE_KEY = "data:capital_flow:table"
+CAPITAL_FLOW_DAILY_KEY = "data:capital_flow:daily:{}"
+NORTHBOUND_TABLE_KEY = "data:northbound_hold:table"
+NORTHBOUND_DAILY_KEY = "data:northbound_hold:table:{}"
+NORTHBOUND_TABLE_TTL = 3600  # holdings change once a day; re-read the shared copy hourly
+
+# Hard TTLs for refresh-ahead keys (soft TTL is the matching *_TTL above)
+SECTOR_HARD_TTL = 1800
+STOCK_LIST_HARD_TTL = 86400
+MARKET_CAPITAL_FLOW_HARD_TTL = 1800
+CAPITAL_FLOW_HARD_TTL = 1800
+CAPITAL_FLOW_HISTORY_TTL = 40 * 86400  # daily main-flow columns kept for the 20-day sum
+NORTHBOUND_HISTORY_TTL = 40 * 86400
+
+# Multi-source fetchers: the fallback starts once the primary exceeds its p90
+# (these initial delays apply until enough latencies have been observed)
+FINANCIAL_HEDGE = HedgePolicy("financial", initial_delay=3.0)
+STOCK_LIST_HEDGE = HedgePolicy("stock_list", initial_delay=15.0)
 
 
 def _safe_float(value, default: float = 0.0) -> float:
@@ -41,33 +136,6 @@ def _safe_float(value, default: float = 0.0) -> float:
         return default
 
 
-def _parse_cn_amount(value, default: float = 0.0) -> float:
-    """Parse Chinese amount strings like '5.89亿', '-5789.53万' to float (yuan)"""
-    try:
-        if value is False or value is None:
-            return default
-        if pd.isna(value) or value == '' or value == '-':
-            return default
-        s = str(value).strip()
-        if s.endswith('亿'):
-            return float(s[:-1]) * 1e8
-        elif s.endswith('万'):
-            return float(s[:-1]) * 1e4
-        return float(s)
-    except (ValueError, TypeError):
-        return default
-
-
-def _safe_int(value, default: int = 0) -> int:
-    """Safely convert value to int"""
-    try:
-        if pd.isna(value) or value == '' or value == '-':
-            return default
-        return int(float(value))
-    except (ValueError, TypeError):
-        return default
-
-
 def _normalize_stock_code(value) -> str:
     """Normalize stock code to 6-digit string.
 
@@ -91,18 +159,18 @@ def _normalize_stock_code(value) -> str:
     return digits.zfill(6)
 
 
-def _mem_get(key: str, ttl: int = 120):
-    """Get from in-memory L2 cache"""
-    entry = _memory_cache.get(key)
-    if entry and (time.time() - entry["ts"]) < ttl:
-        return entry["data"]
-    return None
-
-
-def _mem_set(key: str, data):
-    """Set to in-memory L2 cache"""
-    _memory_cache[key] = {"data": data, "ts": time.time()}
 
+def _repeats_last_session(rows: List[Dict], day: date) -> bool:
+    """Whether most sampled stocks' snapshot bars reproduce their stored last session"""
+    step = max(1, len(rows) // EOD_HOLIDAY_SAMPLE)
+    checked = repeated = 0
+    for quote in rows[::step]:
+        bar = bar_from_quote(quote, day) if quote.get("stock_code") else None
+        if bar is None:
+            continue
+        checked += 1
+        repeated += kline_store.repeats_last_session(quote["stock_code"], bar, quote.get("pre_close") or 0.0)
+    return checked > 0 and repeated > checked / 2
 
 class DataService:
     """Data service with Redis L1 + memory L2 caching and AKShare fallback."""
@@ -110,151 +178,301 @@ class DataService:
     def __init__(self):
         self._redis = None
 
-    @property
-    def redis(self):
-        """Lazy-init Redis client (tolerate unavailable Redis)."""
+    async def _get_redis(self):
+        """Pooled asyncio Redis client for the running loop, or None if unavailable.
+
+        Availability is probed once per service; the client itself is resolved per
+        call because redis.asyncio connections are bound to their event loop.
+        """
         if self._redis is None:
             try:
-                from app.core.cache import redis_client
-                redis_client.ping()
-                self._redis = redis_client
+                await get_async_redis().ping()
+                self._redis = True
             except Exception:
                 self._redis = False  # sentinel: Redis unavailable
-        return self._redis if self._redis is not False else None
+        if self._redis is True:
+            return get_async_redis()
+        return self._redis or None
 
     # ------------------------------------------------------------------
     # Redis helpers with fallback
     # ------------------------------------------------------------------
-    def _cache_get(self, key: str):
+    async def _cache_get(self, key: str):
         """Try Redis → memory fallback."""
         try:
-            if self.redis:
-                val = self.redis.get(key)
+            redis = await self._get_redis()
+            if redis:
+                val = await redis.get(key)
                 if val:
-                    return json.loads(val)
+                    return codec.decode(val)
         except Exception as e:
             logger.debug(f"Redis get miss for {key}: {e}")
         return None
 
-    def _cache_set(self, key: str, data, ttl: int = 60):
+    async def _cache_set(self, key: str, data, ttl: int = 60):
         """Write to Redis + memory."""
-        _mem_set(key, data)
+        _memory_cache.set(key, data)
         try:
-            if self.redis:
-                self.redis.setex(key, ttl, json.dumps(data, default=str))
+            redis = await self._get_redis()
+            if redis:
+                await redis.setex(key, ttl, codec.encode(data))
         except Exception as e:
             logger.debug(f"Redis set fail for {key}: {e}")
 
+    async def _cache_get_with_age(self, key: str, hard_ttl: int) -> Tuple[Any, float]:
+        """Try Redis → memory, returning (data, age in seconds) within the hard TTL.
+
+        Redis age is derived from the remaining TTL of a key written with ``hard_ttl``.
+        """
+        try:
+            redis = await self._get_redis()
+            if redis:
+                async with redis.pipeline(transaction=False) as pipe:
+                    pipe.get(key)
+                    pipe.ttl(key)
+                    val, remaining = await pipe.execute()
+                if val:
+                    age = hard_ttl - remaining if isinstance(remaining, int) and remaining > 0 else 0
+                    return codec.decode(val), max(age, 0)
+        except Exception as e:
+            logger.debug(f"Redis get miss for {key}: {e}")
+
+        data, age = _memory_cache.get_with_age(key)
+        if data and age < hard_ttl:
+            return data, age
+        return None, 0.0
+
+    def _refresh_in_background(self, key: str, loader: Callable[[], Awaitable]):
+        """Schedule a coalesced refresh of ``key`` unless one is already running."""
+        if _inflight.in_flight(key):
+            return
+        task = asyncio.ensure_future(_inflight.do(key, loader))
+        _background_refreshes.add(task)
+        task.add_done_callback(_background_refreshes.discard)
+
+    async def _get_refresh_ahead(
+        self, key: str, loader: Callable[[], Awaitable], soft_ttl: int, hard_ttl: int
+    ):
+        """Stale-while-revalidate read.
+
+        Within ``soft_ttl`` the cached value is returned as-is; between the soft and
+        hard TTL it is still returned immediately while a background task reloads it.
+        Only a miss past the hard TTL blocks on the (coalesced) loader.
+        """
+        data, age = await self._cache_get_with_age(key, hard_ttl)
+        if data:
+            if age >= soft_ttl:
+                self._refresh_in_background(key, loader)
+            return data
+        return await _inflight.do(key, loader)
+
+    async def _load_unless_negative(
+        self, dataset: str, code: str, key: str, loader: Callable[[], Awaitable]
+    ):
+        """Coalesced ``loader`` call, skipped (None) while ``code`` is negatively cached for ``dataset``."""
+        if await negative_cache.is_negative(dataset, code, await self._get_redis()):
+            return None
+        return await _inflight.do(key, partial(self._load_and_record, dataset, code, key, loader))
+
+    async def _load_and_record(
+        self, dataset: str, code: str, key: str, loader: Callable[[], Awaitable]
+    ):
+        """Run ``loader`` and remember an empty result so the upstream is not asked again soon."""
+        try:
+            result = await loader()
+        except Exception as e:
+            # Transient upstream failure (or open circuit): says nothing about the
+            # code itself; serve whatever stale copy this process still holds
+            logger.warning(f"Upstream unavailable for {dataset} {code}: {e}")
+            return _memory_cache.get(key)
+        redis = await self._get_redis()
+        if result:
+            await negative_cache.record_hit(dataset, code, redis)
+        else:
+            await negative_cache.record_miss(dataset, code, redis)
+        return result
+
+    # ------------------------------------------------------------------
+    # Frame conversion (whole columns at once, run inside the worker thread)
     # ------------------------------------------------------------------
-    # Row conversion
-    # ------------------------------------------------------------------
-    def _row_to_full_quote(self, row) -> Dict:
-        """Convert a single row from stock_zh_a_spot_em to a full quote dict"""
-        return {
-            "stock_code": _normalize_stock_code(row["代码"]),
-            "stock_name": str(row["名称"]),
-            "price": _safe_float(row["最新价"]),
-            "change": _safe_float(row["涨跌额"]),
-            "pct_change": _safe_float(row["涨跌幅"]),
-            "volume": _safe_int(row["成交量"]),
-            "amount": _safe_float(row["成交额"]),
-            "amplitude": _safe_float(row["振幅"]),
-            "high": _safe_float(row["最高"]),
-            "low": _safe_float(row["最低"]),
-            "open": _safe_float(row["今开"]),
-            "pre_close": _safe_float(row["昨收"]),
-            "volume_ratio": _safe_float(row["量比"]),
-            "turnover_rate": _safe_float(row["换手率"]),
-            "pe": _safe_float(row["市盈率-动态"], default=None),
-            "pb": _safe_float(row["市净率"], default=None),
-            "market_cap": _safe_float(row["总市值"]),
-            "circulating_market_cap": _safe_float(row["流通市值"]),
-            "change_speed": _safe_float(row["涨速"]),
-            "change_5min": _safe_float(row["5分钟涨跌"]),
-            "change_60d": _safe_float(row["60日涨跌幅"]),
-            "change_ytd": _safe_float(row["年初至今涨跌幅"]),
-            "timestamp": datetime.now().isoformat()
-        }
+    @staticmethod
+    def _snapshot_to_records(df: pd.DataFrame) -> List[Dict]:
+        """Convert the stock_zh_a_spot_em frame to full quote dicts in one pass"""
+        col = partial(columnar.column, df)
+        out = pd.DataFrame({
+            "stock_code": columnar.normalize_code(col("代码", "")),
+            "stock_name": columnar.to_text(col("名称", "")),
+            "price": columnar.to_float(col("最新价")),
+            "change": columnar.to_float(col("涨跌额")),
+            "pct_change": columnar.to_float(col("涨跌幅")),
+            "volume": columnar.to_int(col("成交量")),
+            "amount": columnar.to_float(col("成交额")),
+            "amplitude": columnar.to_float(col("振幅")),
+            "high": columnar.to_float(col("最高")),
+            "low": columnar.to_float(col("最低")),
+            "open": columnar.to_float(col("今开")),
+            "pre_close": columnar.to_float(col("昨收")),
+            "volume_ratio": columnar.to_float(col("量比")),
+            "turnover_rate": columnar.to_float(col("换手率")),
+            "pe": columnar.to_float(col("市盈率-动态", None), default=None),
+            "pb": columnar.to_float(col("市净率", None), default=None),
+            "market_cap": columnar.to_float(col("总市值")),
+            "circulating_market_cap": columnar.to_float(col("流通市值")),
+            "change_speed": columnar.to_float(col("涨速")),
+            "change_5min": columnar.to_float(col("5分钟涨跌")),
+            "change_60d": columnar.to_float(col("60日涨跌幅")),
+            "change_ytd": columnar.to_float(col("年初至今涨跌幅")),
+        })
+        out["timestamp"] = datetime.now().isoformat()
+        return columnar.to_records(out)
+
+    @staticmethod
+    def _code_name_records(df: pd.DataFrame, code_col: str, name_col: str) -> List[Dict]:
+        """Convert a code/name listing frame to stock list dicts"""
+        out = pd.DataFrame({
+            "stock_code": columnar.normalize_code(df[code_col]),
+            "stock_name": columnar.to_text(df[name_col]),
+        })
+        return columnar.to_records(out)
 
     # ------------------------------------------------------------------
     # Market snapshot (with Redis L1 + memory L2 caching)
     # ------------------------------------------------------------------
-    async def fetch_market_snapshot(self) -> List[Dict]:
-        """Fetch full market snapshot with all fields.
+    async def _store_snapshot(self, rows: List[Dict]) -> MarketSnapshot:
+        """Publish a fresh snapshot: Redis payload + version key, then the local holder."""
+        version = str(time.time_ns())
+        try:
+            redis = await self._get_redis()
+            if redis:
+                async with redis.pipeline() as pipe:
+                    pipe.setex(SNAPSHOT_CACHE_KEY, SNAPSHOT_MEMORY_TTL, codec.encode(rows))
+                    pipe.setex(SNAPSHOT_VERSION_KEY, SNAPSHOT_MEMORY_TTL, version)
+                    pipe.publish(SNAPSHOT_CHANNEL, version)
+                    await pipe.execute()
+        except Exception as e:
+            logger.debug(f"Redis set fail for {SNAPSHOT_CACHE_KEY}: {e}")
+        return snapshot_holder.publish(rows, version)
+
+    async def get_cached_snapshot_view(self) -> Optional[MarketSnapshot]:
+        """Return the decoded snapshot ONLY if already cached (no API call).
 
-        Cache chain: Redis (30s) → Memory (120s) → AKShare API.
+        Checks the small Redis version key and decodes the payload only when
+        another process has published a new version since our last decode.
         """
-        # L1: Redis
-        cached = self._cache_get(SNAPSHOT_CACHE_KEY)
-        if cached:
-            return cached
+        try:
+            redis = await self._get_redis()
+            if redis:
+                version = await redis.get(SNAPSHOT_VERSION_KEY)
+                if isinstance(version, bytes):
+                    version = version.decode()
+                if version:
+                    view = await snapshot_holder.resolve(
+                        version, partial(self._cache_get, SNAPSHOT_CACHE_KEY)
+                    )
+                    if view:
+                        return view
+        except Exception as e:
+            logger.debug(f"Redis snapshot version check failed: {e}")
 
-        # L2: memory
-        mem = _mem_get(SNAPSHOT_CACHE_KEY, SNAPSHOT_MEMORY_TTL)
-        if mem:
-            return mem
+        # L2: this process's last decoded/fetched snapshot, within the memory TTL
+        current = snapshot_holder.current
+        if current and current.age() < SNAPSHOT_MEMORY_TTL:
+            return current
+        return None
 
-        # L3: AKShare (run in thread to avoid blocking event loop)
+    async def fetch_snapshot_view(self) -> Optional[MarketSnapshot]:
+        """Fetch the market snapshot as an indexed view.
+
+        Cache chain: Redis (decoded once per version) → Memory → AKShare API.
+        Snapshots older than SNAPSHOT_TTL are served while a background refresh
+        runs; callers only block when nothing younger than SNAPSHOT_MEMORY_TTL exists.
+
+        In ``consumer`` mode the market gateway owns the upstream fetch and this
+        process only reads what it publishes; AKShare is called directly only
+        while the gateway heartbeat is missing.
+        """
+        view = await self.get_cached_snapshot_view()
+        if settings.MARKET_DATA_MODE == "consumer":
+            if view:
+                return view
+            if await self._gateway_alive():
+                return snapshot_holder.current
+            logger.warning("Market gateway heartbeat missing, fetching snapshot directly")
+            return await _inflight.do(SNAPSHOT_CACHE_KEY, self._load_snapshot_view)
+        if view:
+            if view.age() >= SNAPSHOT_TTL:
+                self._refresh_in_background(SNAPSHOT_CACHE_KEY, self._load_snapshot_view)
+            return view
+        return await _inflight.do(SNAPSHOT_CACHE_KEY, self._load_snapshot_view)
+
+    async def _gateway_alive(self) -> bool:
         try:
-            df = await asyncio.to_thread(ak.stock_zh_a_spot_em)
-            results = [self._row_to_full_quote(row) for _, row in df.iterrows()]
-            self._cache_set(SNAPSHOT_CACHE_KEY, results, SNAPSHOT_TTL)
-            logger.info(f"Market snapshot fetched: {len(results)} stocks")
-            return results
+            redis = await self._get_redis()
+            return bool(redis and await redis.exists(GATEWAY_HEARTBEAT_KEY))
+        except Exception as e:
+            logger.debug(f"Gateway heartbeat check failed: {e}")
+            return False
+
+    async def refresh_snapshot(self) -> MarketSnapshot:
+        """Fetch the snapshot from AKShare and publish it (raises on upstream failure)"""
+        # fetch + convert in executor threads to avoid blocking the event loop
+        df = await upstream.call(ak.stock_zh_a_spot_em)
+        results = await executors.run_local(self._snapshot_to_records, df)
+        logger.info(f"Market snapshot fetched: {len(results)} stocks")
+        return await self._store_snapshot(results)
+
+    async def _load_snapshot_view(self) -> Optional[MarketSnapshot]:
+        # L3: AKShare
+        try:
+            return await self.refresh_snapshot()
         except Exception as e:
             logger.error(f"Error fetching market snapshot: {e}")
             # Final fallback: stale memory cache (ignore TTL)
-            stale = _memory_cache.get(SNAPSHOT_CACHE_KEY)
-            if stale:
+            if snapshot_holder.current:
                 logger.warning("Using stale memory cache for market snapshot")
-                return stale["data"]
-            return []
+                return snapshot_holder.current
+            return None
+
+    async def fetch_market_snapshot(self) -> List[Dict]:
+        """Fetch full market snapshot with all fields (list of quote dicts)."""
+        view = await self.fetch_snapshot_view()
+        return view.rows if view else []
 
     async def fetch_stock_list(self) -> List[Dict]:
         """Fetch A-share stock list from AKShare (cached 1h)"""
         cache_key = "data:stock_list"
-        cached = self._cache_get(cache_key)
-        if cached:
-            return cached
-
-        mem = _mem_get(cache_key, STOCK_LIST_TTL)
-        if mem:
-            return mem
+        return await self._get_refresh_ahead(
+            cache_key, partial(self._load_stock_list, cache_key), STOCK_LIST_TTL, STOCK_LIST_HARD_TTL
+        )
 
-        # Primary: SH + SZ exchange APIs (fast ~10s, avoids BSE proxy hang)
+    async def _load_stock_list(self, cache_key: str) -> List[Dict]:
+        # Primary: SH + SZ exchange APIs (fast ~10s, avoids BSE proxy hang);
+        # hedged with the East Money spot API (slower ~120s but comprehensive)
         try:
-            df_sh, df_sz = await asyncio.gather(
-                asyncio.to_thread(ak.stock_info_sh_name_code),
-                asyncio.to_thread(ak.stock_info_sz_name_code),
-            )
-            stocks = []
-            for _, row in df_sh.iterrows():
-                stocks.append({"stock_code": _normalize_stock_code(row["证券代码"]), "stock_name": str(row["证券简称"])})
-            for _, row in df_sz.iterrows():
-                stocks.append({"stock_code": _normalize_stock_code(row["证券代码"]), "stock_name": str(row["证券简称"])})
-            if stocks:
-                self._cache_set(cache_key, stocks, STOCK_LIST_TTL)
-                logger.info(f"Stock list fetched via SH+SZ: {len(stocks)} stocks")
-                return stocks
+            stocks = await STOCK_LIST_HEDGE.run([
+                ("exchange", self._exchange_stock_list),
+                ("spot_em", self._spot_stock_list),
+            ])
         except Exception as e:
-            logger.warning(f"SH+SZ stock list failed: {e}, trying fallback via spot_em")
-
-        # Fallback: East Money spot API (slower ~120s but comprehensive)
-        try:
-            df = await asyncio.to_thread(ak.stock_zh_a_spot_em)
-            stocks = [
-                {"stock_code": _normalize_stock_code(row["代码"]), "stock_name": str(row["名称"])}
-                for _, row in df.iterrows()
-            ]
-            if stocks:
-                self._cache_set(cache_key, stocks, STOCK_LIST_TTL)
-                logger.info(f"Stock list fallback via spot_em: {len(stocks)} stocks")
-                return stocks
-        except Exception as e2:
-            logger.error(f"Stock list fallback also failed: {e2}")
-
-        stale = _memory_cache.get(cache_key)
-        return stale["data"] if stale else []
+            logger.error(f"Stock list fetch failed from every source: {e}")
+            stocks = None
+        if stocks:
+            await self._cache_set(cache_key, stocks, STOCK_LIST_HARD_TTL)
+            logger.info(f"Stock list fetched: {len(stocks)} stocks")
+            return stocks
+        return _memory_cache.get(cache_key) or []
+
+    async def _exchange_stock_list(self) -> List[Dict]:
+        df_sh, df_sz = await asyncio.gather(
+            upstream.call(ak.stock_info_sh_name_code),
+            upstream.call(ak.stock_info_sz_name_code),
+        )
+        df = pd.concat([df_sh, df_sz], ignore_index=True)
+        return self._code_name_records(df, "证券代码", "证券简称")
+
+    async def _spot_stock_list(self) -> List[Dict]:
+        df = await upstream.call(ak.stock_zh_a_spot_em)
+        return self._code_name_records(df, "代码", "名称")
 
     async def get_all_stock_codes(self) -> List[str]:
         """Get all stock codes"""
@@ -264,80 +482,119 @@ class DataService:
     # ------------------------------------------------------------------
     # Real-time quotes (use cached snapshot when possible)
     # ------------------------------------------------------------------
-    def get_cached_snapshot(self) -> Optional[List[Dict]]:
+    async def get_cached_snapshot(self) -> Optional[List[Dict]]:
         """Return snapshot ONLY if already cached (no API call). For fast lookups."""
-        cached = self._cache_get(SNAPSHOT_CACHE_KEY)
-        if cached:
-            return cached
-        return _mem_get(SNAPSHOT_CACHE_KEY, SNAPSHOT_MEMORY_TTL)
+        view = await self.get_cached_snapshot_view()
+        return view.rows if view else None
 
     async def fetch_realtime_quote(self, stock_code: str) -> Optional[Dict]:
-        """Fetch real-time quote for a stock — uses cached snapshot."""
-        target_code = _normalize_stock_code(stock_code)
-        snapshot = await self.fetch_market_snapshot()
-        for s in snapshot:
-            if _normalize_stock_code(s.get("stock_code")) == target_code:
-                return s
-        return None
+        """Fetch real-time quote for a stock — index lookup on the cached snapshot."""
+        view = await self.fetch_snapshot_view()
+        if not view:
+            return None
+        quote = view.get(_normalize_stock_code(stock_code))
+        return dict(quote) if quote else None
 
     async def fetch_realtime_quotes_batch(self, stock_codes: List[str]) -> List[Dict]:
         """Fetch real-time quotes for multiple stocks — uses cached snapshot."""
-        code_set = {_normalize_stock_code(c) for c in stock_codes}
-        snapshot = await self.fetch_market_snapshot()
-        return [s for s in snapshot if _normalize_stock_code(s.get("stock_code")) in code_set]
+        view = await self.fetch_snapshot_view()
+        if not view:
+            return []
+        codes = dict.fromkeys(_normalize_stock_code(c) for c in stock_codes)
+        return view.get_many(codes)
 
     # ------------------------------------------------------------------
     # Capital flow
     # ------------------------------------------------------------------
     async def fetch_capital_flow(self, stock_code: str) -> Optional[Dict]:
-        """Fetch capital flow data for a stock (主力资金流向)"""
-        cache_key = f"data:capital_flow:{stock_code}"
-        cached = self._cache_get(cache_key)
-        if cached:
-            return cached
+        """Fetch capital flow data for a stock (主力资金流向) from the market-wide flow table"""
+        table = await self.fetch_capital_flow_table()
+        if not table:
+            return None
+        flow = table.get(_normalize_stock_code(stock_code))
+        return dict(flow) if flow else None
 
-        try:
-            market = "sh" if stock_code.startswith("6") else "sz"
-            df = await asyncio.to_thread(ak.stock_individual_fund_flow, stock=stock_code, market=market)
-            if df.empty:
-                return None
+    async def fetch_capital_flow_table(self) -> Optional[CapitalFlowTable]:
+        """Today/5d/10d/20d flows for every stock, rebuilt at most every CAPITAL_FLOW_TTL.
 
-            recent = df.tail(20)
-            today = recent.iloc[-1] if len(recent) > 0 else None
-            if today is None:
-                return None
-
-            def _col_sum(col: str, n: int) -> float:
-                if col not in recent.columns:
-                    return 0.0
-                return _safe_float(recent.tail(n)[col].sum())
+        Tables older than that are served while a background rebuild runs; callers
+        only block when nothing younger than CAPITAL_FLOW_HARD_TTL exists.
+        """
+        table = capital_flow_holder.current
+        if table is not None and table.age() < CAPITAL_FLOW_HARD_TTL:
+            if table.age() >= CAPITAL_FLOW_TTL:
+                self._refresh_in_background(CAPITAL_FLOW_TABLE_KEY, self._load_capital_flow_table)
+            return table
+        return await _inflight.do(CAPITAL_FLOW_TABLE_KEY, self._load_capital_flow_table)
+
+    async def _load_capital_flow_table(self) -> Optional[CapitalFlowTable]:
+        # Another process may already have built a fresh table
+        shared = await self._cache_get(CAPITAL_FLOW_TABLE_KEY)
+        if shared:
+            table = CapitalFlowTable.from_payload(shared)
+            if table.age() < CAPITAL_FLOW_TTL:
+                return capital_flow_holder.publish(table)
+        try:
+            return capital_flow_holder.publish(await self._build_capital_flow_table())
+        except Exception as e:
+            logger.error(f"Error building capital flow table: {e}")
+            return capital_flow_holder.current
+
+    async def _build_capital_flow_table(self) -> CapitalFlowTable:
+        """Three ranking calls → joined table, plus the 20-day sum from stored daily columns"""
+        trade_date = latest_trade_date()
+        indicators = list(RANK_WINDOWS)
+        results = await asyncio.gather(
+            *(upstream.call(ak.stock_individual_fund_flow_rank, indicator=ind) for ind in indicators),
+            return_exceptions=True,
+        )
+        frames = {}
+        for indicator, result in zip(indicators, results):
+            if isinstance(result, Exception):
+                if indicator == "今日":
+                    raise result
+                logger.warning(f"Fund flow ranking {indicator} failed: {result}")
+                continue
+            frames[indicator] = result
+
+        frame = await executors.run_local(flow_frame, frames)
+        history = await self._capital_flow_history(trade_date)
+        flow_20d = sum_daily_flows(frame["main_net_inflow"], history)
+        if flow_20d is not None:
+            frame["main_net_inflow_20d"] = flow_20d
+        table = await executors.run_local(CapitalFlowTable.from_frame, frame, trade_date)
+        logger.info(f"Capital flow table built for {trade_date}: {len(table)} stocks")
 
-            result = {
-                "stock_code": stock_code,
-                "date": str(today.get("日期", "")),
-                # Today
-                "main_net_inflow": _safe_float(today.get("主力净流入-净额", 0)),
-                "main_net_inflow_pct": _safe_float(today.get("主力净流入-净占比", 0)),
-                "super_large_net_inflow": _safe_float(today.get("超大单净流入-净额", 0)),
-                "large_net_inflow": _safe_float(today.get("大单净流入-净额", 0)),
-                "medium_net_inflow": _safe_float(today.get("中单净流入-净额", 0)),
-                "small_net_inflow": _safe_float(today.get("小单净流入-净额", 0)),
-                # 5-day aggregates
-                "main_net_inflow_5d": _col_sum("主力净流入-净额", 5),
-                "super_large_net_inflow_5d": _col_sum("超大单净流入-净额", 5),
-                "large_net_inflow_5d": _col_sum("大单净流入-净额", 5),
-                # 10-day aggregates
-                "main_net_inflow_10d": _col_sum("主力净流入-净额", 10),
-                "super_large_net_inflow_10d": _col_sum("超大单净流入-净额", 10),
-                "large_net_inflow_10d": _col_sum("大单净流入-净额", 10),
-                # 20-day aggregate
-                "main_net_inflow_20d": _col_sum("主力净流入-净额", 20),
-            }
-            self._cache_set(cache_key, result, CAPITAL_FLOW_TTL)
-            return result
+        try:
+            redis = await self._get_redis()
+            if redis:
+                async with redis.pipeline() as pipe:
+                    pipe.setex(CAPITAL_FLOW_TABLE_KEY, CAPITAL_FLOW_HARD_TTL, codec.encode(table.to_payload()))
+                    daily = table.daily_column()
+                    # Holidays repeat the previous session's flows; don't count them twice
+                    if not history or history[0].get("main") != daily["main"]:
+                        pipe.setex(
+                            CAPITAL_FLOW_DAILY_KEY.format(trade_date), CAPITAL_FLOW_HISTORY_TTL, codec.encode(daily)
+                        )
+                    await pipe.execute()
         except Exception as e:
-            logger.error(f"Error fetching capital flow for {stock_code}: {e}")
-            return None
+            logger.debug(f"Redis set fail for {CAPITAL_FLOW_TABLE_KEY}: {e}")
+        return table
+
+    async def _capital_flow_history(self, trade_date: str) -> List[Dict]:
+        """Stored daily main-flow columns before ``trade_date``, newest first"""
+        start = datetime.strptime(trade_date, "%Y-%m-%d")
+        keys = [
+            CAPITAL_FLOW_DAILY_KEY.format((start - timedelta(days=i)).strftime("%Y-%m-%d"))
+            for i in range(1, CAPITAL_FLOW_HISTORY_TTL // 86400)
+        ]
+        try:
+            redis = await self._get_redis()
+            if redis:
+                return [day for day in await cache_mget(keys, redis) if day]
+        except Exception as e:
+            logger.debug(f"Redis mget failed for capital flow history: {e}")
+        return []
 
     # ------------------------------------------------------------------
     # Valuation history (PE/PB percentile)
@@ -345,15 +602,22 @@ class DataService:
     async def fetch_valuation_history(self, stock_code: str) -> Optional[Dict]:
         """Fetch historical PE_TTM / PB data for percentile calculation (cached 1h)"""
         cache_key = f"data:valuation_hist:{stock_code}"
-        cached = self._cache_get(cache_key)
+        cached = await self._cache_get(cache_key)
         if cached:
             return cached
+        return await self._load_unless_negative(
+            "valuation_hist", stock_code, cache_key,
+            partial(self._load_valuation_history, cache_key, stock_code),
+        )
 
+    async def _load_valuation_history(self, cache_key: str, stock_code: str) -> Optional[Dict]:
         result: Dict = {}
 
-        def _calc_percentile(symbol: str, indicator: str) -> Optional[Dict]:
+        async def _calc_percentile(symbol: str, indicator: str) -> Optional[Dict]:
             try:
-                df = ak.stock_zh_valuation_baidu(symbol=symbol, indicator=indicator, period="近一年")
+                df = await upstream.call(
+                    ak.stock_zh_valuation_baidu, symbol=symbol, indicator=indicator, period="近一年"
+                )
                 if df is None or df.empty:
                     return None
                 series = pd.to_numeric(df['value'], errors='coerce').dropna()
@@ -369,13 +633,15 @@ class DataService:
                     'median': round(float(series.median()), 2),
                     'current': round(current, 2),
                 }
-            except Exception:
+            except Exception as e:
+                if is_transient(e):
+                    raise
                 return None
 
         try:
             pe_data, pb_data = await asyncio.gather(
-                asyncio.to_thread(_calc_percentile, stock_code, "市盈率(TTM)"),
-                asyncio.to_thread(_calc_percentile, stock_code, "市净率"),
+                _calc_percentile(stock_code, "市盈率(TTM)"),
+                _calc_percentile(stock_code, "市净率"),
             )
             if pe_data:
                 result['pe_percentile'] = pe_data['percentile']
@@ -385,11 +651,13 @@ class DataService:
                 result['pb_values'] = {k: v for k, v in pb_data.items() if k != 'percentile'}
 
             if result:
-                self._cache_set(cache_key, result, FINANCIAL_TTL)
+                await self._cache_set(cache_key, result, FINANCIAL_TTL)
                 return result
             return None
         except Exception as e:
             logger.warning(f"Valuation history fetch failed for {stock_code}: {e}")
+            if is_transient(e):
+                raise
             return None
 
     # ------------------------------------------------------------------
@@ -398,28 +666,27 @@ class DataService:
     async def fetch_sector_list(self) -> List[Dict]:
         """Fetch industry sector list with performance data (cached 5min)"""
         cache_key = "data:sector_list"
-        cached = self._cache_get(cache_key)
-        if cached:
-            return cached
+        return await self._get_refresh_ahead(
+            cache_key, partial(self._load_sector_list, cache_key), SECTOR_TTL, SECTOR_HARD_TTL
+        )
 
+    async def _load_sector_list(self, cache_key: str) -> List[Dict]:
         try:
-            df = await asyncio.to_thread(ak.stock_board_industry_name_em)
-            sectors = []
-            for _, row in df.iterrows():
-                sectors.append({
-                    "sector_name": str(row.get("板块名称", "")),
-                    "sector_code": str(row.get("板块代码", "")),
-                    "pct_change": _safe_float(row.get("涨跌幅", 0)),
-                    "turnover": _safe_float(row.get("总成交额", 0)),
-                    "leader_stock": str(row.get("领涨股票", "")),
-                    "leader_pct_change": _safe_float(row.get("领涨股票-涨跌幅", 0)),
-                })
-            self._cache_set(cache_key, sectors, SECTOR_TTL)
+            df = await upstream.call(ak.stock_board_industry_name_em)
+            col = partial(columnar.column, df)
+            sectors = columnar.to_records(pd.DataFrame({
+                "sector_name": columnar.to_text(col("板块名称", "")),
+                "sector_code": columnar.to_text(col("板块代码", "")),
+                "pct_change": columnar.to_float(col("涨跌幅")),
+                "turnover": columnar.to_float(col("总成交额")),
+                "leader_stock": columnar.to_text(col("领涨股票", "")),
+                "leader_pct_change": columnar.to_float(col("领涨股票-涨跌幅")),
+            }))
+            await self._cache_set(cache_key, sectors, SECTOR_HARD_TTL)
             return sectors
         except Exception as e:
             logger.error(f"Error fetching sector list: {e}")
-            stale = _memory_cache.get(cache_key)
-            return stale["data"] if stale else []
+            return _memory_cache.get(cache_key) or []
 
     # ------------------------------------------------------------------
     # K-line data
@@ -428,46 +695,358 @@ class DataService:
         self,
         stock_code: str,
         period: str = '1d',
-        days: int = 500
+        days: int = 500,
+        adjust: str = "qfq",
     ) -> List[Dict]:
-        """Fetch K-line data for a stock (cached 10min)"""
-        cache_key = f"data:kline:{stock_code}:{period}:{days}"
-        cached = self._cache_get(cache_key)
-        if cached:
-            return cached
+        """Fetch K-line data for a stock, sliced from the local store (re-synced every 10min).
 
-        try:
-            end_date = datetime.now().strftime('%Y%m%d')
-            start_date = (datetime.now() - timedelta(days=days)).strftime('%Y%m%d')
-
-            period_map = {'1d': 'daily', '1w': 'weekly', '1M': 'monthly'}
-            ak_period = period_map.get(period, 'daily')
-
-            df = await asyncio.to_thread(
-                ak.stock_zh_a_hist,
-                symbol=stock_code,
-                period=ak_period,
-                start_date=start_date,
-                end_date=end_date,
-                adjust="qfq"
+        ``adjust`` is ``"qfq"`` (default), ``"hfq"`` or ``""`` for unadjusted prices.
+        """
+        start = (datetime.now() - timedelta(days=days)).date()
+        if not kline_store.is_fresh(stock_code, period, start, KLINE_TTL):
+            await self._load_unless_negative(
+                f"kline_{period}", stock_code, f"data:kline:{stock_code}:{period}",
+                partial(self._load_kline_data, stock_code, period, start),
             )
+        return self._kline_window(stock_code, period, start, adjust)
 
-            kline_data = []
-            for _, row in df.iterrows():
-                kline_data.append({
-                    "date": str(row["日期"]),
-                    "open": float(row["开盘"]),
-                    "high": float(row["最高"]),
-                    "low": float(row["最低"]),
-                    "close": float(row["收盘"]),
-                    "volume": int(row["成交量"]),
-                    "amount": float(row["成交额"])
-                })
-            self._cache_set(cache_key, kline_data, KLINE_TTL)
-            return kline_data
+    @staticmethod
+    def _kline_window(stock_code: str, period: str, start: date, adjust: str = "qfq") -> List[Dict]:
+        bars = kline_store.window(stock_code, period, start)
+        if bars is None:
+            return []
+        if adjust:
+            bars = adjust_bars(bars, kline_store.load_factors(stock_code), adjust)
+        return bars_to_records(bars)
+
+    async def _load_kline_data(self, stock_code: str, period: str, start: date) -> bool:
+        """Sync the store; True if any bars are stored for the stock afterwards"""
+        try:
+            await self._sync_kline_store(stock_code, period, start)
         except Exception as e:
             logger.error(f"Error fetching kline data for {stock_code}: {e}")
-            return []
+            if is_transient(e):
+                raise
+        bars = kline_store.load(stock_code, period)
+        return bars is not None and len(bars) > 0
+
+    async def _fetch_kline_bars(self, stock_code: str, period: str, start: date):
+        """Fetch unadjusted bars from ``start`` to today as a structured array"""
+        df = await upstream.call(
+            ak.stock_zh_a_hist,
+            symbol=stock_code,
+            period=KLINE_PERIOD_MAP.get(period, 'daily'),
+            start_date=start.strftime('%Y%m%d'),
+            end_date=datetime.now().strftime('%Y%m%d'),
+            adjust=""
+        )
+        return bars_from_frame(df)
+
+    async def _sync_kline_store(self, stock_code: str, period: str, start: date):
+        """Bring the stored history up to date, fetching only new bars when possible.
+
+        Stored bars are unadjusted, so a dividend/split only refreshes the
+        factor table. A full refetch happens when nothing is stored, the stored
+        history starts after ``start``, or upstream revised an overlapping bar.
+        """
+        await self._sync_adjust_factors(stock_code)
+        if kline_store.covers(stock_code, period, start):
+            since = kline_store.sync_start(stock_code, period)
+            if since is not None:
+                fresh = await self._fetch_kline_bars(stock_code, period, since)
+                merged = kline_store.merge(stock_code, period, fresh)
+                if merged is not None:
+                    covered_from = date.fromisoformat(kline_store.meta(stock_code, period)["start"])
+                    await executors.run_local(kline_store.write, stock_code, period, merged, covered_from)
+                    return
+                logger.info(f"Stored kline history changed upstream for {stock_code} {period}, refetching in full")
+
+        fill_from = min(start, date.today() - timedelta(days=settings.KLINE_HISTORY_DAYS))
+        bars = await self._fetch_kline_bars(stock_code, period, fill_from)
+        await executors.run_local(kline_store.write, stock_code, period, bars, fill_from)
+
+    async def _sync_adjust_factors(self, stock_code: str):
+        """Refresh the stock's hfq factor table when stale; the old table keeps serving on failure"""
+        if kline_store.factors_synced_within(stock_code, settings.ADJUST_FACTOR_TTL):
+            return
+        try:
+            df = await upstream.call(ak.stock_zh_a_daily, symbol=exchange_symbol(stock_code), adjust="hfq-factor")
+            await executors.run_local(kline_store.write_factors, stock_code, factors_from_frame(df))
+        except Exception as e:
+            logger.warning(f"Error fetching adjustment factors for {stock_code}: {e}")
+
+    async def synthesize_eod_bars(self, view: Optional[MarketSnapshot] = None) -> Dict[str, Any]:
+        """Append today's daily bar for every stored stock from the closing snapshot.
+
+        One ``stock_zh_a_spot_em`` call replaces a ``stock_zh_a_hist`` download
+        per stock. Bars are dated with the session's trade date; a session that
+        is already stored, or a snapshot that repeats the last stored session
+        market-wide (a holiday), appends nothing. Stocks whose stored close does
+        not match the snapshot's previous close (going ex-rights, missed
+        sessions) get their factor table invalidated and are returned in
+        ``refetch`` for an incremental resync.
+        """
+        view = view or await self.refresh_snapshot()
+        day = date.fromisoformat(latest_trade_date(datetime.fromtimestamp(view.fetched_at)))
+        return await executors.run_local(self._append_session_bars, view.rows, day)
+
+    @staticmethod
+    def _append_session_bars(rows: List[Dict], day: date) -> Dict[str, Any]:
+        counts = {"appended": 0, "unchanged": 0, "missing": 0, "suspended": 0}
+        bars: List[Dict] = []
+        refetch: List[str] = []
+        if _repeats_last_session(rows, day):
+            logger.info(f"EOD snapshot for {day} repeats the last stored session (market closed), skipping")
+            return {"date": day.isoformat(), **counts, "unchanged": len(rows), "refetch": refetch, "bars": bars}
+        for quote in rows:
+            code = quote.get("stock_code")
+            bar = bar_from_quote(quote, day)
+            if not code or bar is None:
+                counts["suspended"] += 1
+                continue
+            try:
+                status = kline_store.append_session(code, bar, quote.get("pre_close") or 0.0)
+            except Exception as e:
+                logger.warning(f"EOD bar append failed for {code}: {e}")
+                status = "refetch"
+            if status == "refetch":
+                refetch.append(code)
+                continue
+            counts[status] += 1
+            if status == "appended":
+                bars.append({"stock_code": code, **bars_to_records(bar)[0]})
+        logger.info(f"EOD bars for {day}: {counts}, {len(refetch)} to refetch")
+        return {"date": day.isoformat(), **counts, "refetch": refetch, "bars": bars}
+
+    # ------------------------------------------------------------------
+    # Batch fetches (strategies scanning many candidates)
+    # ------------------------------------------------------------------
+    async def _bounded_as_completed(
+        self, stock_codes: Iterable[str], fetch: Callable[[str], Awaitable], default
+    ) -> AsyncIterator[Tuple[str, Any]]:
+        """Run ``fetch(code)`` with at most DATA_BATCH_CONCURRENCY in flight, yielding (code, result) as each finishes."""
+        semaphore = asyncio.Semaphore(settings.DATA_BATCH_CONCURRENCY)
+
+        async def _run(code: str):
+            async with semaphore:
+                try:
+                    return code, await fetch(code)
+                except Exception as e:
+                    logger.debug(f"Batch fetch failed for {code}: {e}")
+                    return code, default
+
+        tasks = [asyncio.ensure_future(_run(code)) for code in stock_codes]
+        try:
+            for next_done in asyncio.as_completed(tasks):
+                yield await next_done
+        finally:
+            # Consumer stopped early: don't leave upstream calls running
+            for task in tasks:
+                task.cancel()
+
+    async def fetch_kline_batch(
+        self, stock_codes: Iterable[str], period: str = '1d', days: int = 500
+    ) -> AsyncIterator[Tuple[str, List[Dict]]]:
+        """Yield (stock_code, kline) pairs as they become available.
+
+        Windows already fresh in the local store are yielded first without any
+        upstream call; the rest are synced concurrently under the batch semaphore.
+        """
+        start = (datetime.now() - timedelta(days=days)).date()
+        dataset = f"kline_{period}"
+        misses = []
+        for code in dict.fromkeys(stock_codes):
+            if kline_store.is_fresh(code, period, start, KLINE_TTL):
+                yield code, self._kline_window(code, period, start)
+            else:
+                misses.append(code)
+
+        negatives = await negative_cache.negatives(dataset, misses, await self._get_redis())
+        for code in negatives:
+            yield code, self._kline_window(code, period, start)
+
+        async def _sync(code: str) -> List[Dict]:
+            await _inflight.do(
+                f"data:kline:{code}:{period}",
+                partial(
+                    self._load_and_record, dataset, code, f"data:kline:{code}:{period}",
+                    partial(self._load_kline_data, code, period, start),
+                ),
+            )
+            return self._kline_window(code, period, start)
+
+        misses = [code for code in misses if code not in negatives]
+
+        async for item in self._bounded_as_completed(misses, _sync, []):
+            yield item
+
+    async def fetch_financial_batch(
+        self, stock_codes: Iterable[str], years: int = 5
+    ) -> AsyncIterator[Tuple[str, List[Dict]]]:
+        """Yield (stock_code, financials) pairs as they become available.
+
+        Cache hits are resolved with one Redis MGET and negatively cached codes
+        with one more; the remaining misses are fetched concurrently under the
+        batch semaphore.
+        """
+        codes = list(dict.fromkeys(stock_codes))
+        keys = [f"data:financial:{code}:{years}" for code in codes]
+        cached = [None] * len(keys)
+        try:
+            redis = await self._get_redis()
+            if redis and keys:
+                cached = await cache_mget(keys, redis)
+        except Exception as e:
+            logger.debug(f"Redis mget failed for financial batch: {e}")
+
+        misses = {}
+        for code, key, data in zip(codes, keys, cached):
+            if data:
+                yield code, data
+            else:
+                misses[code] = key
+
+        for code in await negative_cache.negatives("financial", misses, await self._get_redis()):
+            del misses[code]
+            yield code, []
+
+        async def _load(code: str) -> List[Dict]:
+            key = misses[code]
+            loader = partial(self._load_financial_data, key, code, years)
+            return await _inflight.do(key, partial(self._load_and_record, "financial", code, key, loader)) or []
+
+        async for item in self._bounded_as_completed(misses, _load, []):
+            yield item
+
+    async def fetch_indicator_panel(
+        self,
+        stock_codes: Iterable[str],
+        days: int = 120,
+        adjust: str = "qfq",
+        live: bool = True,
+        sync: bool = True,
+    ) -> IndicatorPanel:
+        """Daily bars of many stocks as one cross-sectional indicator panel.
+
+        Only stocks whose stored history does not reach back ``days`` are
+        synced upstream (none when ``sync`` is False); the rest are read
+        straight from the local store (kept current by the end-of-day bars),
+        with today's bar taken from the cached market snapshot while ``live``.
+        """
+        codes = list(dict.fromkeys(stock_codes))
+        start = (datetime.now() - timedelta(days=days)).date()
+        uncovered = [code for code in codes if sync and not kline_store.covers(code, "1d", start)]
+        if uncovered:
+            async for _ in self.fetch_kline_batch(uncovered, period="1d", days=days):
+                pass
+
+        quotes, today = None, None
+        if live:
+            view = await self.get_cached_snapshot_view()
+            if view:
+                quotes, today = view.by_code, datetime.fromtimestamp(view.fetched_at).date()
+        return await executors.run_local(load_panel, kline_store, codes, start, adjust, quotes, today)
+
+    # ------------------------------------------------------------------
+    # Universe-wide technical factors (local factor store)
+    # ------------------------------------------------------------------
+    async def fetch_technical_factors(self, build: bool = True) -> Optional[pd.DataFrame]:
+        """Latest technical indicator values for every stock, indexed by stock_code.
+
+        Served from the local factor store; when the table does not exist yet
+        it is built from whatever K-line history is stored locally (None
+        instead when ``build`` is False).
+        """
+        frame = factor_store.load(TECHNICAL_FACTOR_TABLE)
+        if frame is None and build:
+            await _inflight.do(
+                f"factors:{TECHNICAL_FACTOR_TABLE}", partial(self.sync_technical_factors, sync=False)
+            )
+            frame = factor_store.load(TECHNICAL_FACTOR_TABLE)
+        return frame
+
+    async def sync_technical_factors(self, live: bool = False, sync: bool = True) -> Dict:
+        """Rebuild the technical factor table over the whole stock list.
+
+        After the close this runs on the stored daily bars (syncing stocks with
+        too little history when ``sync``); ``live`` folds in today's bar from
+        the cached snapshot for intraday refreshes. Returns the store metadata.
+        """
+        codes = await self.get_all_stock_codes()
+        panel = await self.fetch_indicator_panel(codes, days=TECHNICAL_FACTOR_DAYS, live=live, sync=sync)
+        frame = await executors.run_local(technical_factor_frame, panel)
+        trade_date = (frame["trade_date"].max() if len(frame) else None) or None
+        await executors.run_local(
+            factor_store.write, TECHNICAL_FACTOR_TABLE, frame, {"trade_date": trade_date, "live": live}
+        )
+        logger.info(f"Technical factors for {trade_date}: {len(frame)} stocks (live={live})")
+        return factor_store.meta(TECHNICAL_FACTOR_TABLE)
+
+    # ------------------------------------------------------------------
+    # Universe-wide financial factors (local factor store)
+    # ------------------------------------------------------------------
+    async def fetch_financial_factors(self, build: bool = True) -> Optional[pd.DataFrame]:
+        """Financial factors for every listed stock, indexed by stock_code.
+
+        Served from the local factor store; only the very first call on a host
+        builds it from upstream (afterwards the nightly sync keeps it current),
+        and not at all when ``build`` is False.
+        """
+        frame = factor_store.load(FINANCIAL_FACTOR_TABLE)
+        if frame is None and build:
+            await _inflight.do(f"factors:{FINANCIAL_FACTOR_TABLE}", self.sync_financial_factors)
+            frame = factor_store.load(FINANCIAL_FACTOR_TABLE)
+        return frame
+
+    async def sync_financial_factors(self, force: bool = False) -> Dict:
+        """Rebuild the financial factor table when a newer period or more reports are available.
+
+        The newest of the last three periods that most listed stocks have
+        reported for is used (see ``choose_period``), so a fresh host is seeded
+        from the previous complete period early in a reporting season.
+        Returns the store metadata plus ``updated`` (whether the table was rewritten).
+        """
+        meta = factor_store.meta(FINANCIAL_FACTOR_TABLE)
+        listed = len(await self.get_all_stock_codes())
+        fetched: Dict[str, pd.DataFrame] = {}
+        for candidate in report_periods(date.today(), 3):
+            try:
+                reports = await upstream.call(ak.stock_yjbb_em, date=candidate)
+            except Exception as e:
+                logger.warning(f"Bulk report fetch for {candidate} failed: {e}")
+                continue
+            if reports is not None and not reports.empty:
+                fetched[candidate] = reports
+                if len(reports) >= FINANCIAL_MIN_COVERAGE * listed:
+                    break
+        period = choose_period({p: len(r) for p, r in fetched.items()}, listed)
+        if period is None or period < meta.get("period", ""):
+            return {**meta, "updated": False}
+        reports = fetched[period]
+        if not force and meta.get("period") == period and meta.get("reports") == len(reports):
+            return {**meta, "updated": False}
+
+        balance, dividends = await asyncio.gather(
+            upstream.call(ak.stock_zcfz_em, date=period),
+            upstream.call(ak.stock_fhps_em, date=annual_period(period)),
+            return_exceptions=True,
+        )
+        for name, result in (("balance sheet", balance), ("dividends", dividends)):
+            if isinstance(result, Exception):
+                logger.warning(f"Bulk {name} for {period} failed: {result}")
+        frame = await executors.run_local(
+            financial_factor_frame,
+            reports,
+            None if isinstance(balance, Exception) else balance,
+            None if isinstance(dividends, Exception) else dividends,
+            period,
+        )
+        frame = merge_with_previous(frame, factor_store.load(FINANCIAL_FACTOR_TABLE))
+        await executors.run_local(
+            factor_store.write, FINANCIAL_FACTOR_TABLE, frame, {"period": period, "reports": len(reports)}
+        )
+        logger.info(f"Financial factors for {period}: {len(reports)} reports, {len(frame)} stocks")
+        return {**factor_store.meta(FINANCIAL_FACTOR_TABLE), "updated": True}
 
     # ------------------------------------------------------------------
     # Market capital flow
@@ -475,32 +1054,34 @@ class DataService:
     async def fetch_market_capital_flow(self) -> List[Dict]:
         """Fetch market-level capital flow by sector (cached 5min)"""
         cache_key = "data:market_capital_flow"
-        cached = self._cache_get(cache_key)
-        if cached:
-            return cached
+        return await self._get_refresh_ahead(
+            cache_key, partial(self._load_market_capital_flow, cache_key),
+            CAPITAL_FLOW_TTL, MARKET_CAPITAL_FLOW_HARD_TTL,
+        )
 
+    async def _load_market_capital_flow(self, cache_key: str) -> List[Dict]:
         try:
-            df = await asyncio.to_thread(ak.stock_sector_fund_flow_rank, indicator="今日", sector_type="行业资金流")
+            df = await upstream.call(ak.stock_sector_fund_flow_rank, indicator="今日", sector_type="行业资金流")
             if df.empty:
                 return []
 
-            results = []
-            for _, row in df.head(30).iterrows():
-                results.append({
-                    "sector_name": str(row.get("名称", "")),
-                    "main_net_inflow": _safe_float(row.get("主力净流入-净额", 0)),
-                    "main_net_inflow_pct": _safe_float(row.get("主力净流入-净占比", 0)),
-                    "super_large_net": _safe_float(row.get("超大单净流入-净额", 0)),
-                    "large_net": _safe_float(row.get("大单净流入-净额", 0)),
-                    "medium_net": _safe_float(row.get("中单净流入-净额", 0)),
-                    "small_net": _safe_float(row.get("小单净流入-净额", 0)),
-                    "pct_change": _safe_float(row.get("今日涨跌幅", 0)),
-                })
-            self._cache_set(cache_key, results, CAPITAL_FLOW_TTL)
+            df = df.head(30)
+            col = partial(columnar.column, df)
+            results = columnar.to_records(pd.DataFrame({
+                "sector_name": columnar.to_text(col("名称", "")),
+                "main_net_inflow": columnar.to_float(col("主力净流入-净额")),
+                "main_net_inflow_pct": columnar.to_float(col("主力净流入-净占比")),
+                "super_large_net": columnar.to_float(col("超大单净流入-净额")),
+                "large_net": columnar.to_float(col("大单净流入-净额")),
+                "medium_net": columnar.to_float(col("中单净流入-净额")),
+                "small_net": columnar.to_float(col("小单净流入-净额")),
+                "pct_change": columnar.to_float(col("今日涨跌幅")),
+            }))
+            await self._cache_set(cache_key, results, MARKET_CAPITAL_FLOW_HARD_TTL)
             return results
         except Exception as e:
             logger.error(f"Error fetching market capital flow: {e}")
-            return []
+            return _memory_cache.get(cache_key) or []
 
     # ------------------------------------------------------------------
     # Peer comparison
@@ -508,54 +1089,31 @@ class DataService:
     async def fetch_peer_comparison(self, stock_code: str, limit: int = 6) -> Dict:
         """Fetch same-industry peers with key metrics for comparison."""
         cache_key = f"data:peers:{stock_code}"
-        cached = self._cache_get(cache_key)
+        cached = await self._cache_get(cache_key)
         if cached:
             return cached
+        return await _inflight.do(
+            f"{cache_key}:{limit}", partial(self._load_peer_comparison, cache_key, stock_code, limit)
+        )
 
+    async def _load_peer_comparison(self, cache_key: str, stock_code: str, limit: int) -> Dict:
         try:
-            # 1. Get the stock's industry via sector constituent list
-            industry_name = None
-            try:
-                df_ind = await asyncio.to_thread(ak.stock_board_industry_cons_em, symbol="全部")
-                # Find which industry our stock belongs to
-                # Fallback: use the stock_individual_info_em approach
-            except Exception:
-                pass
-
-            # Simpler: use stock_individual_info to get industry
-            try:
-                df_info = await asyncio.to_thread(ak.stock_individual_info_em, symbol=stock_code)
-                for _, row in df_info.iterrows():
-                    item = str(row.get("item", ""))
-                    value = str(row.get("value", ""))
-                    if "行业" in item:
-                        industry_name = value
-                        break
-            except Exception as e:
-                logger.warning(f"Could not get industry for {stock_code}: {e}")
-
+            # 1. Industry and its constituents from the reference registry
+            target_code = _normalize_stock_code(stock_code)
+            ref = await reference_registry.get()
+            industry_name = ref.industry_of(target_code)
             if not industry_name:
                 return {"industry": "未知", "target": None, "peers": []}
 
-            # 2. Get industry constituent stocks
+            # 2. Industry constituent stocks
             peers_data = []
-            try:
-                df_cons = await asyncio.to_thread(ak.stock_board_industry_cons_em, symbol=industry_name)
-                if not df_cons.empty:
-                    peer_codes = df_cons["代码"].tolist()[:30]  # top 30 by market cap
-                else:
-                    peer_codes = []
-            except Exception as e:
-                logger.warning(f"Could not get industry constituents for {industry_name}: {e}")
-                peer_codes = []
-
+            peer_codes = ref.constituents(industry_name)
             if not peer_codes:
                 return {"industry": industry_name, "target": None, "peers": []}
 
             # 3. Get snapshot data for peers (reuse market snapshot)
-            snapshot = await self.fetch_market_snapshot()
-            snapshot_map = {_normalize_stock_code(s.get("stock_code")): s for s in snapshot}
-            target_code = _normalize_stock_code(stock_code)
+            view = await self.fetch_snapshot_view()
+            snapshot_map = view.by_code if view else {}
 
             target = None
             for code in peer_codes:
@@ -587,7 +1145,7 @@ class DataService:
                 "target": target,
                 "peers": peers_data,
             }
-            self._cache_set(cache_key, result, SECTOR_TTL)
+            await self._cache_set(cache_key, result, SECTOR_TTL)
             return result
         except Exception as e:
             logger.error(f"Error fetching peer comparison for {stock_code}: {e}")
@@ -599,25 +1157,29 @@ class DataService:
     async def fetch_stock_news(self, stock_code: str, limit: int = 20) -> List[Dict]:
         """Fetch recent news for a stock (cached 30min)"""
         cache_key = f"data:news:{stock_code}"
-        cached = self._cache_get(cache_key)
+        cached = await self._cache_get(cache_key)
         if cached:
             return cached[:limit]
+        return await _inflight.do(
+            f"{cache_key}:{limit}", partial(self._load_stock_news, cache_key, stock_code, limit)
+        )
 
+    async def _load_stock_news(self, cache_key: str, stock_code: str, limit: int) -> List[Dict]:
         try:
-            df = await asyncio.to_thread(ak.stock_news_em, symbol=stock_code)
+            df = await upstream.call(ak.stock_news_em, symbol=stock_code)
             if df.empty:
                 return []
 
-            news = []
-            for _, row in df.head(limit).iterrows():
-                news.append({
-                    "title": str(row.get("新闻标题", "")),
-                    "content": str(row.get("新闻内容", ""))[:200],
-                    "publish_time": str(row.get("发布时间", "")),
-                    "source": str(row.get("文章来源", "")),
-                    "url": str(row.get("新闻链接", "")),
-                })
-            self._cache_set(cache_key, news, 1800)
+            df = df.head(limit)
+            col = partial(columnar.column, df, default="")
+            news = columnar.to_records(pd.DataFrame({
+                "title": columnar.to_text(col("新闻标题")),
+                "content": columnar.to_text(col("新闻内容"), max_len=200),
+                "publish_time": columnar.to_text(col("发布时间")),
+                "source": columnar.to_text(col("文章来源")),
+                "url": columnar.to_text(col("新闻链接")),
+            }))
+            await self._cache_set(cache_key, news, 1800)
             return news
         except Exception as e:
             logger.error(f"Error fetching news for {stock_code}: {e}")
@@ -629,57 +1191,88 @@ class DataService:
     async def fetch_northbound_flow(self, days: int = 30) -> List[Dict]:
         """Fetch northbound (沪深港通) daily net inflow data (cached 30min)."""
         cache_key = f"data:northbound_flow:{days}"
-        cached = self._cache_get(cache_key)
+        cached = await self._cache_get(cache_key)
         if cached:
             return cached[:days]
+        return await _inflight.do(cache_key, partial(self._load_northbound_flow, cache_key, days))
 
+    async def _load_northbound_flow(self, cache_key: str, days: int) -> List[Dict]:
         try:
-            df = await asyncio.to_thread(ak.stock_hsgt_north_net_flow_in_em, symbol="北向")
+            df = await upstream.call(ak.stock_hsgt_north_net_flow_in_em, symbol="北向")
             if df.empty:
                 return []
 
-            rows = []
-            for _, row in df.tail(days).iterrows():
-                rows.append({
-                    "date": str(row.get("日期", "")),
-                    "net_inflow": _safe_float(row.get("当日净流入", 0)),
-                    "buy_amount": _safe_float(row.get("当日买入成交额", 0)),
-                    "sell_amount": _safe_float(row.get("当日卖出成交额", 0)),
-                    "cumulative_net_inflow": _safe_float(row.get("历史累计净流入", 0)),
-                })
+            df = df.tail(days)
+            col = partial(columnar.column, df)
+            rows = columnar.to_records(pd.DataFrame({
+                "date": columnar.to_text(col("日期", "")),
+                "net_inflow": columnar.to_float(col("当日净流入")),
+                "buy_amount": columnar.to_float(col("当日买入成交额")),
+                "sell_amount": columnar.to_float(col("当日卖出成交额")),
+                "cumulative_net_inflow": columnar.to_float(col("历史累计净流入")),
+            }))
             rows.reverse()  # most recent first
-            self._cache_set(cache_key, rows, 1800)
+            await self._cache_set(cache_key, rows, 1800)
             return rows
         except Exception as e:
             logger.error(f"Error fetching northbound flow: {e}")
             return []
 
     async def fetch_northbound_stock_holding(self, stock_code: str) -> Dict:
-        """Fetch northbound holding data for a specific stock (cached 1h)."""
-        cache_key = f"data:northbound_hold:{stock_code}"
-        cached = self._cache_get(cache_key)
-        if cached:
-            return cached
-
+        """Northbound holding of one stock from the market-wide holdings table ({} if not held)."""
+        table = await self.fetch_northbound_holding_table()
+        holding = table.get(_normalize_stock_code(stock_code)) if table else None
+        return dict(holding) if holding else {}
+
+    async def fetch_northbound_holding_table(
+        self, trade_date: Optional[str] = None
+    ) -> Optional[NorthboundHoldingTable]:
+        """Northbound holdings of every held stock, latest or for one disclosure ``trade_date``.
+
+        The latest table is rebuilt daily by ``refresh_northbound_holdings``; a
+        process re-reads the shared copy every NORTHBOUND_TABLE_TTL and builds it
+        from upstream itself only when Redis has none.
+        """
+        if trade_date:
+            shared = await self._cache_get(NORTHBOUND_DAILY_KEY.format(trade_date))
+            return NorthboundHoldingTable.from_payload(shared) if shared else None
+
+        table = northbound_holder.current
+        if table is not None and time.time() - table.loaded_at < NORTHBOUND_TABLE_TTL:
+            return table
+        return await _inflight.do(NORTHBOUND_TABLE_KEY, self._load_northbound_holding_table)
+
+    async def _load_northbound_holding_table(self) -> Optional[NorthboundHoldingTable]:
+        shared = await self._cache_get(NORTHBOUND_TABLE_KEY)
+        if shared:
+            return northbound_holder.publish(NorthboundHoldingTable.from_payload(shared))
         try:
-            df = await asyncio.to_thread(ak.stock_hsgt_individual_em, symbol=stock_code)
-            if df.empty:
-                return {}
+            return await self.sync_northbound_holdings()
+        except Exception as e:
+            logger.error(f"Error building northbound holdings table: {e}")
+            return northbound_holder.current
+
+    async def sync_northbound_holdings(self) -> NorthboundHoldingTable:
+        """Pull the market-wide holdings once and store them as latest + per-date tables"""
+        df = await upstream.call(ak.stock_hsgt_hold_stock_em, market="北向", indicator="今日排行")
+        if df is None or df.empty:
+            raise ValueError("empty northbound holdings ranking")
+        trade_date = disclosure_date(df) or latest_trade_date()
+        frame = await executors.run_local(holdings_frame, df)
+        table = await executors.run_local(NorthboundHoldingTable.from_frame, frame, trade_date)
+        logger.info(f"Northbound holdings for {trade_date}: {len(table)} stocks")
 
-            latest = df.iloc[0]
-            result = {
-                "stock_code": stock_code,
-                "date": str(latest.get("日期", "")),
-                "hold_shares": _safe_float(latest.get("持股数量", 0)),
-                "hold_market_value": _safe_float(latest.get("持股市值", 0)),
-                "hold_pct": _safe_float(latest.get("持股数量占A股百分比", 0)),
-                "change_shares": _safe_float(latest.get("增持数量", 0)),
-            }
-            self._cache_set(cache_key, result, FINANCIAL_TTL)
-            return result
+        try:
+            redis = await self._get_redis()
+            if redis:
+                payload = codec.encode(table.to_payload())
+                async with redis.pipeline() as pipe:
+                    pipe.setex(NORTHBOUND_TABLE_KEY, NORTHBOUND_HISTORY_TTL, payload)
+                    pipe.setex(NORTHBOUND_DAILY_KEY.format(trade_date), NORTHBOUND_HISTORY_TTL, payload)
+                    await pipe.execute()
         except Exception as e:
-            logger.debug(f"Northbound holding data not available for {stock_code}: {e}")
-            return {}
+            logger.debug(f"Redis set fail for {NORTHBOUND_TABLE_KEY}: {e}")
+        return northbound_holder.publish(table)
 
     # ------------------------------------------------------------------
     # Financial data
@@ -687,60 +1280,68 @@ class DataService:
     async def fetch_financial_data(self, stock_code: str, years: int = 5) -> List[Dict]:
         """Fetch financial data for a stock (cached 1h)"""
         cache_key = f"data:financial:{stock_code}:{years}"
-        cached = self._cache_get(cache_key)
+        cached = await self._cache_get(cache_key)
         if cached:
             return cached
+        return await self._load_unless_negative(
+            "financial", stock_code, cache_key,
+            partial(self._load_financial_data, cache_key, stock_code, years),
+        ) or []
 
-        # Primary: 同花顺 financial abstract (reliable)
-        try:
-            df = await asyncio.to_thread(ak.stock_financial_abstract_ths, symbol=stock_code)
-            if df is not None and not df.empty:
-                df = df.tail(years * 4)  # most recent records
-                financials = []
-                for _, row in df.iterrows():
-                    financials.append({
-                        "stock_code": stock_code,
-                        "report_date": str(row.get("报告期", "")),
-                        "eps": _safe_float(row.get("基本每股收益", 0)),
-                        "roe": _safe_float(row.get("净资产收益率", 0)),
-                        "revenue": _parse_cn_amount(row.get("营业总收入", 0)),
-                        "net_profit": _parse_cn_amount(row.get("净利润", 0)),
-                        "revenue_growth": _safe_float(row.get("营业总收入同比增长率", 0)),
-                        "net_profit_growth": _safe_float(row.get("净利润同比增长率", 0)),
-                        "debt_ratio": _safe_float(row.get("资产负债率", 0)),
-                        "current_ratio": _safe_float(row.get("流动比率", 0)),
-                        "gross_margin": _safe_float(row.get("销售毛利率", 0)),
-                        "net_margin": _safe_float(row.get("销售净利率", 0)),
-                    })
-                self._cache_set(cache_key, financials, FINANCIAL_TTL)
-                return financials
-        except Exception as e:
-            logger.warning(f"THS financial data failed for {stock_code}: {e}")
-
-        # Fallback: Sina financial indicators
+    async def _load_financial_data(self, cache_key: str, stock_code: str, years: int) -> List[Dict]:
+        # Primary: 同花顺 financial abstract (reliable); hedged with Sina financial indicators
         try:
-            df = await asyncio.to_thread(ak.stock_financial_analysis_indicator, symbol=stock_code)
-            if df is not None and not df.empty:
-                df = df.head(years * 4)
-                financials = []
-                for _, row in df.iterrows():
-                    financials.append({
-                        "stock_code": stock_code,
-                        "report_date": str(row.get("日期", "")),
-                        "eps": _safe_float(row.get("基本每股收益", 0)),
-                        "roe": _safe_float(row.get("净资产收益率", 0)),
-                        "revenue": 0,
-                        "net_profit": 0,
-                        "revenue_growth": _safe_float(row.get("营业总收入同比增长", 0)),
-                        "net_profit_growth": _safe_float(row.get("净利润同比增长", 0)),
-                        "debt_ratio": _safe_float(row.get("资产负债率", 0)),
-                        "current_ratio": _safe_float(row.get("流动比率", 0)),
-                        "gross_margin": _safe_float(row.get("销售毛利率", 0)),
-                        "net_margin": _safe_float(row.get("销售净利率", 0)),
-                    })
-                self._cache_set(cache_key, financials, FINANCIAL_TTL)
-                return financials
+            financials = await FINANCIAL_HEDGE.run([
+                ("ths", partial(self._ths_financials, stock_code, years)),
+                ("sina", partial(self._sina_financials, stock_code, years)),
+            ])
         except Exception as e:
-            logger.error(f"Sina financial data also failed for {stock_code}: {e}")
+            logger.error(f"Financial data failed from every source for {stock_code}: {e}")
+            if is_transient(e):
+                raise
+            return []
+        if financials:
+            await self._cache_set(cache_key, financials, FINANCIAL_TTL)
+        return financials or []
 
-        return []
+    async def _ths_financials(self, stock_code: str, years: int) -> List[Dict]:
+        df = await upstream.call(ak.stock_financial_abstract_ths, symbol=stock_code)
+        if df is None or df.empty:
+            return []
+        df = df.tail(years * 4)  # most recent records
+        col = partial(columnar.column, df)
+        return columnar.to_records(pd.DataFrame({
+            "stock_code": stock_code,
+            "report_date": columnar.to_text(col("报告期", "")),
+            "eps": columnar.to_float(col("基本每股收益")),
+            "roe": columnar.to_float(col("净资产收益率")),
+            "revenue": columnar.parse_cn_amount(col("营业总收入")),
+            "net_profit": columnar.parse_cn_amount(col("净利润")),
+            "revenue_growth": columnar.to_float(col("营业总收入同比增长率")),
+            "net_profit_growth": columnar.to_float(col("净利润同比增长率")),
+            "debt_ratio": columnar.to_float(col("资产负债率")),
+            "current_ratio": columnar.to_float(col("流动比率")),
+            "gross_margin": columnar.to_float(col("销售毛利率")),
+            "net_margin": columnar.to_float(col("销售净利率")),
+        }, index=df.index))
+
+    async def _sina_financials(self, stock_code: str, years: int) -> List[Dict]:
+        df = await upstream.call(ak.stock_financial_analysis_indicator, symbol=stock_code)
+        if df is None or df.empty:
+            return []
+        df = df.head(years * 4)
+        col = partial(columnar.column, df)
+        return columnar.to_records(pd.DataFrame({
+            "stock_code": stock_code,
+            "report_date": columnar.to_text(col("日期", "")),
+            "eps": columnar.to_float(col("基本每股收益")),
+            "roe": columnar.to_float(col("净资产收益率")),
+            "revenue": 0,
+            "net_profit": 0,
+            "revenue_growth": columnar.to_float(col("营业总收入同比增长")),
+            "net_profit_growth": columnar.to_float(col("净利润同比增长")),
+            "debt_ratio": columnar.to_float(col("资产负债率")),
+            "current_ratio": columnar.to_float(col("流动比率")),
+            "gross_margin": columnar.to_float(col("销售毛利率")),
+            "net_margin": columnar.to_float(col("销售净利率")),
+        }, index=df.index))
@@ -0,0 +1,104 @@
+# backend/app/services/factor_store.py
+"""Local on-disk store for universe-wide factor tables.
+
+Each table (one row per stock) is a NumPy structured array under
+``FACTOR_STORE_DIR`` with a JSON sidecar describing what it was built from
+(e.g. the reporting period). Files are replaced atomically like the K-line
+store, and each process keeps the decoded frame until the file changes.
+"""
+import json
+import logging
+import os
+import tempfile
+import time
+from pathlib import Path
+from typing import Dict, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+logger = logging.getLogger(__name__)
+
+
+def _to_structured(frame: pd.DataFrame) -> np.ndarray:
+    """Frame indexed by stock_code → structured array (text columns as fixed-width unicode)"""
+    out = frame.reset_index(drop="stock_code" in frame.columns)
+    fields = []
+    for name in out.columns:
+        column = out[name]
+        if column.dtype.kind in "fiub":
+            fields.append((name, "f8"))
+        else:
+            # Missing text is stored as "" (an empty or all-missing column still needs width 1)
+            out[name] = column.where(column.notna(), "").astype(str)
+            width = max(int(out[name].str.len().max()) if len(out) else 0, 1)
+            fields.append((name, f"U{width}"))
+    array = np.empty(len(out), dtype=fields)
+    for name, kind in fields:
+        array[name] = out[name].astype(float).values if kind == "f8" else out[name].values
+    return array
+
+
+def _from_structured(array: np.ndarray) -> pd.DataFrame:
+    frame = pd.DataFrame({name: array[name] for name in array.dtype.names})
+    return frame.set_index("stock_code", drop=False)
+
+
+class FactorStore:
+    """Named per-stock factor tables with atomic writes and per-process decoding"""
+
+    def __init__(self, root: str):
+        self.root = Path(root)
+        self._loaded: Dict[str, Tuple[int, pd.DataFrame]] = {}  # name -> (mtime_ns, frame)
+
+    def _path(self, name: str) -> Path:
+        return self.root / f"{name}.npy"
+
+    def _meta_path(self, name: str) -> Path:
+        return self.root / f"{name}.json"
+
+    def load(self, name: str) -> Optional[pd.DataFrame]:
+        """The stored table indexed by stock_code, or None if not built yet"""
+        path = self._path(name)
+        try:
+            mtime = path.stat().st_mtime_ns
+        except FileNotFoundError:
+            return None
+        cached = self._loaded.get(name)
+        if cached and cached[0] == mtime:
+            return cached[1]
+        try:
+            frame = _from_structured(np.load(path))
+        except Exception as e:
+            logger.warning(f"Corrupt factor file {path}, ignoring: {e}")
+            return None
+        self._loaded[name] = (mtime, frame)
+        return frame
+
+    def meta(self, name: str) -> Dict:
+        try:
+            with open(self._meta_path(name)) as f:
+                return json.load(f)
+        except (FileNotFoundError, ValueError):
+            return {}
+
+    def write(self, name: str, frame: pd.DataFrame, meta: Dict):
+        """Atomically replace a table and its sidecar"""
+        self.root.mkdir(parents=True, exist_ok=True)
+        path = self._path(name)
+        fd, tmp = tempfile.mkstemp(dir=self.root, suffix=".npy.tmp")
+        try:
+            with os.fdopen(fd, "wb") as f:
+                np.save(f, _to_structured(frame))
+            os.replace(tmp, path)
+        except BaseException:
+            if os.path.exists(tmp):
+                os.unlink(tmp)
+            raise
+
+        meta_path = self._meta_path(name)
+        fd, tmp = tempfile.mkstemp(dir=self.root, suffix=".json.tmp")
+        with os.fdopen(fd, "w") as f:
+            json.dump({**meta, "rows": len(frame), "built_at": time.time()}, f)
+        os.replace(tmp, meta_path)
+        self._loaded.pop(name, None)
@@ -0,0 +1,141 @@
+# backend/app/services/financial_factors.py
+"""Universe-wide financial factor table.
+
+Built from the quarterly bulk report endpoints — 业绩报表 (``stock_yjbb_em``),
+资产负债表 (``stock_zcfz_em``) and 分红配送 (``stock_fhps_em``) — which return
+every listed company for one reporting period in a handful of paged calls,
+instead of one ``stock_financial_abstract_ths`` call per stock.
+
+A period is only adopted once most of the market has reported for it
+(:data:`FINANCIAL_MIN_COVERAGE`); until then the table stays on the previous
+period, so early in a reporting season it is not rebuilt from the handful of
+companies that have filed. The few late filers keep their previous period's
+row, and year-to-date ROE and EPS are annualized so those rows compare
+like-for-like with the rest.
+"""
+from datetime import date
+from functools import partial
+from typing import Dict, List, Optional
+
+import pandas as pd
+
+from app.utils import columnar
+
+FINANCIAL_FACTOR_TABLE = "financial"
+
+FINANCIAL_FACTOR_FIELDS = [
+    "eps", "bps", "roe", "revenue", "net_profit", "revenue_growth",
+    "net_profit_growth", "gross_margin", "net_margin", "debt_ratio",
+    "current_ratio", "dividend_per_share",
+]
+
+# Share of listed stocks that must have reported before a period is adopted
+FINANCIAL_MIN_COVERAGE = 0.9
+
+_QUARTER_ENDS = ((3, 31), (6, 30), (9, 30), (12, 31))
+
+
+def report_periods(today: date, count: int = 2) -> List[str]:
+    """Most recent quarter-end reporting periods (YYYYMMDD), newest first"""
+    periods = []
+    year = today.year
+    while len(periods) < count:
+        for month, day in reversed(_QUARTER_ENDS):
+            end = date(year, month, day)
+            if end < today and len(periods) < count:
+                periods.append(end.strftime("%Y%m%d"))
+        year -= 1
+    return periods
+
+
+def choose_period(counts: Dict[str, int], listed: int) -> Optional[str]:
+    """Newest period whose report count covers enough of the market, else the best-covered one"""
+    if not counts:
+        return None
+    for period in sorted(counts, reverse=True):
+        if counts[period] >= FINANCIAL_MIN_COVERAGE * listed:
+            return period
+    return max(counts, key=lambda p: (counts[p], p))
+
+
+def annualization(period: str) -> float:
+    """Factor turning a year-to-date figure for ``period`` into a full-year one"""
+    return 12 / int(period[4:6])
+
+
+def annual_period(period: str) -> str:
+    """The latest annual period (dividend plans are announced with annual reports) at or before ``period``"""
+    year = int(period[:4])
+    return f"{year}1231" if period.endswith("1231") else f"{year - 1}1231"
+
+
+def financial_factor_frame(
+    reports: pd.DataFrame,
+    balance: Optional[pd.DataFrame],
+    dividends: Optional[pd.DataFrame],
+    period: str,
+) -> pd.DataFrame:
+    """Join one period's bulk reports into a factor frame indexed by stock_code (ROE/EPS annualized)"""
+    col = partial(columnar.column, reports)
+    revenue = columnar.to_float(col("营业总收入-营业总收入", None), default=None)
+    net_profit = columnar.to_float(col("净利润-净利润", None), default=None)
+    out = pd.DataFrame({
+        "stock_code": columnar.normalize_code(col("股票代码", "")),
+        "report_date": pd.Timestamp(period).strftime("%Y-%m-%d"),
+        "eps": columnar.to_float(col("每股收益", None), default=None) * annualization(period),
+        "bps": columnar.to_float(col("每股净资产", None), default=None),
+        "roe": columnar.to_float(col("净资产收益率", None), default=None) * annualization(period),
+        "revenue": revenue,
+        "net_profit": net_profit,
+        "revenue_growth": columnar.to_float(col("营业总收入-同比增长", None), default=None),
+        "net_profit_growth": columnar.to_float(col("净利润-同比增长", None), default=None),
+        "gross_margin": columnar.to_float(col("销售毛利率", None), default=None),
+        "net_margin": (net_profit / revenue.where(revenue != 0)) * 100,
+    })
+    out = out[out["stock_code"] != ""].drop_duplicates("stock_code").set_index("stock_code")
+
+    if balance is not None and not balance.empty:
+        debt = pd.Series(
+            columnar.to_float(columnar.column(balance, "资产负债率", None), default=None).values,
+            index=columnar.normalize_code(columnar.column(balance, "股票代码", "")),
+        )
+        out["debt_ratio"] = debt[~debt.index.duplicated()].reindex(out.index)
+    else:
+        out["debt_ratio"] = float("nan")
+
+    # The bulk balance sheet has no current assets/liabilities breakdown
+    out["current_ratio"] = float("nan")
+
+    if dividends is not None and not dividends.empty:
+        # 现金分红比例 is cash per 10 shares; a stock can have several plans, keep the latest
+        per_share = pd.Series(
+            (columnar.to_float(columnar.column(dividends, "现金分红-现金分红比例", None), default=None) / 10).values,
+            index=columnar.normalize_code(columnar.column(dividends, "代码", "")),
+        )
+        out["dividend_per_share"] = per_share[~per_share.index.duplicated(keep="last")].reindex(out.index)
+    else:
+        out["dividend_per_share"] = float("nan")
+
+    return out[["report_date"] + FINANCIAL_FACTOR_FIELDS]
+
+
+def merge_with_previous(latest: pd.DataFrame, previous: Optional[pd.DataFrame]) -> pd.DataFrame:
+    """Newest rows win; stocks missing from ``latest`` keep their previous row"""
+    if previous is None or previous.empty:
+        return latest
+    previous = previous.drop(columns=["stock_code"], errors="ignore")
+    carried = previous[~previous.index.isin(latest.index)]
+    return pd.concat([latest, carried.reindex(columns=latest.columns)])
+
+
+def join_financial_factors(snapshot: pd.DataFrame, factors: Optional[pd.DataFrame]) -> pd.DataFrame:
+    """Add the factor columns (and price-based dividend_yield) to a snapshot frame"""
+    if factors is None:
+        return snapshot
+    factors = factors.drop(columns=["stock_code"], errors="ignore")
+    factors = factors[[c for c in factors.columns if c not in snapshot.columns]]
+    joined = snapshot.join(factors, on="stock_code")
+    if "dividend_yield" not in snapshot.columns and "dividend_per_share" in joined.columns:
+        price = joined["price"].where(joined["price"] > 0)
+        joined["dividend_yield"] = joined["dividend_per_share"] / price * 100
+    return joined
@@ -0,0 +1,166 @@
+# backend/app/services/indicator_panel.py
+"""Cross-sectional indicator panel over the local K-line store.
+
+Technical screens used to build one DataFrame per candidate and run the
+pandas indicators stock by stock. An :class:`IndicatorPanel` instead holds
+(bars × stocks) open/high/low/close/volume matrices loaded from the K-line
+store and computes every indicator as one 2D NumPy operation across the
+whole universe (see :mod:`app.utils.panel_indicators`).
+
+Each stock's bars are right-aligned — the last row is its latest bar and
+shorter histories are NaN-padded at the top — so rows are aligned by bar
+position rather than calendar date and a suspension never breaks a window.
+While a session is running, today's bar is taken from the market snapshot.
+"""
+from datetime import date
+from typing import Callable, Dict, Iterable, List, Optional
+
+import numpy as np
+
+from app.services.kline_store import KlineStore, adjust_bars, bar_from_quote, session_status
+from app.utils import panel_indicators as pi
+
+
+class IndicatorPanel:
+    """Aligned OHLCV matrices for many stocks, with cached indicator matrices"""
+
+    def __init__(self, codes: List[str], dates: np.ndarray, fields: Dict[str, np.ndarray]):
+        self.codes = codes
+        self.index = {code: i for i, code in enumerate(codes)}
+        self.dates = dates
+        self.open = fields["open"]
+        self.high = fields["high"]
+        self.low = fields["low"]
+        self.close = fields["close"]
+        self.volume = fields["volume"]
+        self._cache: Dict[tuple, object] = {}
+
+    def __len__(self) -> int:
+        return len(self.codes)
+
+    def __contains__(self, stock_code: str) -> bool:
+        return stock_code in self.index
+
+    def _cached(self, key: tuple, compute: Callable):
+        if key not in self._cache:
+            self._cache[key] = compute()
+        return self._cache[key]
+
+    # ------------------------------------------------------------------
+    # Indicator matrices (bars × stocks)
+    # ------------------------------------------------------------------
+    @property
+    def bars_available(self) -> np.ndarray:
+        """Number of bars held for each stock"""
+        return self._cached(("bars",), lambda: (~np.isnan(self.close)).sum(axis=0))
+
+    def ma(self, n: int) -> np.ndarray:
+        return self._cached(("ma", n), lambda: pi.rolling_mean(self.close, n))
+
+    def ema(self, n: int) -> np.ndarray:
+        return self._cached(("ema", n), lambda: pi.ewm(self.close, 2 / (n + 1)))
+
+    def macd(self, fast: int = 12, slow: int = 26, signal: int = 9) -> Dict[str, np.ndarray]:
+        return self._cached(("macd", fast, slow, signal), lambda: pi.macd(self.close, fast, slow, signal))
+
+    def rsi(self, n: int = 14) -> np.ndarray:
+        return self._cached(("rsi", n), lambda: pi.rsi(self.close, n))
+
+    def kdj(self, n: int = 9, m1: int = 3, m2: int = 3) -> Dict[str, np.ndarray]:
+        return self._cached(("kdj", n, m1, m2), lambda: pi.kdj(self.high, self.low, self.close, n, m1, m2))
+
+    def boll(self, n: int = 20, std_dev: float = 2.0) -> Dict[str, np.ndarray]:
+        return self._cached(("boll", n, std_dev), lambda: pi.boll(self.close, n, std_dev))
+
+    def atr(self, n: int = 14) -> np.ndarray:
+        return self._cached(("atr", n), lambda: pi.atr(self.high, self.low, self.close, n))
+
+    def adx(self, n: int = 14) -> Dict[str, np.ndarray]:
+        return self._cached(("adx", n), lambda: pi.adx(self.high, self.low, self.close, n))
+
+    def volume_ma(self, n: int) -> np.ndarray:
+        return self._cached(("volume_ma", n), lambda: pi.rolling_mean(self.volume, n))
+
+    def highest(self, n: int) -> np.ndarray:
+        """Rolling n-bar high of the high prices"""
+        return self._cached(("highest", n), lambda: pi.rolling_max(self.high, n))
+
+    def lowest(self, n: int) -> np.ndarray:
+        """Rolling n-bar low of the low prices"""
+        return self._cached(("lowest", n), lambda: pi.rolling_min(self.low, n))
+
+    def max_drawdown(self, n: int) -> np.ndarray:
+        """Latest n-bar max drawdown (%) per stock"""
+        return self._cached(("max_drawdown", n), lambda: pi.max_drawdown(self.close, n))
+
+    # ------------------------------------------------------------------
+    # Access aligned to a candidate list
+    # ------------------------------------------------------------------
+    def latest(self, matrix: np.ndarray, codes: Iterable[str], ago: int = 0) -> np.ndarray:
+        """
+        Values ``ago`` bars before each stock's latest bar, in ``codes`` order.
+
+        Accepts a (bars × stocks) matrix or an already reduced per-stock
+        vector; stocks not in the panel get NaN.
+        """
+        row = matrix if matrix.ndim == 1 else (
+            matrix[-1 - ago] if ago < matrix.shape[0] else np.full(matrix.shape[1], np.nan)
+        )
+        positions = np.array([self.index.get(code, -1) for code in codes], dtype=np.int64)
+        out = np.full(len(positions), np.nan)
+        known = positions >= 0
+        out[known] = row[positions[known]]
+        return out
+
+    def series(self, matrix: np.ndarray, stock_code: str) -> np.ndarray:
+        """One stock's column without the top padding (empty if not in the panel)"""
+        i = self.index.get(stock_code)
+        if i is None:
+            return np.empty(0)
+        return matrix[matrix.shape[0] - int(self.bars_available[i]):, i]
+
+
+def load_panel(
+    store: KlineStore,
+    codes: Iterable[str],
+    start: date,
+    adjust: str = "qfq",
+    quotes: Optional[Dict[str, Dict]] = None,
+    today: Optional[date] = None,
+) -> IndicatorPanel:
+    """
+    Build a panel from each stock's stored daily bars dated on/after ``start``.
+
+    When ``quotes`` (snapshot rows by code) are given and a stock's stored
+    history ends before ``today``, the snapshot quote is appended as today's
+    bar — unless it repeats the stored last session or does not follow on from
+    it (see :func:`session_status`). Stocks with no stored bars are left out.
+    """
+    loaded = {}
+    for code in dict.fromkeys(codes):
+        bars = store.window(code, "1d", start)
+        if bars is None:
+            continue
+        if quotes and today is not None:
+            quote = quotes.get(code)
+            live = bar_from_quote(quote, today) if quote else None
+            if (
+                live is not None
+                and len(bars)
+                and bars["date"][-1] < live["date"][0]
+                and session_status(bars, live, quote.get("pre_close") or 0.0) == "append"
+            ):
+                bars = np.concatenate([bars, live])
+        if len(bars) == 0:
+            continue
+        loaded[code] = adjust_bars(bars, store.load_factors(code), adjust) if adjust else bars
+
+    rows = max((len(bars) for bars in loaded.values()), default=0)
+    dates = np.full((rows, len(loaded)), np.datetime64("NaT"), dtype="datetime64[D]")
+    fields = {name: np.full((rows, len(loaded)), np.nan) for name in ("open", "high", "low", "close", "volume")}
+    for i, bars in enumerate(loaded.values()):
+        top = rows - len(bars)
+        dates[top:, i] = bars["date"]
+        for name, matrix in fields.items():
+            matrix[top:, i] = bars[name]
+    return IndicatorPanel(list(loaded), dates, fields)
@@ -0,0 +1,364 @@
+# backend/app/services/kline_store.py
+"""Local on-disk K-line store.
+
+One NumPy structured array per (period, stock) under ``KLINE_STORE_DIR``,
+opened memory-mapped, so any window is a slice instead of an upstream call.
+Files are rewritten atomically (tmp + ``os.replace``) so concurrent readers in
+other processes never see a partial file. A small JSON sidecar records the
+earliest date the history covers and when it was last synced.
+
+Bars are stored unadjusted, next to one post-adjustment (hfq) factor table
+per stock; qfq/hfq views are computed on read. A dividend or split therefore
+only replaces the small factor table — stored prices never change, so the
+history can always be extended incrementally.
+"""
+import json
+import logging
+import os
+import tempfile
+import time
+from datetime import date, timedelta
+from pathlib import Path
+from typing import Dict, List, Optional
+
+import numpy as np
+import pandas as pd
+
+logger = logging.getLogger(__name__)
+
+KLINE_DTYPE = np.dtype([
+    ("date", "datetime64[D]"),
+    ("open", "f8"),
+    ("high", "f8"),
+    ("low", "f8"),
+    ("close", "f8"),
+    ("volume", "i8"),
+    ("amount", "f8"),
+])
+
+FACTOR_DTYPE = np.dtype([
+    ("date", "datetime64[D]"),  # ex-date from which the factor applies
+    ("factor", "f8"),
+])
+
+# Marks files holding unadjusted bars; older qfq-adjusted files are refetched
+RAW_FORMAT = "none"
+
+# Relative tolerance when checking that the overlapping bar still matches
+# (unadjusted bars should never change; a mismatch means upstream corrected them)
+_OVERLAP_RTOL = 1e-4
+
+
+def bars_from_frame(df: pd.DataFrame) -> np.ndarray:
+    """Convert a ``stock_zh_a_hist`` frame to a date-sorted structured array"""
+    bars = np.empty(len(df), dtype=KLINE_DTYPE)
+    if len(df) == 0:
+        return bars
+    bars["date"] = pd.to_datetime(df["日期"]).values.astype("datetime64[D]")
+    bars["open"] = df["开盘"].astype(float).values
+    bars["high"] = df["最高"].astype(float).values
+    bars["low"] = df["最低"].astype(float).values
+    bars["close"] = df["收盘"].astype(float).values
+    bars["volume"] = df["成交量"].astype(float).astype("int64").values
+    bars["amount"] = df["成交额"].astype(float).values
+    return np.sort(bars, order="date")
+
+
+def bars_to_records(bars: np.ndarray) -> List[Dict]:
+    """Structured array → the list-of-dicts shape returned by DataService"""
+    dates = np.datetime_as_string(bars["date"], unit="D").tolist()
+    opens = bars["open"].tolist()
+    highs = bars["high"].tolist()
+    lows = bars["low"].tolist()
+    closes = bars["close"].tolist()
+    volumes = bars["volume"].tolist()
+    amounts = bars["amount"].tolist()
+    return [
+        {"date": d, "open": o, "high": h, "low": lo, "close": c, "volume": v, "amount": a}
+        for d, o, h, lo, c, v, a in zip(dates, opens, highs, lows, closes, volumes, amounts)
+    ]
+
+
+def factors_from_frame(df: pd.DataFrame) -> np.ndarray:
+    """Convert a ``stock_zh_a_daily(adjust="hfq-factor")`` frame to a date-sorted factor array"""
+    factors = np.empty(len(df), dtype=FACTOR_DTYPE)
+    if len(df) == 0:
+        return factors
+    factors["date"] = pd.to_datetime(df["date"]).values.astype("datetime64[D]")
+    factors["factor"] = df["hfq_factor"].astype(float).values
+    return np.sort(factors, order="date")
+
+
+def adjust_bars(bars: np.ndarray, factors: Optional[np.ndarray], adjust: str) -> np.ndarray:
+    """
+    Apply ``"qfq"`` / ``"hfq"`` adjustment to unadjusted bars (``""`` returns them as-is).
+
+    hfq multiplies each bar by the factor in effect on its date; qfq divides
+    that by the latest factor so the most recent prices stay unadjusted.
+    """
+    if not adjust or factors is None or len(factors) == 0 or len(bars) == 0:
+        return bars
+    idx = np.searchsorted(factors["date"], bars["date"], side="right") - 1
+    scale = factors["factor"][np.clip(idx, 0, None)]
+    if adjust == "qfq":
+        scale = scale / factors["factor"][-1]
+    out = np.array(bars)
+    for field in ("open", "high", "low", "close"):
+        out[field] = bars[field] * scale
+    return out
+
+
+def bar_from_quote(quote: Dict, day: date) -> Optional[np.ndarray]:
+    """One daily bar from a ``stock_zh_a_spot_em`` quote, or None if the stock did not trade"""
+    volume = quote.get("volume") or 0
+    close = quote.get("price") or 0
+    if volume <= 0 or close <= 0:
+        return None
+    bar = np.empty(1, dtype=KLINE_DTYPE)
+    bar["date"] = np.datetime64(day, "D")
+    bar["open"] = quote.get("open") or close
+    bar["high"] = quote.get("high") or close
+    bar["low"] = quote.get("low") or close
+    bar["close"] = close
+    bar["volume"] = int(volume)  # 手, same unit as stock_zh_a_hist
+    bar["amount"] = quote.get("amount") or 0.0
+    return bar
+
+
+def session_status(stored: np.ndarray, bar: np.ndarray, pre_close: float) -> str:
+    """
+    How a snapshot bar relates to the stored bars.
+
+    ``"unchanged"`` when its session date is already stored, ``"refetch"``
+    when the previous close does not match the last stored close (missed
+    sessions, or the stock goes ex-rights), otherwise ``"append"``.
+    """
+    if len(stored) == 0:
+        return "refetch"
+    if stored["date"][-1] >= bar["date"][0]:
+        return "unchanged"
+    if not np.isclose(stored[-1]["close"], pre_close, rtol=_OVERLAP_RTOL):
+        return "refetch"
+    return "append"
+
+
+def repeats_last_session(stored: np.ndarray, bar: np.ndarray, pre_close: float) -> bool:
+    """Whether a snapshot bar reproduces the last stored session's prices (as on a market holiday)"""
+    return (
+        len(stored) >= 2
+        and np.isclose(stored[-2]["close"], pre_close, rtol=_OVERLAP_RTOL)
+        and np.isclose(stored[-1]["close"], bar["close"][0], rtol=_OVERLAP_RTOL)
+    )
+
+
+def period_start(day: date, period: str) -> date:
+    """First calendar day of the bar that contains ``day`` (weekly/monthly bars are aggregates)"""
+    if period == "1w":
+        return day - timedelta(days=day.weekday())
+    if period == "1M":
+        return day.replace(day=1)
+    return day
+
+
+class KlineStore:
+    """Append-only per-stock K-line files with memory-mapped reads"""
+
+    def __init__(self, root: str):
+        self.root = Path(root)
+
+    def _path(self, stock_code: str, period: str) -> Path:
+        return self.root / period / f"{stock_code}.npy"
+
+    def _meta_path(self, stock_code: str, period: str) -> Path:
+        return self.root / period / f"{stock_code}.json"
+
+    def _factor_path(self, stock_code: str) -> Path:
+        return self.root / "factors" / f"{stock_code}.npy"
+
+    def _factor_meta_path(self, stock_code: str) -> Path:
+        return self.root / "factors" / f"{stock_code}.json"
+
+    # ------------------------------------------------------------------
+    # Reads
+    # ------------------------------------------------------------------
+    def load(self, stock_code: str, period: str) -> Optional[np.ndarray]:
+        """Memory-mapped bars for a stock, or None if not stored yet"""
+        path = self._path(stock_code, period)
+        try:
+            return np.load(path, mmap_mode="r")
+        except FileNotFoundError:
+            return None
+        except Exception as e:
+            logger.warning(f"Corrupt kline file {path}, ignoring: {e}")
+            return None
+
+    def meta(self, stock_code: str, period: str) -> Dict:
+        try:
+            with open(self._meta_path(stock_code, period)) as f:
+                return json.load(f)
+        except (FileNotFoundError, ValueError):
+            return {}
+
+    def window(self, stock_code: str, period: str, start: date) -> Optional[np.ndarray]:
+        """Bars dated on/after ``start`` (a view into the mmap, no copy)"""
+        bars = self.load(stock_code, period)
+        if bars is None:
+            return None
+        idx = np.searchsorted(bars["date"], np.datetime64(start, "D"), side="left")
+        return bars[idx:]
+
+    def covers(self, stock_code: str, period: str, start: date) -> bool:
+        """Whether stored history was fetched from ``start`` or earlier"""
+        meta = self.meta(stock_code, period)
+        covered_from = meta.get("start")
+        return meta.get("adjust") == RAW_FORMAT and bool(covered_from) and covered_from <= start.isoformat()
+
+    def synced_within(self, stock_code: str, period: str, seconds: float) -> bool:
+        synced_at = self.meta(stock_code, period).get("synced_at", 0)
+        return (time.time() - synced_at) < seconds
+
+    def is_fresh(self, stock_code: str, period: str, start: date, max_age: float) -> bool:
+        """covers() and synced_within() with a single metadata read"""
+        meta = self.meta(stock_code, period)
+        covered_from = meta.get("start")
+        return (
+            meta.get("adjust") == RAW_FORMAT
+            and bool(covered_from)
+            and covered_from <= start.isoformat()
+            and (time.time() - meta.get("synced_at", 0)) < max_age
+        )
+
+    def load_factors(self, stock_code: str) -> Optional[np.ndarray]:
+        """The stock's hfq factor table, or None if not fetched yet"""
+        path = self._factor_path(stock_code)
+        try:
+            return np.load(path)
+        except FileNotFoundError:
+            return None
+        except Exception as e:
+            logger.warning(f"Corrupt factor file {path}, ignoring: {e}")
+            return None
+
+    def factors_synced_within(self, stock_code: str, seconds: float) -> bool:
+        try:
+            with open(self._factor_meta_path(stock_code)) as f:
+                synced_at = json.load(f).get("synced_at", 0)
+        except (FileNotFoundError, ValueError):
+            return False
+        return (time.time() - synced_at) < seconds
+
+    # ------------------------------------------------------------------
+    # Writes
+    # ------------------------------------------------------------------
+    @staticmethod
+    def _save(path: Path, array: np.ndarray):
+        path.parent.mkdir(parents=True, exist_ok=True)
+        fd, tmp = tempfile.mkstemp(dir=path.parent, suffix=".npy.tmp")
+        try:
+            with os.fdopen(fd, "wb") as f:
+                np.save(f, array)
+            os.replace(tmp, path)
+        except BaseException:
+            if os.path.exists(tmp):
+                os.unlink(tmp)
+            raise
+
+    @staticmethod
+    def _save_json(path: Path, payload: Dict):
+        fd, tmp = tempfile.mkstemp(dir=path.parent, suffix=".json.tmp")
+        with os.fdopen(fd, "w") as f:
+            json.dump(payload, f)
+        os.replace(tmp, path)
+
+    def write(self, stock_code: str, period: str, bars: np.ndarray, start: date):
+        """Atomically replace the stored bars and their coverage metadata"""
+        self._save(self._path(stock_code, period), np.ascontiguousarray(bars, dtype=KLINE_DTYPE))
+        self._write_meta(stock_code, period, start)
+
+    def _write_meta(self, stock_code: str, period: str, start: date):
+        self._save_json(
+            self._meta_path(stock_code, period),
+            {"start": start.isoformat(), "synced_at": time.time(), "adjust": RAW_FORMAT},
+        )
+
+    def write_factors(self, stock_code: str, factors: np.ndarray):
+        """Atomically replace the stock's factor table"""
+        self._save(self._factor_path(stock_code), np.ascontiguousarray(factors, dtype=FACTOR_DTYPE))
+        self._save_json(self._factor_meta_path(stock_code), {"synced_at": time.time()})
+
+    def invalidate_factors(self, stock_code: str):
+        """Force the next sync to refetch the factor table (kept for reads until then)"""
+        try:
+            os.unlink(self._factor_meta_path(stock_code))
+        except FileNotFoundError:
+            pass
+
+    def merge(self, stock_code: str, period: str, new_bars: np.ndarray) -> Optional[np.ndarray]:
+        """
+        Combine stored bars with ``new_bars`` fetched from :meth:`sync_start`.
+
+        Stored bars from the first new date onward are replaced, so a partial
+        bar (today's, or the current week/month) is overwritten by the fresh one.
+        Returns None when an overlapping closed bar no longer matches, i.e.
+        upstream revised the history and the caller must refetch it in full.
+        """
+        existing = self.load(stock_code, period)
+        if existing is None or len(existing) == 0:
+            return new_bars
+        if len(new_bars) == 0:
+            return np.array(existing)
+
+        cut = np.searchsorted(existing["date"], new_bars["date"][0], side="left")
+        closed = existing[cut:-1]
+        if len(closed):
+            fresh = new_bars[np.isin(new_bars["date"], closed["date"])]
+            old = closed[np.isin(closed["date"], fresh["date"])]
+            if len(old) and not np.allclose(old["close"], fresh["close"], rtol=_OVERLAP_RTOL):
+                return None
+        return np.concatenate([existing[:cut], new_bars])
+
+    def append_session(self, stock_code: str, bar: np.ndarray, pre_close: float) -> str:
+        """
+        Append the session's daily bar built from the closing snapshot.
+
+        ``pre_close`` is the exchange's previous close, which only matches the
+        stored close when no session is missing and the stock is not going
+        ex-rights today. Returns ``"appended"``, ``"unchanged"`` (the bar's
+        session date is already stored), ``"missing"`` (nothing stored) or
+        ``"refetch"`` (the factor table is invalidated and the caller should
+        resync the stock).
+        """
+        meta = self.meta(stock_code, "1d")
+        existing = self.load(stock_code, "1d")
+        if existing is None or len(existing) == 0 or meta.get("adjust") != RAW_FORMAT:
+            return "missing"
+        status = session_status(existing, bar, pre_close)
+        if status == "unchanged":
+            return status
+        if status == "refetch":
+            self.invalidate_factors(stock_code)
+            return status
+
+        covered_from = meta.get("start")
+        start = date.fromisoformat(covered_from) if covered_from else existing["date"][0].astype(date)
+        self.write(stock_code, "1d", np.concatenate([existing, bar]), start)
+        return "appended"
+
+    def repeats_last_session(self, stock_code: str, bar: np.ndarray, pre_close: float) -> bool:
+        """:func:`repeats_last_session` against the stock's stored daily bars"""
+        existing = self.load(stock_code, "1d")
+        return existing is not None and repeats_last_session(existing, bar, pre_close)
+
+    def sync_start(self, stock_code: str, period: str) -> Optional[date]:
+        """
+        Date to fetch increments from, or None when nothing is stored.
+
+        Starts at the period containing the second-to-last bar, so at least one
+        closed bar overlaps (to detect re-adjustment) and the possibly partial
+        last bar is replaced.
+        """
+        bars = self.load(stock_code, period)
+        if bars is None or len(bars) == 0:
+            return None
+        anchor = bars["date"][-2] if len(bars) >= 2 else bars["date"][-1]
+        return period_start(anchor.astype(date), period)
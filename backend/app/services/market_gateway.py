@@ -0,0 +1,134 @@
+# backend/app/services/market_gateway.py
+"""Market-data gateway: the single owner of upstream snapshot polling.
+
+Run one instance per deployment::
+
+    python -m app.services.market_gateway
+
+It fetches ``stock_zh_a_spot_em`` on a fixed cadence (MARKET_GATEWAY_INTERVAL
+during trading hours, MARKET_GATEWAY_IDLE_INTERVAL otherwise), publishes each
+version through the usual snapshot keys plus the ``market:snapshot:events``
+channel, writes the per-stock realtime keys and InfluxDB points, and keeps a
+heartbeat key alive. API and Celery processes started with
+``MARKET_DATA_MODE=consumer`` only read what it publishes, so upstream load
+stays constant however many workers are running.
+"""
+import asyncio
+import json
+import logging
+import signal
+from typing import List, Dict, Optional
+
+from app.core.cache import get_async_redis
+from app.core.config import settings
+from app.services.data_service import (
+    DataService,
+    GATEWAY_HEARTBEAT_KEY,
+    SNAPSHOT_CHANNEL,
+)
+from app.services.market_snapshot import MarketSnapshot
+
+logger = logging.getLogger(__name__)
+
+REALTIME_QUOTE_TTL = 5
+
+
+async def write_realtime_quotes(quotes: List[Dict]):
+    """Per-stock realtime keys (one pipeline round trip) and InfluxDB points"""
+    from app.core.database import get_influxdb
+
+    redis = get_async_redis(decode_responses=True)
+    async with redis.pipeline(transaction=False) as pipe:
+        for quote in quotes:
+            pipe.setex(f"stock:realtime:{quote['stock_code']}", REALTIME_QUOTE_TTL, json.dumps(quote))
+        await pipe.execute()
+    await get_influxdb().write_realtime_quotes(quotes)
+
+
+class MarketGateway:
+    """Polls the upstream snapshot and publishes every version to Redis"""
+
+    def __init__(self, data_service: Optional[DataService] = None):
+        self.data_service = data_service or DataService()
+
+    @staticmethod
+    def _trading() -> bool:
+        from app.tasks.data_sync import is_trading_time
+        return is_trading_time()
+
+    def interval(self) -> float:
+        return settings.MARKET_GATEWAY_INTERVAL if self._trading() else settings.MARKET_GATEWAY_IDLE_INTERVAL
+
+    async def heartbeat(self, interval: float):
+        try:
+            await get_async_redis().setex(GATEWAY_HEARTBEAT_KEY, int(interval * 3) + 1, "1")
+        except Exception as e:
+            logger.warning(f"Gateway heartbeat failed: {e}")
+
+    async def poll_once(self) -> Optional[MarketSnapshot]:
+        """One fetch + publish cycle; upstream errors are logged, not raised"""
+        try:
+            view = await self.data_service.refresh_snapshot()
+        except Exception as e:
+            logger.error(f"Gateway snapshot fetch failed: {e}")
+            return None
+        if self._trading():
+            try:
+                await write_realtime_quotes(view.rows)
+            except Exception as e:
+                logger.error(f"Gateway realtime quote write failed: {e}")
+        return view
+
+    async def run(self, stop: Optional[asyncio.Event] = None):
+        stop = stop or asyncio.Event()
+        logger.info("Market gateway started")
+        while not stop.is_set():
+            interval = self.interval()
+            await self.heartbeat(interval)
+            started = asyncio.get_running_loop().time()
+            await self.poll_once()
+            elapsed = asyncio.get_running_loop().time() - started
+            try:
+                await asyncio.wait_for(stop.wait(), timeout=max(interval - elapsed, 0.1))
+            except asyncio.TimeoutError:
+                pass
+        logger.info("Market gateway stopped")
+
+
+async def subscribe_snapshots(data_service: Optional[DataService] = None):
+    """Decode each published snapshot version as soon as it is announced.
+
+    Runs in consumer processes so requests find the current version already
+    decoded instead of paying for it on the request path.
+    """
+    data_service = data_service or DataService()
+    while True:
+        try:
+            pubsub = get_async_redis().pubsub()
+            await pubsub.subscribe(SNAPSHOT_CHANNEL)
+            async for message in pubsub.listen():
+                if message.get("type") == "message":
+                    await data_service.get_cached_snapshot_view()
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            logger.warning(f"Snapshot subscription lost: {e}, retrying")
+            await asyncio.sleep(5)
+
+
+def main():
+    from app.core.logging import setup_logging
+    setup_logging()
+
+    async def _run():
+        stop = asyncio.Event()
+        loop = asyncio.get_running_loop()
+        for sig in (signal.SIGINT, signal.SIGTERM):
+            loop.add_signal_handler(sig, stop.set)
+        await MarketGateway().run(stop)
+
+    asyncio.run(_run())
+
+
+if __name__ == "__main__":
+    main()
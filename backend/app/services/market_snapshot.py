@@ -0,0 +1,111 @@
+# backend/app/services/market_snapshot.py
+"""Process-local decoded market snapshot.
+
+The full snapshot (~5,000 quotes) is stored in Redis as one payload plus a
+small version key. Each process decodes the payload once per version and
+keeps it here with code/name indexes, so single-quote lookups are dict hits
+instead of a multi-megabyte ``json.loads``.
+"""
+import time
+from typing import Awaitable, Callable, Dict, Iterable, List, Optional
+
+import pandas as pd
+
+
+def _version_time(version: str) -> Optional[float]:
+    """Versions are ``time.time_ns()`` of the fetch; recover it so age() stays accurate"""
+    try:
+        return int(version) / 1e9
+    except (TypeError, ValueError):
+        return None
+
+
+class MarketSnapshot:
+    """Immutable view over one snapshot version with O(1) code/name lookups"""
+
+    def __init__(self, rows: List[Dict], version: str, fetched_at: Optional[float] = None):
+        self.rows = rows
+        self.version = version
+        self.fetched_at = fetched_at if fetched_at is not None else time.time()
+        self.by_code: Dict[str, Dict] = {r.get("stock_code"): r for r in rows}
+        self._by_name: Optional[Dict[str, Dict]] = None
+        self._search_keys: Optional[List[str]] = None
+        self._frame: Optional[pd.DataFrame] = None
+
+    def __len__(self) -> int:
+        return len(self.rows)
+
+    @property
+    def by_name(self) -> Dict[str, Dict]:
+        """stock_name → row (built lazily on first use)"""
+        if self._by_name is None:
+            self._by_name = {r.get("stock_name"): r for r in self.rows}
+        return self._by_name
+
+    @property
+    def frame(self) -> pd.DataFrame:
+        """Columnar view of the snapshot, indexed by stock_code (built lazily)"""
+        if self._frame is None:
+            self._frame = pd.DataFrame(self.rows).set_index("stock_code", drop=False)
+        return self._frame
+
+    def age(self) -> float:
+        return time.time() - self.fetched_at
+
+    def get(self, stock_code: str) -> Optional[Dict]:
+        return self.by_code.get(stock_code)
+
+    def get_many(self, stock_codes: Iterable[str]) -> List[Dict]:
+        """Rows for the given codes, in input order, skipping unknown codes"""
+        by_code = self.by_code
+        return [by_code[c] for c in stock_codes if c in by_code]
+
+    def search(self, keyword: str, limit: int = 10) -> List[Dict]:
+        """Substring match on code or name (case-insensitive)"""
+        if self._search_keys is None:
+            self._search_keys = [
+                f"{r.get('stock_code', '')}\t{str(r.get('stock_name', '')).upper()}" for r in self.rows
+            ]
+        keyword = keyword.strip().upper()
+        matches = []
+        for key, row in zip(self._search_keys, self.rows):
+            if keyword in key:
+                matches.append(row)
+                if len(matches) >= limit:
+                    break
+        return matches
+
+
+class SnapshotHolder:
+    """Holds the current decoded MarketSnapshot for this process"""
+
+    def __init__(self):
+        self._current: Optional[MarketSnapshot] = None
+
+    @property
+    def current(self) -> Optional[MarketSnapshot]:
+        return self._current
+
+    def publish(self, rows: List[Dict], version: str) -> MarketSnapshot:
+        """Install freshly fetched rows as the current snapshot"""
+        self._current = MarketSnapshot(rows, version)
+        return self._current
+
+    async def resolve(
+        self, version: str, load_rows: Callable[[], Awaitable[Optional[List[Dict]]]]
+    ) -> Optional[MarketSnapshot]:
+        """Return the snapshot for ``version``, decoding via ``load_rows`` only when it changed"""
+        current = self._current
+        if current is not None and current.version == version:
+            return current
+        rows = await load_rows()
+        if not rows:
+            return None
+        self._current = MarketSnapshot(rows, version, fetched_at=_version_time(version))
+        return self._current
+
+    def clear(self):
+        self._current = None
+
+
+snapshot_holder = SnapshotHolder()
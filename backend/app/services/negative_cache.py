@@ -0,0 +1,127 @@
+# backend/app/services/negative_cache.py
+"""Negative caching for per-stock upstream lookups.
+
+When an upstream dataset has nothing for a code (delisted, newly listed, not
+covered by the source), DataService records a short-lived ``neg:`` marker so
+the next scan does not ask again. Codes that keep coming back empty are
+promoted into a longer-lived "known bad" registry; static rules cover codes
+that can never have a dataset (e.g. Beijing-exchange codes have no
+northbound holdings).
+
+Markers live in Redis so every worker shares them, with an in-process copy
+that also serves as the only store when Redis is unavailable. Transient
+failures (network errors, timeouts) are never recorded.
+"""
+import logging
+import time
+from typing import Callable, Dict, Iterable, Set, Tuple
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+# Datasets a code can structurally never have (checked before any cache lookup)
+_BSE_PREFIXES = ("4", "8", "92")
+STATIC_GAPS: Dict[str, Callable[[str], bool]] = {
+    "northbound_hold": lambda code: code.startswith(_BSE_PREFIXES),
+}
+
+
+class NegativeCache:
+    """Short-TTL miss markers plus a registry of codes known to lack a dataset"""
+
+    def __init__(self, ttl: int, bad_after: int, bad_ttl: int):
+        self.ttl = ttl
+        self.bad_after = bad_after
+        self.bad_ttl = bad_ttl
+        self._local: Dict[Tuple[str, str], float] = {}  # (dataset, code) -> expires_at
+        self._misses: Dict[Tuple[str, str], int] = {}
+
+    @staticmethod
+    def _keys(dataset: str, code: str) -> Tuple[str, str, str]:
+        return f"neg:{dataset}:{code}", f"neg:bad:{dataset}:{code}", f"neg:misses:{dataset}:{code}"
+
+    def _local_hit(self, dataset: str, code: str, now: float) -> bool:
+        expires_at = self._local.get((dataset, code))
+        if expires_at is None:
+            return False
+        if expires_at <= now:
+            del self._local[(dataset, code)]
+            return False
+        return True
+
+    async def negatives(self, dataset: str, codes: Iterable[str], redis=None) -> Set[str]:
+        """Subset of ``codes`` that should not be fetched for ``dataset`` (one MGET for the rest)"""
+        rule = STATIC_GAPS.get(dataset)
+        now = time.time()
+        found: Set[str] = set()
+        unknown = []
+        for code in dict.fromkeys(codes):
+            if (rule and rule(code)) or self._local_hit(dataset, code, now):
+                found.add(code)
+            else:
+                unknown.append(code)
+
+        if redis and unknown:
+            keys = [key for code in unknown for key in self._keys(dataset, code)[:2]]
+            try:
+                values = await redis.mget(keys)
+                for i, code in enumerate(unknown):
+                    if values[2 * i] or values[2 * i + 1]:
+                        found.add(code)
+                        # Remember locally for the rest of the short TTL window
+                        self._local[(dataset, code)] = now + self.ttl
+            except Exception as e:
+                logger.debug(f"Negative cache lookup failed for {dataset}: {e}")
+        return found
+
+    async def is_negative(self, dataset: str, code: str, redis=None) -> bool:
+        return code in await self.negatives(dataset, [code], redis)
+
+    async def record_miss(self, dataset: str, code: str, redis=None):
+        """Mark ``code`` empty for ``dataset``; promote it to known-bad after repeated misses"""
+        neg_key, bad_key, misses_key = self._keys(dataset, code)
+        local_key = (dataset, code)
+        misses = self._misses.get(local_key, 0) + 1
+        if redis:
+            try:
+                async with redis.pipeline(transaction=False) as pipe:
+                    pipe.setex(neg_key, self.ttl, 1)
+                    pipe.incr(misses_key)
+                    pipe.expire(misses_key, self.bad_ttl)
+                    _, misses, _ = await pipe.execute()
+            except Exception as e:
+                logger.debug(f"Negative cache write failed for {neg_key}: {e}")
+
+        self._misses[local_key] = misses
+        ttl = self.ttl
+        if misses >= self.bad_after:
+            ttl = self.bad_ttl
+            logger.info(f"{code} registered as lacking {dataset} after {misses} empty lookups")
+            if redis:
+                try:
+                    await redis.setex(bad_key, self.bad_ttl, misses)
+                except Exception as e:
+                    logger.debug(f"Negative cache write failed for {bad_key}: {e}")
+        self._local[local_key] = time.time() + ttl
+
+    async def record_hit(self, dataset: str, code: str, redis=None):
+        """Data showed up: forget any miss history for ``code``"""
+        self._local.pop((dataset, code), None)
+        self._misses.pop((dataset, code), None)
+        if redis:
+            try:
+                await redis.delete(*self._keys(dataset, code))
+            except Exception as e:
+                logger.debug(f"Negative cache clear failed for {dataset}:{code}: {e}")
+
+    def clear(self):
+        self._local.clear()
+        self._misses.clear()
+
+
+negative_cache = NegativeCache(
+    ttl=settings.NEGATIVE_CACHE_TTL,
+    bad_after=settings.KNOWN_BAD_AFTER,
+    bad_ttl=settings.KNOWN_BAD_TTL,
+)
@@ -0,0 +1,50 @@
+# backend/app/services/northbound_holdings.py
+"""Market-wide northbound (Stock Connect) holdings.
+
+One ``stock_hsgt_hold_stock_em`` call returns every northbound-held stock for
+the latest disclosure date, replacing one ``stock_hsgt_individual_em`` call
+per stock. The ``refresh_northbound_holdings`` Celery task builds it daily;
+each disclosure date is kept as its own :class:`DailyTable`.
+"""
+from functools import partial
+from typing import Optional
+
+import pandas as pd
+
+from app.services.daily_table import DailyTable, DailyTableHolder
+from app.utils import columnar
+
+# The ranking reports shares and values in units of 10,000
+_WAN = 10_000
+
+
+def holdings_frame(df: pd.DataFrame) -> pd.DataFrame:
+    """Convert the ``stock_hsgt_hold_stock_em`` frame to per-stock holdings indexed by stock_code"""
+    col = partial(columnar.column, df)
+    out = pd.DataFrame({
+        "stock_code": columnar.normalize_code(col("代码", "")),
+        "stock_name": columnar.to_text(col("名称", "")),
+        "hold_shares": columnar.to_float(col("今日持股-股数")) * _WAN,
+        "hold_market_value": columnar.to_float(col("今日持股-市值")) * _WAN,
+        "hold_pct": columnar.to_float(col("今日持股-占总股本比")),
+        "hold_float_pct": columnar.to_float(col("今日持股-占流通股比")),
+        "change_shares": columnar.to_float(col("今日增持估计-股数")) * _WAN,
+        "change_market_value": columnar.to_float(col("今日增持估计-市值")) * _WAN,
+    })
+    out = out[out["stock_code"] != ""]
+    return out.drop_duplicates("stock_code").set_index("stock_code")
+
+
+def disclosure_date(df: pd.DataFrame) -> Optional[str]:
+    """Latest 日期 in the ranking (ISO), or None when the column is missing"""
+    if "日期" not in df.columns:
+        return None
+    dates = pd.to_datetime(df["日期"], errors="coerce").dropna()
+    return dates.max().strftime("%Y-%m-%d") if not dates.empty else None
+
+
+class NorthboundHoldingTable(DailyTable):
+    """Northbound holdings of every held stock for one disclosure date"""
+
+
+northbound_holder = DailyTableHolder()
@@ -0,0 +1,249 @@
+# backend/app/services/reference_data.py
+"""Process-wide reference data: industry membership and stock metadata.
+
+Slow-changing facts that filters and peer lookups need for every request —
+code→industry, industry→constituents, code→name/board/list date and the ST
+flag — are built from the exchange listings and the Eastmoney industry
+boards once a day (``refresh_reference_data`` Celery task), stored in Redis,
+and held decoded in each process. Lookups are plain dict reads; a process
+re-reads the Redis copy in the background every REFERENCE_DATA_TTL seconds
+and only builds from upstream itself when Redis has nothing.
+"""
+import asyncio
+import logging
+import time
+from typing import Dict, Iterable, List, Optional, Set
+
+import akshare as ak
+import pandas as pd
+
+from app.core import codec, upstream
+from app.core.config import settings
+from app.utils import columnar
+from app.utils.singleflight import SingleFlight
+
+logger = logging.getLogger(__name__)
+
+REFERENCE_CACHE_KEY = "ref:reference_data"
+REFERENCE_REDIS_TTL = 3 * 86400  # survive a missed daily rebuild
+
+# (akshare function, kwargs, code column, name column, list-date column)
+_LISTINGS = [
+    (ak.stock_info_sh_name_code, {"symbol": "主板A股"}, "证券代码", "证券简称", "上市日期"),
+    (ak.stock_info_sh_name_code, {"symbol": "科创板"}, "证券代码", "证券简称", "上市日期"),
+    (ak.stock_info_sz_name_code, {"symbol": "A股列表"}, "A股代码", "A股简称", "A股上市日期"),
+    (ak.stock_info_bj_name_code, {}, "证券代码", "证券简称", "上市日期"),
+]
+
+
+def board_of(code: str) -> str:
+    """Listing board from the code prefix"""
+    if code.startswith(("688", "689")):
+        return "star"
+    if code.startswith("6"):
+        return "sh_main"
+    if code.startswith(("300", "301")):
+        return "chinext"
+    if code.startswith(("000", "001", "002", "003")):
+        return "sz_main"
+    if code.startswith(("4", "8", "92")):
+        return "bse"
+    return "other"
+
+
+def exchange_symbol(code: str) -> str:
+    """Exchange-prefixed symbol (sh600519 / sz000001 / bj830799) used by Sina endpoints"""
+    board = board_of(code)
+    if board in ("sh_main", "star"):
+        return f"sh{code}"
+    if board == "bse":
+        return f"bj{code}"
+    return f"sz{code}"
+
+
+def is_st_name(name: str) -> bool:
+    return "ST" in (name or "").upper()
+
+
+class ReferenceData:
+    """Immutable, indexed reference snapshot"""
+
+    def __init__(self, stocks: List[Dict], memberships: Dict[str, List[str]], built_at: float):
+        self.stocks = stocks
+        self.memberships = memberships
+        self.built_at = built_at
+        self.loaded_at = time.time()
+
+        self._industry_of: Dict[str, str] = {
+            code: industry for industry, codes in memberships.items() for code in codes
+        }
+        self._info: Dict[str, Dict] = {}
+        for row in stocks:
+            code = row["stock_code"]
+            self._info[code] = {
+                **row,
+                "board": board_of(code),
+                "is_st": is_st_name(row.get("stock_name", "")),
+                "industry": self._industry_of.get(code),
+            }
+
+    # -- serialization (Redis copy) -------------------------------------
+    def to_payload(self) -> Dict:
+        return {"stocks": self.stocks, "memberships": self.memberships, "built_at": self.built_at}
+
+    @classmethod
+    def from_payload(cls, payload: Dict) -> "ReferenceData":
+        return cls(payload.get("stocks") or [], payload.get("memberships") or {}, payload.get("built_at", 0.0))
+
+    # -- lookups ----------------------------------------------------------
+    def age(self) -> float:
+        return time.time() - self.loaded_at
+
+    def industry_of(self, code: str) -> Optional[str]:
+        return self._industry_of.get(code)
+
+    def constituents(self, industry: str) -> List[str]:
+        return self.memberships.get(industry, [])
+
+    def industries(self) -> List[str]:
+        return sorted(self.memberships)
+
+    def codes_in(self, industries: Iterable[str]) -> Set[str]:
+        return {code for industry in industries for code in self.memberships.get(industry, [])}
+
+    def info(self, code: str) -> Optional[Dict]:
+        """{stock_code, stock_name, list_date, board, is_st, industry} or None"""
+        return self._info.get(code)
+
+    def name_of(self, code: str) -> Optional[str]:
+        info = self._info.get(code)
+        return info["stock_name"] if info else None
+
+    def is_st(self, code: str) -> bool:
+        info = self._info.get(code)
+        return bool(info and info["is_st"])
+
+
+def _listing_records(df: pd.DataFrame, code_col: str, name_col: str, date_col: str) -> List[Dict]:
+    if df is None or df.empty or code_col not in df.columns:
+        return []
+    col = lambda name: columnar.column(df, name, "")
+    out = pd.DataFrame({
+        "stock_code": columnar.normalize_code(df[code_col]),
+        "stock_name": columnar.to_text(col(name_col)),
+        "list_date": pd.to_datetime(col(date_col), errors="coerce").dt.strftime("%Y-%m-%d").fillna(""),
+    })
+    return columnar.to_records(out)
+
+
+class ReferenceRegistry:
+    """Per-process holder of the current ReferenceData"""
+
+    def __init__(self):
+        self._current: Optional[ReferenceData] = None
+        self._inflight = SingleFlight()
+        self._background: Set[asyncio.Task] = set()
+
+    @property
+    def current(self) -> Optional[ReferenceData]:
+        return self._current
+
+    async def get(self) -> ReferenceData:
+        """Current reference data; stale copies are served while a reload runs"""
+        current = self._current
+        if current is not None:
+            if current.age() >= settings.REFERENCE_DATA_TTL and not self._inflight.in_flight(REFERENCE_CACHE_KEY):
+                task = asyncio.ensure_future(self._inflight.do(REFERENCE_CACHE_KEY, self.load))
+                self._background.add(task)
+                task.add_done_callback(self._background.discard)
+            return current
+        return await self._inflight.do(REFERENCE_CACHE_KEY, self.load)
+
+    async def load(self) -> ReferenceData:
+        """Adopt the shared Redis copy, building it from upstream if there is none"""
+        payload = await self._read_shared()
+        if payload:
+            data = ReferenceData.from_payload(payload)
+        else:
+            data = await self.rebuild()
+        self._current = data
+        return data
+
+    async def rebuild(self) -> ReferenceData:
+        """Build from upstream and publish to Redis (scheduled daily)"""
+        data = await self._build()
+        self._current = data
+        await self._write_shared(data)
+        return data
+
+    def publish(self, data: ReferenceData):
+        self._current = data
+
+    def clear(self):
+        self._current = None
+
+    # ------------------------------------------------------------------
+    async def _read_shared(self) -> Optional[Dict]:
+        try:
+            from app.core.cache import get_async_redis
+            raw = await get_async_redis().get(REFERENCE_CACHE_KEY)
+            return codec.decode(raw) if raw else None
+        except Exception as e:
+            logger.debug(f"Reference data Redis read failed: {e}")
+            return None
+
+    async def _write_shared(self, data: ReferenceData):
+        try:
+            from app.core.cache import get_async_redis
+            await get_async_redis().setex(REFERENCE_CACHE_KEY, REFERENCE_REDIS_TTL, codec.encode(data.to_payload()))
+        except Exception as e:
+            logger.debug(f"Reference data Redis write failed: {e}")
+
+    async def _build(self) -> ReferenceData:
+        stocks = await self._fetch_listings()
+        memberships = await self._fetch_memberships()
+        if not stocks and not memberships:
+            if self._current is not None:
+                logger.warning("Reference data rebuild failed, keeping previous copy")
+                return self._current
+            raise RuntimeError("Reference data unavailable")
+        logger.info(f"Reference data built: {len(stocks)} stocks, {len(memberships)} industries")
+        return ReferenceData(stocks, memberships, time.time())
+
+    async def _fetch_listings(self) -> List[Dict]:
+        async def _one(func, kwargs, code_col, name_col, date_col) -> List[Dict]:
+            try:
+                df = await upstream.call(func, **kwargs)
+                return _listing_records(df, code_col, name_col, date_col)
+            except Exception as e:
+                logger.warning(f"Listing {func.__name__}{kwargs} failed: {e}")
+                return []
+
+        parts = await asyncio.gather(*(_one(*spec) for spec in _LISTINGS))
+        by_code = {row["stock_code"]: row for part in parts for row in part}
+        return list(by_code.values())
+
+    async def _fetch_memberships(self) -> Dict[str, List[str]]:
+        try:
+            df = await upstream.call(ak.stock_board_industry_name_em)
+            names = columnar.to_text(df["板块名称"]).tolist() if "板块名称" in df.columns else []
+        except Exception as e:
+            logger.warning(f"Industry board list failed: {e}")
+            return {}
+
+        semaphore = asyncio.Semaphore(settings.DATA_BATCH_CONCURRENCY)
+
+        async def _constituents(name: str) -> List[str]:
+            async with semaphore:
+                try:
+                    cons = await upstream.call(ak.stock_board_industry_cons_em, symbol=name)
+                    return columnar.normalize_code(cons["代码"]).tolist() if "代码" in cons.columns else []
+                except Exception as e:
+                    logger.warning(f"Industry constituents for {name} failed: {e}")
+                    return []
+
+        members = await asyncio.gather(*(_constituents(name) for name in names))
+        return {name: codes for name, codes in zip(names, members) if codes}
+
+
+reference_registry = ReferenceRegistry()
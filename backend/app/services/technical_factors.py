@@ -0,0 +1,58 @@
+# backend/app/services/technical_factors.py
+"""Universe-wide technical factor table.
+
+The latest RSI, MACD, KDJ and moving-average values of every stock,
+computed from one cross-sectional :class:`IndicatorPanel` over the local
+K-line store. It is rebuilt after the close (and optionally refreshed during
+the session with the snapshot's live bar) and joined into StockFilter's
+frame, so technical fields filter like any snapshot column instead of
+needing per-stock K-line fetches at query time.
+"""
+from typing import Optional
+
+import numpy as np
+import pandas as pd
+
+from app.services.indicator_panel import IndicatorPanel
+
+TECHNICAL_FACTOR_TABLE = "technical"
+
+TECHNICAL_FACTOR_FIELDS = [
+    "rsi", "macd_dif", "macd_dea", "kdj_k", "kdj_d",
+    "ma5", "ma10", "ma20", "ma60",
+]
+
+# Calendar days of bars behind each value (~135 sessions: MA60 plus EMA warm-up)
+TECHNICAL_FACTOR_DAYS = 200
+
+
+def technical_factor_frame(panel: IndicatorPanel) -> pd.DataFrame:
+    """Latest indicator values per stock, indexed by stock_code"""
+    codes = panel.codes
+    index = pd.Index(codes, name="stock_code")
+    if len(panel) == 0 or panel.close.shape[0] == 0:
+        out = pd.DataFrame(np.nan, index=index, columns=TECHNICAL_FACTOR_FIELDS)
+        out.insert(0, "trade_date", "")
+        return out
+
+    macd = panel.macd()
+    kdj = panel.kdj()
+    matrices = {
+        "rsi": panel.rsi(14),
+        "macd_dif": macd["dif"],
+        "macd_dea": macd["dea"],
+        "kdj_k": kdj["k"],
+        "kdj_d": kdj["d"],
+        **{f"ma{n}": panel.ma(n) for n in (5, 10, 20, 60)},
+    }
+    out = pd.DataFrame({name: panel.latest(matrix, codes) for name, matrix in matrices.items()}, index=index)
+    out.insert(0, "trade_date", np.datetime_as_string(panel.dates[-1], unit="D"))
+    return out
+
+
+def join_technical_factors(snapshot: pd.DataFrame, factors: Optional[pd.DataFrame]) -> pd.DataFrame:
+    """Add the technical factor columns to a snapshot frame (NaN for stocks without history)"""
+    if factors is None:
+        return snapshot
+    columns = [c for c in TECHNICAL_FACTOR_FIELDS if c in factors.columns and c not in snapshot.columns]
+    return snapshot.join(factors[columns], on="stock_code")
@@ -3,9 +3,9 @@
 from celery import shared_task, group
 from datetime import datetime, time
 import asyncio
-import json
 import logging
 from app.core.alerting import alert_manager, AlertLevel
+from app.core.config import settings
 
 logger = logging.getLogger(__name__)
 
@@ -41,6 +41,9 @@ def sync_realtime_quotes(self):
     try:
         if not is_trading_time():
             return "Not trading time"
+        if settings.MARKET_DATA_MODE == "consumer":
+            # 行情网关负责轮询与写入实时行情
+            return "Handled by market gateway"
 
         result = asyncio.run(_sync_realtime_quotes())
         return result
@@ -59,12 +62,9 @@ def sync_realtime_quotes(self):
 async def _sync_realtime_quotes():
     """异步同步实时行情"""
     from app.services.data_service import DataService
-    from app.core.cache import get_redis
-    from app.core.database import get_influxdb
+    from app.services.market_gateway import write_realtime_quotes
 
     data_service = DataService()
-    redis = get_redis()
-    influxdb = get_influxdb()
 
     # 1. 获取所有股票代码
     stock_codes = await data_service.get_all_stock_codes()
@@ -72,13 +72,8 @@ async def _sync_realtime_quotes():
     # 2. 批量获取实时行情
     quotes = await data_service.fetch_realtime_quotes_batch(stock_codes)
 
-    # 3. 写入 Redis（TTL: 5秒）
-    for quote in quotes:
-        cache_key = f"stock:realtime:{quote['stock_code']}"
-        await redis.setex(cache_key, 5, json.dumps(quote))
-
-    # 4. 写入 InfluxDB
-    await influxdb.write_realtime_quotes(quotes)
+    # 3. 写入 Redis（TTL: 5秒，单次 pipeline 往返）与 InfluxDB
+    await write_realtime_quotes(quotes)
 
     return len(quotes)
 
@@ -173,45 +168,84 @@ async def _sync_financial_data(stock_code: str):
 
 @shared_task(name="sync_all_financial_data")
 def sync_all_financial_data():
-    """批量同步所有股票财务数据 (凌晨2:00)"""
+    """更新全市场财务因子表 (凌晨2:00，仅在有新报告期/新披露时重建)"""
     result = asyncio.run(_sync_all_financial_data())
     return result
 
 
 async def _sync_all_financial_data():
-    """异步批量同步财务数据"""
+    """异步更新全市场财务因子表"""
     from app.services.data_service import DataService
 
-    data_service = DataService()
-    stock_codes = await data_service.get_all_stock_codes()
+    meta = await DataService().sync_financial_factors()
+    if not meta.get("updated"):
+        return f"Financial factors unchanged (period {meta.get('period')})"
+    return f"Financial factors for {meta['period']}: {meta['rows']} stocks"
 
-    # Use Celery group for parallel financial sync
-    job = group(
-        sync_financial_data.s(code) for code in stock_codes[:500]
-    )
-    job.apply_async()
 
-    return f"Syncing financial data for {min(len(stock_codes), 500)} stocks"
+@shared_task(name="refresh_reference_data")
+def refresh_reference_data():
+    """重建行业成分与股票基础信息参考数据 (每日 8:30)"""
+    result = asyncio.run(_refresh_reference_data())
+    return result
+
+
+async def _refresh_reference_data():
+    """异步重建参考数据并写入 Redis"""
+    from app.services.reference_data import reference_registry
+
+    ref = await reference_registry.rebuild()
+    return f"Reference data: {len(ref.stocks)} stocks, {len(ref.memberships)} industries"
+
+
+@shared_task(name="refresh_northbound_holdings")
+def refresh_northbound_holdings():
+    """拉取全市场北向持股并按日期存储 (每日 9:00)"""
+    result = asyncio.run(_refresh_northbound_holdings())
+    return result
+
+
+async def _refresh_northbound_holdings():
+    """异步拉取全市场北向持股表"""
+    from app.services.data_service import DataService
+
+    table = await DataService().sync_northbound_holdings()
+    return f"Northbound holdings {table.trade_date}: {len(table)} stocks"
 
 
 @shared_task(name="sync_all_stocks_data")
 def sync_all_stocks_data():
-    """批量同步所有股票数据"""
+    """收盘后用最后一次行情快照生成当日日线 (交易日 16:00)"""
     result = asyncio.run(_sync_all_stocks_data())
     return result
 
 
 async def _sync_all_stocks_data():
-    """异步批量同步所有股票数据"""
+    """异步生成全市场当日日线，仅对除权或缺失交易日的股票单独重新同步"""
     from app.services.data_service import DataService
+    from app.core.database import get_influxdb
 
     data_service = DataService()
-    stock_codes = await data_service.get_all_stock_codes()
-
-    # 使用 Celery group 并行执行
-    job = group(
-        sync_kline_data.s(code) for code in stock_codes
-    )
-    result = job.apply_async()
-
-    return f"Syncing {len(stock_codes)} stocks"
+    view = None
+    if settings.MARKET_DATA_MODE == "consumer":
+        # 行情网关独占上游快照拉取，这里只读取其发布的收盘快照
+        view = await data_service.fetch_snapshot_view()
+        if not view:
+            return "No market snapshot published"
+    summary = await data_service.synthesize_eod_bars(view)
+
+    if summary["bars"]:
+        try:
+            await get_influxdb().write_daily_bars(summary["bars"])
+        except Exception as e:
+            logger.warning(f"Failed to write EOD bars to InfluxDB: {e}")
+
+    # 除权股票需刷新复权因子、缺口股票需补齐日线，走逐只增量同步
+    refetch = summary["refetch"]
+    if refetch:
+        job = group(
+            sync_kline_data.s(code) for code in refetch
+        )
+        job.apply_async()
+
+    return f"Appended {summary['appended']} bars, refetching {len(refetch)} stocks"
@@ -87,3 +87,23 @@ async def _calculate_all_indicators():
     result = job.apply_async()
 
     return f"Calculating indicators for {len(stock_codes)} stocks"
+
+
+@shared_task(name="build_technical_factors")
+def build_technical_factors(live: bool = False):
+    """重建全市场技术因子表（收盘后全量重建；live=True 时盘中用实时快照刷新当日值）"""
+    from app.core.config import settings
+    from app.tasks.data_sync import is_trading_time
+
+    if live and not (settings.TECHNICAL_FACTOR_INTRADAY and is_trading_time()):
+        return "Intraday refresh skipped"
+    result = asyncio.run(_build_technical_factors(live))
+    return result
+
+
+async def _build_technical_factors(live: bool):
+    """异步重建技术因子表：盘中刷新只读本地 K 线，不触发上游同步"""
+    from app.services.data_service import DataService
+
+    meta = await DataService().sync_technical_factors(live=live, sync=not live)
+    return f"Technical factors for {meta.get('trade_date')}: {meta.get('rows', 0)} stocks"
@@ -0,0 +1,111 @@
+# backend/app/utils/columnar.py
+
+import numpy as np
+import pandas as pd
+from typing import Dict, List, Optional
+
+_NULL_TOKENS = ('', '-', '--', 'false', 'False', 'None', 'nan', 'NaN')
+
+
+def column(df: pd.DataFrame, name: str, default=0) -> pd.Series:
+    """
+    取列，缺失时返回常量列（对应逐行 ``row.get(name, default)`` 的语义）
+
+    Args:
+        df: 原始 DataFrame
+        name: 列名
+        default: 列不存在时的填充值
+
+    Returns:
+        与 df 同索引的 Series
+    """
+    if name in df.columns:
+        return df[name]
+    return pd.Series(default, index=df.index, dtype=object if default is None else None)
+
+
+def _as_text(series: pd.Series) -> pd.Series:
+    """object 列统一转成去空白的字符串，空值/占位符转为 NaN"""
+    text = series.astype(str).str.strip()
+    return text.mask(series.isna() | text.isin(_NULL_TOKENS))
+
+
+def to_float(series: pd.Series, default: Optional[float] = 0.0) -> pd.Series:
+    """
+    整列转 float
+
+    处理 '-'、空串、'%' 后缀和 NaN；default 为 None 时保留 NaN，
+    由 :func:`to_records` 输出为 None。
+    """
+    if pd.api.types.is_bool_dtype(series):
+        values = pd.Series(np.nan, index=series.index)
+    elif pd.api.types.is_numeric_dtype(series):
+        values = series.astype('float64')
+    else:
+        text = _as_text(series).str.rstrip('%')
+        values = pd.to_numeric(text, errors='coerce')
+    if default is None:
+        return values
+    return values.fillna(default)
+
+
+def to_int(series: pd.Series, default: int = 0) -> pd.Series:
+    """整列转 int（截断小数），无法解析的值取 default"""
+    if pd.api.types.is_integer_dtype(series):
+        return series.astype('int64')
+    if pd.api.types.is_numeric_dtype(series) and not pd.api.types.is_bool_dtype(series):
+        values = series.astype('float64')
+    else:
+        values = pd.to_numeric(_as_text(series), errors='coerce')
+    values = values.where(np.isfinite(values), np.nan)
+    return np.trunc(values.fillna(default)).astype('int64')
+
+
+def parse_cn_amount(series: pd.Series, default: float = 0.0) -> pd.Series:
+    """
+    整列解析中文金额（'5.89亿'、'-5789.53万'）为元
+    """
+    if pd.api.types.is_numeric_dtype(series) and not pd.api.types.is_bool_dtype(series):
+        return series.astype('float64').fillna(default)
+
+    text = _as_text(series)
+    is_yi = text.str.endswith('亿', na=False)
+    is_wan = text.str.endswith('万', na=False)
+    digits = text.where(~(is_yi | is_wan), text.str[:-1])
+
+    values = pd.to_numeric(digits, errors='coerce')
+    multiplier = np.where(is_yi, 1e8, np.where(is_wan, 1e4, 1.0))
+    return (values * multiplier).fillna(default)
+
+
+def normalize_code(series: pd.Series) -> pd.Series:
+    """整列规范化为 6 位股票代码（兼容 600519.0、带前缀的代码）"""
+    if pd.api.types.is_integer_dtype(series):
+        return series.astype(str).str.zfill(6).str[-6:]
+
+    text = series.astype(str).str.strip()
+    text = text.mask(series.isna(), '')
+    digits = text.str.replace(r'\.0$', '', regex=True).str.replace(r'\D', '', regex=True)
+    return digits.str[-6:].str.zfill(6).where(digits.str.len() > 0, '')
+
+
+def to_text(series: pd.Series, max_len: Optional[int] = None) -> pd.Series:
+    """整列转字符串（与 ``str(value)`` 一致），可选截断长度"""
+    text = series.astype(str)
+    if max_len is not None:
+        text = text.str[:max_len]
+    return text
+
+
+def to_records(df: pd.DataFrame) -> List[Dict]:
+    """
+    一次性把已规范化的列转换为 dict 列表
+
+    含 NaN 的浮点列输出 None（JSON 可序列化），其余列保持原生 Python 类型。
+    """
+    nullable = [c for c in df.columns if df[c].dtype.kind == 'f' and df[c].isna().any()]
+    if nullable:
+        df = df.copy()
+        for c in nullable:
+            df[c] = df[c].astype(object).where(df[c].notna(), None)
+    return df.to_dict('records')
@@ -0,0 +1,188 @@
+# backend/app/utils/panel_indicators.py
+"""
+截面（面板）技术指标
+
+输入为 (T, N) 的二维矩阵：行是按时间排列的 K 线，列是股票。每只股票的 K 线
+右对齐（最后一行是最新一根），历史不足的部分在顶部以 NaN 填充。所有计算沿
+axis=0 一次完成全部股票，结果与 :mod:`app.utils.indicators` 逐只计算一致。
+"""
+
+import numpy as np
+from numpy.lib.stride_tricks import sliding_window_view
+from typing import Callable, Dict
+
+
+def _rolling(x: np.ndarray, n: int, reduce: Callable, **kwargs) -> np.ndarray:
+    """滑动窗口聚合，窗口内含 NaN 时结果为 NaN（同 pandas rolling 默认行为）"""
+    out = np.full(x.shape, np.nan)
+    if n <= 0 or x.shape[0] < n:
+        return out
+    windows = sliding_window_view(x, n, axis=0)
+    out[n - 1:] = reduce(windows, axis=-1, **kwargs)
+    return out
+
+
+def rolling_mean(x: np.ndarray, n: int) -> np.ndarray:
+    return _rolling(x, n, np.mean)
+
+
+def rolling_std(x: np.ndarray, n: int) -> np.ndarray:
+    """样本标准差 (ddof=1)"""
+    return _rolling(x, n, np.std, ddof=1)
+
+
+def rolling_max(x: np.ndarray, n: int) -> np.ndarray:
+    return _rolling(x, n, np.max)
+
+
+def rolling_min(x: np.ndarray, n: int) -> np.ndarray:
+    return _rolling(x, n, np.min)
+
+
+def shift(x: np.ndarray, n: int = 1) -> np.ndarray:
+    """整体下移 n 行，顶部补 NaN"""
+    out = np.full(x.shape, np.nan)
+    if n < x.shape[0]:
+        out[n:] = x[:x.shape[0] - n]
+    return out
+
+
+def ewm(x: np.ndarray, alpha: float, min_periods: int = 0) -> np.ndarray:
+    """
+    指数加权均值，等价于 pandas ``ewm(alpha=alpha, adjust=False).mean()``
+
+    每列从第一个有效值起算；中间出现 NaN 时沿用上一个值，并按 pandas
+    (ignore_na=False) 的方式衰减旧权重。行数只有几百，逐行循环、列向量化。
+    """
+    out = np.full(x.shape, np.nan)
+    weighted = np.full(x.shape[1:], np.nan)
+    old_wt = np.ones(x.shape[1:])
+    count = np.zeros(x.shape[1:], dtype=np.int64)
+    min_periods = max(min_periods, 1)
+    for t in range(x.shape[0]):
+        cur = x[t]
+        observed = ~np.isnan(cur)
+        started = ~np.isnan(weighted)
+        old_wt = np.where(started, old_wt * (1 - alpha), old_wt)
+        with np.errstate(invalid="ignore"):
+            blended = (old_wt * weighted + alpha * cur) / (old_wt + alpha)
+        weighted = np.where(observed, np.where(started, blended, cur), weighted)
+        old_wt = np.where(observed & started, 1.0, old_wt)
+        count += observed
+        out[t] = np.where(count >= min_periods, weighted, np.nan)
+    return out
+
+
+def _true_range(high: np.ndarray, low: np.ndarray, close: np.ndarray) -> np.ndarray:
+    """真实波幅；首根 K 线没有前收盘，取最高价 - 最低价"""
+    prev_close = shift(close)
+    tr = np.fmax(np.abs(high - prev_close), np.abs(low - prev_close))
+    return np.fmax(high - low, tr)
+
+
+def macd(
+    close: np.ndarray,
+    fast_period: int = 12,
+    slow_period: int = 26,
+    signal_period: int = 9
+) -> Dict[str, np.ndarray]:
+    """
+    MACD 指标
+
+    Returns:
+        包含 dif, dea, bar 的字典
+    """
+    dif = ewm(close, 2 / (fast_period + 1)) - ewm(close, 2 / (slow_period + 1))
+    dea = ewm(dif, 2 / (signal_period + 1))
+    return {'dif': dif, 'dea': dea, 'bar': (dif - dea) * 2}
+
+
+def rsi(close: np.ndarray, period: int = 14) -> np.ndarray:
+    """Wilder RSI（alpha=1/period，至少 period 根 K 线）"""
+    delta = close - shift(close)
+    padding = np.isnan(close)
+    with np.errstate(invalid="ignore"):
+        gain = np.where(delta > 0, delta, 0.0)
+        loss = np.where(delta < 0, -delta, 0.0)
+    # 首根 K 线的涨跌记为 0（同 pandas where 的处理），填充行保持 NaN
+    gain[padding] = np.nan
+    loss[padding] = np.nan
+    avg_gain = ewm(gain, 1 / period, min_periods=period)
+    avg_loss = ewm(loss, 1 / period, min_periods=period)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        return 100 - 100 / (1 + avg_gain / avg_loss)
+
+
+def kdj(
+    high: np.ndarray,
+    low: np.ndarray,
+    close: np.ndarray,
+    n: int = 9,
+    m1: int = 3,
+    m2: int = 3
+) -> Dict[str, np.ndarray]:
+    """
+    KDJ 指标
+
+    Returns:
+        包含 k, d, j 的字典
+    """
+    low_n = rolling_min(low, n)
+    high_n = rolling_max(high, n)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        rsv = (close - low_n) / (high_n - low_n) * 100
+    k = ewm(rsv, 1 / m1)
+    d = ewm(k, 1 / m2)
+    return {'k': k, 'd': d, 'j': 3 * k - 2 * d}
+
+
+def boll(close: np.ndarray, period: int = 20, std_dev: float = 2.0) -> Dict[str, np.ndarray]:
+    """
+    布林带
+
+    Returns:
+        包含 upper, mid, lower 的字典
+    """
+    mid = rolling_mean(close, period)
+    std = rolling_std(close, period)
+    return {'upper': mid + std * std_dev, 'mid': mid, 'lower': mid - std * std_dev}
+
+
+def atr(high: np.ndarray, low: np.ndarray, close: np.ndarray, period: int = 14) -> np.ndarray:
+    """ATR：真实波幅的简单移动平均"""
+    return rolling_mean(_true_range(high, low, close), period)
+
+
+def adx(high: np.ndarray, low: np.ndarray, close: np.ndarray, period: int = 14) -> Dict[str, np.ndarray]:
+    """
+    ADX 趋势强度指标
+
+    Returns:
+        包含 adx, plus_di, minus_di 的字典
+    """
+    padding = np.isnan(close)
+    plus_dm = high - shift(high)
+    minus_dm = shift(low) - low
+    with np.errstate(invalid="ignore"):
+        plus_dm = np.where((plus_dm > minus_dm) & (plus_dm > 0), plus_dm, 0.0)
+        minus_dm = np.where((minus_dm > plus_dm) & (minus_dm > 0), minus_dm, 0.0)
+    plus_dm[padding] = np.nan
+    minus_dm[padding] = np.nan
+
+    alpha = 2 / (period + 1)
+    tr = ewm(_true_range(high, low, close), alpha)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        plus_di = 100 * ewm(plus_dm, alpha) / tr
+        minus_di = 100 * ewm(minus_dm, alpha) / tr
+        dx = 100 * np.abs(plus_di - minus_di) / (plus_di + minus_di)
+    return {'adx': ewm(dx, alpha), 'plus_di': plus_di, 'minus_di': minus_di}
+
+
+def max_drawdown(close: np.ndarray, period: int) -> np.ndarray:
+    """最近 period 根 K 线内的最大回撤（%），历史不足的股票为 NaN"""
+    recent = close[-period:]
+    if recent.shape[0] < period:
+        return np.full(close.shape[1:], np.nan)
+    peak = np.maximum.accumulate(recent, axis=0)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        return ((peak - recent) / peak * 100).max(axis=0)
@@ -1,49 +1,110 @@
 # backend/app/utils/retry.py
 
-from functools import wraps
+import asyncio
+import random
 import time
+from collections import deque
+from functools import wraps
 import logging
-from typing import Callable, TypeVar, Any
+from typing import Callable, TypeVar, Any, Optional, Tuple, Type
 
 logger = logging.getLogger(__name__)
 
 T = TypeVar('T')
 
 
-def retry_on_failure(max_retries: int = 3, delay: float = 1, backoff: float = 2):
+def backoff_delay(attempt: int, delay: float, backoff: float, max_delay: float) -> float:
+    """
+    指数退避 + 全抖动（full jitter）
+
+    Args:
+        attempt: 第几次重试（从 1 开始）
+        delay: 初始延迟时间（秒）
+        backoff: 延迟时间的倍增因子
+        max_delay: 延迟上限（秒）
+
+    Returns:
+        [0, min(max_delay, delay * backoff^(attempt-1))] 内的随机延迟
+    """
+    return random.uniform(0, min(max_delay, delay * backoff ** (attempt - 1)))
+
+
+class RetryBudget:
+    """
+    重试预算：滑动窗口内重试次数不超过调用次数的 ``ratio`` 倍（至少 ``min_retries`` 次），
+    避免上游故障时重试把流量放大数倍
+    """
+
+    def __init__(self, ratio: float = 0.2, min_retries: int = 10, window: float = 10.0):
+        self.ratio = ratio
+        self.min_retries = min_retries
+        self.window = window
+        self._calls: deque = deque()
+        self._retries: deque = deque()
+
+    def _trim(self, now: float):
+        for events in (self._calls, self._retries):
+            while events and events[0] <= now - self.window:
+                events.popleft()
+
+    def record_call(self):
+        now = time.monotonic()
+        self._trim(now)
+        self._calls.append(now)
+
+    def try_spend(self) -> bool:
+        """是否还允许一次重试（允许则计入预算）"""
+        now = time.monotonic()
+        self._trim(now)
+        if len(self._retries) >= max(self.min_retries, self.ratio * len(self._calls)):
+            return False
+        self._retries.append(now)
+        return True
+
+
+def retry_on_failure(
+    max_retries: int = 3,
+    delay: float = 1,
+    backoff: float = 2,
+    max_delay: float = 30,
+    retry_on: Tuple[Type[BaseException], ...] = (Exception,),
+    budget: Optional[RetryBudget] = None,
+):
     """
-    重试装饰器
+    异步重试装饰器（asyncio.sleep 退避，不阻塞事件循环）
 
     Args:
-        max_retries: 最大重试次数
+        max_retries: 最大尝试次数
         delay: 初始延迟时间（秒）
         backoff: 延迟时间的倍增因子
+        max_delay: 单次延迟上限（秒）
+        retry_on: 仅对这些异常类型重试
+        budget: 可选的共享重试预算，耗尽时直接抛出
     """
     def decorator(func: Callable[..., T]) -> Callable[..., T]:
         @wraps(func)
         async def wrapper(*args: Any, **kwargs: Any) -> T:
             retries = 0
-            current_delay = delay
 
-            while retries < max_retries:
+            while True:
+                if budget is not None:
+                    budget.record_call()
                 try:
                     return await func(*args, **kwargs)
-                except Exception as e:
+                except retry_on as e:
                     retries += 1
-                    if retries >= max_retries:
+                    if retries >= max_retries or (budget is not None and not budget.try_spend()):
                         logger.error(
-                            f"Function {func.__name__} failed after {max_retries} retries: {e}",
+                            f"Function {func.__name__} failed after {retries} attempts: {e}",
                             exc_info=True
                         )
                         raise
 
+                    wait = backoff_delay(retries, delay, backoff, max_delay)
                     logger.warning(
-                        f"Retry {retries}/{max_retries} for {func.__name__} after {current_delay}s: {e}"
+                        f"Retry {retries}/{max_retries} for {func.__name__} after {wait:.2f}s: {e}"
                     )
-                    time.sleep(current_delay)
-                    current_delay *= backoff
-
-            return None  # type: ignore
+                    await asyncio.sleep(wait)
 
         return wrapper
     return decorator
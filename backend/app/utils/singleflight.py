@@ -0,0 +1,58 @@
+# backend/app/utils/singleflight.py
+
+import asyncio
+import weakref
+from typing import Awaitable, Callable, Dict, TypeVar
+
+T = TypeVar('T')
+
+
+class SingleFlight:
+    """
+    同 key 请求合并：同一事件循环内，每个 key 同时只有一个上游调用在执行，
+    其余调用方等待并共享它的结果（异常同样传递给所有等待者）。
+
+    共享调用在独立 Task 中运行，某个等待者被取消不会影响其他等待者。
+    """
+
+    def __init__(self):
+        # 按事件循环隔离：Celery 任务每次 asyncio.run 都是新循环
+        self._inflight: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, Dict[str, asyncio.Task]]" = (
+            weakref.WeakKeyDictionary()
+        )
+
+    async def do(self, key: str, fn: Callable[[], Awaitable[T]]) -> T:
+        """
+        执行或加入 key 对应的调用
+
+        Args:
+            key: 合并键（通常是缓存键）
+            fn: 无参协程函数，仅在没有进行中的调用时被执行
+
+        Returns:
+            共享调用的结果
+        """
+        loop = asyncio.get_running_loop()
+        inflight = self._inflight.setdefault(loop, {})
+        task = inflight.get(key)
+        if task is None:
+            task = loop.create_task(fn())
+            inflight[key] = task
+            task.add_done_callback(lambda t: self._forget(inflight, key, t))
+        return await asyncio.shield(task)
+
+    @staticmethod
+    def _forget(inflight: Dict[str, asyncio.Task], key: str, task: asyncio.Task):
+        if inflight.get(key) is task:
+            del inflight[key]
+        # 所有等待者都被取消时，避免 "exception was never retrieved" 警告
+        if not task.cancelled():
+            task.exception()
+
+    def in_flight(self, key: str) -> bool:
+        """当前事件循环中 key 是否有进行中的调用"""
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            return False
+        return key in self._inflight.get(loop, {})
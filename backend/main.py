@@ -89,6 +89,7 @@ async def warm_cache():
     """Pre-load stock list cache so first request is fast."""
     import asyncio
     from app.services.data_service import DataService
+    from app.services.reference_data import reference_registry
 
     async def _warm():
         try:
@@ -98,11 +99,28 @@ async def warm_cache():
             # Also warm market snapshot (slower, but enables realtime prices in search)
             snapshot = await ds.fetch_market_snapshot()
             logger.info(f"Cache warm-up: {len(snapshot)} snapshot quotes loaded")
+            ref = await reference_registry.get()
+            logger.info(f"Cache warm-up: reference data for {len(ref.memberships)} industries loaded")
         except Exception as e:
             logger.warning(f"Cache warm-up failed (non-fatal): {e}")
 
     asyncio.create_task(_warm())
 
+    if settings.MARKET_DATA_MODE == "consumer":
+        # Snapshots come from the market gateway; decode each version as it is published
+        from app.services.market_gateway import subscribe_snapshots
+        app.state.snapshot_subscriber = asyncio.create_task(subscribe_snapshots())
+
+
+@app.on_event("shutdown")
+async def shutdown_executors():
+    """Stop the snapshot subscriber and the named upstream/local/CPU executor pools."""
+    from app.core.executors import shutdown_all
+    subscriber = getattr(app.state, "snapshot_subscriber", None)
+    if subscriber:
+        subscriber.cancel()
+    shutdown_all()
+
 
 @app.get("/")
 async def root():
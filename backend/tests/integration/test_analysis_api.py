@@ -140,7 +140,7 @@ def test_get_cached_report():
 
     # Mock cache to return a report
     mock_cache = Mock()
-    mock_cache.get.return_value = '{"stock_code": "600519", "stock_name": "贵州茅台", "fundamental": {"score": 8.5, "valuation": {}, "profitability": {}, "growth": {}, "financial_health": {}, "summary": "test"}, "technical": {"score": 7.0, "trend": "上涨", "support_levels": [], "resistance_levels": [], "indicators": {}, "summary": "test"}, "capital_flow": {"score": 7.5, "main_net_inflow": 50000000.0, "main_inflow_ratio": 0.08, "trend": "流入", "summary": "test"}, "overall_score": 7.8, "risk_level": "low", "recommendation": "buy", "summary": "test", "generated_at": 1707753600}'
+    mock_cache.get = AsyncMock(return_value='{"stock_code": "600519", "stock_name": "贵州茅台", "fundamental": {"score": 8.5, "valuation": {}, "profitability": {}, "growth": {}, "financial_health": {}, "summary": "test"}, "technical": {"score": 7.0, "trend": "上涨", "support_levels": [], "resistance_levels": [], "indicators": {}, "summary": "test"}, "capital_flow": {"score": 7.5, "main_net_inflow": 50000000.0, "main_inflow_ratio": 0.08, "trend": "流入", "summary": "test"}, "overall_score": 7.8, "risk_level": "low", "recommendation": "buy", "summary": "test", "generated_at": 1707753600}')
 
     # Override dependency
     app.dependency_overrides[get_cache] = lambda: mock_cache
@@ -161,7 +161,7 @@ def test_get_cached_report_not_found():
     from app.core.cache import get_cache
 
     mock_cache = Mock()
-    mock_cache.get.return_value = None
+    mock_cache.get = AsyncMock(return_value=None)
 
     # Override dependency
     app.dependency_overrides[get_cache] = lambda: mock_cache
@@ -16,8 +16,8 @@ def mock_db():
 def mock_cache():
     """Mock Redis cache"""
     cache = Mock()
-    cache.get = Mock(return_value=None)
-    cache.setex = Mock(return_value=True)
+    cache.get = AsyncMock(return_value=None)
+    cache.setex = AsyncMock(return_value=True)
     return cache
 
 
@@ -0,0 +1,80 @@
+# backend/tests/unit/test_capital_flow_table.py
+import pandas as pd
+import pytest
+from unittest.mock import patch
+
+from app.services import data_service as data_service_module
+from app.services.capital_flow_table import (
+    CapitalFlowTable,
+    capital_flow_holder,
+    flow_frame,
+    sum_daily_flows,
+)
+from app.services.data_service import DataService
+
+
+@pytest.fixture(autouse=True)
+def isolate_flow_table():
+    capital_flow_holder.clear()
+    yield
+    capital_flow_holder.clear()
+    data_service_module.upstream.governor.reset()
+
+
+def _ranking(indicator: str, codes, main):
+    return pd.DataFrame({
+        "序号": range(1, len(codes) + 1),
+        "代码": codes,
+        "名称": ["x"] * len(codes),
+        f"{indicator}主力净流入-净额": main,
+        f"{indicator}主力净流入-净占比": [1.5] * len(codes),
+        f"{indicator}超大单净流入-净额": main,
+        f"{indicator}大单净流入-净额": main,
+        f"{indicator}中单净流入-净额": ["-"] * len(codes),
+        f"{indicator}小单净流入-净额": main,
+    })
+
+
+def test_windows_join_into_one_row_per_stock():
+    frame = flow_frame({
+        "今日": _ranking("今日", ["600519", "000001"], [1e8, -2e7]),
+        "5日": _ranking("5日", ["600519"], [3e8]),
+        "10日": _ranking("10日", ["000001", "600519"], [-5e7, 6e8]),
+    })
+    table = CapitalFlowTable.from_frame(frame, "2026-10-16")
+    restored = CapitalFlowTable.from_payload(table.to_payload())
+
+    row = restored.get("600519")
+    assert row["date"] == "2026-10-16"
+    assert row["main_net_inflow"] == 1e8
+    assert row["main_net_inflow_5d"] == 3e8
+    assert row["main_net_inflow_10d"] == 6e8
+    assert row["medium_net_inflow"] is None
+    assert restored.get("000001")["main_net_inflow_5d"] is None
+    assert row["main_net_inflow_20d"] is None
+
+
+def test_twenty_day_sum_needs_nineteen_prior_sessions():
+    today = pd.Series([1.0, 2.0], index=["600519", "000001"])
+    day = {"codes": ["600519"], "main": [10.0]}
+
+    assert sum_daily_flows(today, [day] * 18) is None
+    total = sum_daily_flows(today, [day] * 19)
+    assert total["600519"] == 191.0
+    assert total["000001"] == 2.0
+
+
+@pytest.mark.asyncio
+@patch('app.services.data_service.ak.stock_individual_fund_flow_rank')
+async def test_capital_flow_served_from_one_bulk_build(mock_rank):
+    mock_rank.side_effect = lambda indicator: _ranking(indicator, ["600519", "000001"], [1e8, 2e8])
+    service = DataService()
+    service._redis = False
+
+    first = await service.fetch_capital_flow("600519")
+    second = await service.fetch_capital_flow("000001")
+
+    assert first["main_net_inflow"] == 1e8
+    assert second["main_net_inflow_10d"] == 2e8
+    assert await service.fetch_capital_flow("999999") is None
+    assert mock_rank.call_count == 3  # one call per ranking window, for every stock
@@ -0,0 +1,62 @@
+# backend/tests/unit/test_codec.py
+import json
+
+import pytest
+
+from app.core import codec
+
+
+def _snapshot_rows(n=500):
+    return [
+        {"stock_code": f"{i:06d}", "stock_name": f"股票{i}", "price": 10.0 + i / 100,
+         "pe": None if i % 7 == 0 else 12.5, "volume": i * 100, "timestamp": "2024-05-16T10:00:00"}
+        for i in range(n)
+    ]
+
+
+def test_tabular_round_trip_is_columnar_and_smaller():
+    rows = _snapshot_rows()
+    encoded = codec.encode(rows)
+
+    assert encoded[:2] == codec.MAGIC
+    assert encoded[2:3] == codec.LAYOUT_COLUMNAR
+    assert codec.decode(encoded) == rows
+    assert len(encoded) * 3 < len(json.dumps(rows).encode())
+
+
+def test_constant_columns_are_stored_once():
+    rows = _snapshot_rows(50)
+    body = json.loads(codec.encode(rows, compression=codec.COMPRESS_NONE)[4:])
+    assert body["const"] == {"timestamp": "2024-05-16T10:00:00"}
+    assert "timestamp" not in body["cols"]
+
+
+@pytest.mark.parametrize("value", [
+    {"stock_code": "600519", "score": 8.5},
+    [{"a": 1}, {"b": 2}],
+    [1, 2, 3],
+    [],
+    "text",
+])
+def test_non_tabular_values_round_trip(value):
+    for tag in (codec.COMPRESS_NONE, codec.COMPRESS_ZLIB, None):
+        assert codec.decode(codec.encode(value, compression=tag)) == value
+
+
+def test_small_bodies_skip_compression():
+    assert codec.encode({"a": 1})[3:4] == codec.COMPRESS_NONE
+
+
+def test_legacy_json_entries_still_decode():
+    value = {"stock_code": "600519", "stock_name": "贵州茅台"}
+    legacy = json.dumps(value)
+    assert codec.decode(legacy) == value
+    assert codec.decode(legacy.encode()) == value
+    assert codec.decode(None) is None
+
+
+def test_unavailable_compressor_is_an_error(monkeypatch):
+    encoded = codec.encode(_snapshot_rows(), compression=codec.COMPRESS_ZLIB)
+    monkeypatch.setattr(codec, "_CODECS", {})
+    with pytest.raises(ValueError):
+        codec.decode(encoded)
@@ -0,0 +1,64 @@
+# backend/tests/unit/test_columnar.py
+import math
+
+import numpy as np
+import pandas as pd
+
+from app.utils import columnar
+from app.services.data_service import DataService, _safe_float, _normalize_stock_code
+
+
+def test_to_float_matches_scalar_conversion():
+    raw = pd.Series(['1.5', '-', '', None, '12.3%', ' 7 ', 'abc', 3, np.nan], dtype=object)
+    result = columnar.to_float(raw).tolist()
+    assert result == [_safe_float(v) for v in raw]
+
+
+def test_to_float_keeps_missing_when_default_none():
+    result = columnar.to_float(pd.Series(['-', '8.8']), default=None)
+    assert math.isnan(result.iloc[0])
+    assert result.iloc[1] == 8.8
+
+
+def test_parse_cn_amount_units():
+    raw = pd.Series(['5.89亿', '-5789.53万', '1200', '-', None, 'x亿'], dtype=object)
+    result = columnar.parse_cn_amount(raw).tolist()
+    assert result == [5.89e8, -5789.53e4, 1200.0, 0.0, 0.0, 0.0]
+
+
+def test_to_int_truncates_and_defaults():
+    raw = pd.Series(['100', '99.9', '-', None], dtype=object)
+    assert columnar.to_int(raw).tolist() == [100, 99, 0, 0]
+
+
+def test_normalize_code_matches_scalar_conversion():
+    raw = pd.Series([600519, '1', 'sh600000', '000001.0', None, ''], dtype=object)
+    result = columnar.normalize_code(raw).tolist()
+    assert result == [_normalize_stock_code(v) for v in raw]
+    assert columnar.normalize_code(pd.Series([1, 600519])).tolist() == ['000001', '600519']
+
+
+def test_to_records_emits_none_for_missing_floats():
+    df = pd.DataFrame({"pe": columnar.to_float(pd.Series(['-', '9.5']), default=None), "volume": [1, 2]})
+    records = columnar.to_records(df)
+    assert records == [{"pe": None, "volume": 1}, {"pe": 9.5, "volume": 2}]
+    assert type(records[0]["volume"]) is int
+
+
+def test_snapshot_to_records_converts_whole_frame():
+    df = pd.DataFrame({
+        '代码': [600519, '1'],
+        '名称': ['贵州茅台', '平安银行'],
+        '最新价': [1800.0, '-'],
+        '成交量': ['1000', None],
+        '市盈率-动态': ['-', '6.5'],
+        '总市值': [2.2e12, 2.1e11],
+    })
+    records = DataService._snapshot_to_records(df)
+
+    assert [r["stock_code"] for r in records] == ['600519', '000001']
+    assert records[0]["price"] == 1800.0 and records[1]["price"] == 0.0
+    assert records[0]["volume"] == 1000 and records[1]["volume"] == 0
+    assert records[0]["pe"] is None and records[1]["pe"] == 6.5
+    assert records[0]["pb"] is None
+    assert records[0]["timestamp"] == records[1]["timestamp"]
@@ -0,0 +1,90 @@
+# backend/tests/unit/test_condition_expr.py
+import numpy as np
+import pandas as pd
+import pytest
+from pydantic import ValidationError
+from unittest.mock import AsyncMock
+
+from app.engines.condition_expr import compile_conditions
+from app.engines.stock_filter import StockFilter
+from app.schemas.strategy import ConditionGroup, FilterCondition, StrategyConditions
+
+
+@pytest.fixture
+def frame():
+    rng = np.random.default_rng(3)
+    n = 2000
+    pe = rng.uniform(-10, 80, n)
+    pe[rng.random(n) < 0.1] = np.nan
+    return pd.DataFrame({
+        "stock_code": [f"{i:06d}" for i in range(n)],
+        "pe": pe,
+        "roe": rng.uniform(-5, 30, n),
+        "ma5": rng.uniform(9, 11, n),
+        "ma20": rng.uniform(9, 11, n),
+        "volume_ratio": rng.integers(0, 5, n).astype(float),
+    })
+
+
+def _cond(**kwargs):
+    return FilterCondition(**kwargs)
+
+
+def test_nested_tree_matches_reference_semantics(frame):
+    conditions = StrategyConditions(conditions=[
+        {"field": "pe", "operator": "between", "value": [0, 20]},
+        {"logic": "OR", "conditions": [
+            {"field": "roe", "operator": ">", "value": 15},
+            {"field": "ma5", "operator": ">", "value_field": "ma20"},
+        ]},
+        {"field": "volume_ratio", "operator": "in", "value": [1, 2], "negate": True},
+    ]).conditions
+
+    mask = compile_conditions(conditions).mask(frame)
+
+    pe, roe = frame["pe"], frame["roe"]
+    expected = (
+        pe.between(0, 20)
+        & ((roe > 15) | (frame["ma5"] > frame["ma20"]))
+        & ~frame["volume_ratio"].isin([1, 2])
+    )
+    assert mask.tolist() == expected.tolist()
+
+
+def test_or_logic_and_negation_never_match_missing_values(frame):
+    conditions = [_cond(field="pe", operator="<", value=5), _cond(field="roe", operator=">", value=25)]
+    mask = compile_conditions(conditions, logic="OR").mask(frame)
+    assert mask.tolist() == ((frame["pe"] < 5) | (frame["roe"] > 25)).tolist()
+
+    negated = ConditionGroup(conditions=conditions, logic="AND", negate=True)
+    mask = compile_conditions([negated]).mask(frame)
+    # NOT (pe < 5 AND roe > 25): a missing pe is unknown unless roe alone refutes it
+    expected = (frame["pe"] >= 5) | (frame["roe"] <= 25)
+    assert mask.tolist() == expected.tolist()
+    assert not mask[frame["pe"].isna() & (frame["roe"] > 25)].any()
+
+
+def test_conditions_validate_operands():
+    with pytest.raises(ValidationError):
+        _cond(field="pe", operator="<")
+    with pytest.raises(ValidationError):
+        _cond(field="pe", operator="between", value_field="pb")
+    with pytest.raises(ValidationError):
+        _cond(field="pe", operator="in", value=[])
+
+
+@pytest.mark.asyncio
+async def test_stock_filter_applies_request_logic():
+    stock_filter = StockFilter()
+    stock_filter.data_service.fetch_market_snapshot = AsyncMock(return_value=[
+        {"stock_code": "600001", "pe": 8.0, "pb": 3.0},
+        {"stock_code": "600002", "pe": 30.0, "pb": 0.8},
+        {"stock_code": "600003", "pe": 30.0, "pb": 3.0},
+    ])
+    conditions = [_cond(field="pe", operator="<", value=10), _cond(field="pb", operator="<", value=1)]
+
+    either = await stock_filter.apply_filter(conditions, apply_risk_filters=False, logic="OR")
+    both = await stock_filter.apply_filter(conditions, apply_risk_filters=False)
+
+    assert [r["stock_code"] for r in either] == ["600001", "600002"]
+    assert both == []
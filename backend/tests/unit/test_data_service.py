@@ -1,7 +1,19 @@
 # backend/tests/unit/test_data_service.py
 import pytest
-from unittest.mock import patch, MagicMock
+from unittest.mock import patch, AsyncMock, MagicMock
+from app.services import data_service as data_service_module
 from app.services.data_service import DataService
+from app.services.market_snapshot import snapshot_holder
+
+
+@pytest.fixture(autouse=True)
+def isolate_memory_cache():
+    """Keep mocked snapshots from leaking into other tests via the L2 cache"""
+    yield
+    data_service_module._memory_cache.clear()
+    data_service_module.negative_cache.clear()
+    data_service_module.upstream.governor.reset()
+    snapshot_holder.clear()
 
 @pytest.mark.asyncio
 @patch('app.services.data_service.ak.stock_info_a_code_name')
@@ -54,3 +66,78 @@ async def test_fetch_realtime_quote(mock_ak):
     assert quote["stock_code"] == "600519"
     assert quote["price"] == 1800.0
     assert quote["pct_change"] == 1.12
+
+
+def _set_aged(key, data, age):
+    data_service_module._memory_cache.set(key, data)
+    data_service_module._memory_cache._entries[key].ts -= age
+
+
+@pytest.mark.asyncio
+@patch('app.services.data_service.ak.stock_board_industry_name_em')
+async def test_sector_list_served_stale_while_refreshing(mock_ak):
+    """Past the soft TTL the cached list is returned at once and refreshed in the background"""
+    import asyncio
+    import pandas as pd
+    mock_ak.return_value = pd.DataFrame({'板块名称': ['银行'], '涨跌幅': [1.5]})
+
+    stale = [{"sector_name": "旧数据", "pct_change": 0.0}]
+    _set_aged("data:sector_list", stale, data_service_module.SECTOR_TTL + 1)
+    service = DataService()
+    service._redis = False
+
+    assert await service.fetch_sector_list() == stale
+    await asyncio.gather(*data_service_module._background_refreshes)
+
+    assert mock_ak.call_count == 1
+    refreshed = await service.fetch_sector_list()
+    assert refreshed[0]["sector_name"] == "银行"
+    assert mock_ak.call_count == 1
+
+
+@pytest.mark.asyncio
+@patch('app.services.data_service.ak.stock_board_industry_name_em')
+async def test_sector_list_blocks_past_hard_ttl(mock_ak):
+    import pandas as pd
+    mock_ak.return_value = pd.DataFrame({'板块名称': ['银行'], '涨跌幅': [1.5]})
+    _set_aged("data:sector_list", [{"sector_name": "旧数据"}], data_service_module.SECTOR_HARD_TTL + 1)
+    service = DataService()
+    service._redis = False
+
+    sectors = await service.fetch_sector_list()
+    assert sectors[0]["sector_name"] == "银行"
+
+
+@pytest.mark.asyncio
+async def test_fetch_financial_batch_mget_hits_and_bounded_misses(monkeypatch):
+    """Hits come from one MGET; misses run concurrently but never above the configured limit"""
+    import asyncio
+    import json
+    from app.core.config import settings
+    monkeypatch.setattr(settings, "DATA_BATCH_CONCURRENCY", 2)
+
+    store = {"data:financial:600519:3": json.dumps([{"roe": 20.0}])}
+    redis = MagicMock()
+    redis.mget = AsyncMock(side_effect=lambda keys: [store.get(k) for k in keys])
+    service = DataService()
+    service._redis = redis
+
+    running = peak = 0
+
+    async def fake_load(cache_key, stock_code, years):
+        nonlocal running, peak
+        running += 1
+        peak = max(peak, running)
+        await asyncio.sleep(0.01)
+        running -= 1
+        return [{"stock_code": stock_code}]
+
+    monkeypatch.setattr(service, "_load_financial_data", fake_load)
+    codes = ["600519", "000001", "000002", "600036"]
+    results = {code: data async for code, data in service.fetch_financial_batch(codes, years=3)}
+
+    assert redis.mget.call_args_list[0].args[0] == [f"data:financial:{c}:3" for c in codes]
+    assert results["600519"] == [{"roe": 20.0}]
+    assert results["600036"] == [{"stock_code": "600036"}]
+    assert set(results) == set(codes)
+    assert peak == 2
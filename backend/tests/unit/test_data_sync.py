@@ -1,7 +1,7 @@
 # backend/tests/unit/test_data_sync.py
 
 import pytest
-from unittest.mock import Mock, patch, AsyncMock
+from unittest.mock import Mock, MagicMock, patch, AsyncMock
 from datetime import datetime, time
 from app.tasks.data_sync import (
     is_trading_time,
@@ -91,8 +91,12 @@ class TestRealtimeQuotesSync:
         mock_data_service.return_value = mock_service
 
         # Mock Redis
+        mock_pipe = MagicMock()
+        mock_pipe.execute = AsyncMock()
+        mock_pipe.__aenter__ = AsyncMock(return_value=mock_pipe)
+        mock_pipe.__aexit__ = AsyncMock(return_value=False)
         mock_redis_client = Mock()
-        mock_redis_client.setex = AsyncMock()
+        mock_redis_client.pipeline.return_value = mock_pipe
         mock_redis.return_value = mock_redis_client
 
         # Mock InfluxDB
@@ -105,7 +109,8 @@ class TestRealtimeQuotesSync:
 
         # Verify
         assert result == 2
-        assert mock_redis_client.setex.call_count == 2
+        assert mock_pipe.setex.call_count == 2
+        mock_pipe.execute.assert_awaited_once()
         mock_influx_client.write_realtime_quotes.assert_called_once()
 
     @patch('app.tasks.data_sync.is_trading_time')
@@ -198,16 +203,19 @@ class TestBatchSync:
     """测试批量同步"""
 
     @pytest.mark.asyncio
-    @patch('app.tasks.data_sync.DataService')
+    @patch('app.core.database.get_influxdb')
+    @patch('app.services.data_service.DataService')
     @patch('app.tasks.data_sync.group')
-    async def test_sync_all_stocks_data(self, mock_group, mock_data_service):
-        """测试批量同步所有股票数据"""
+    async def test_sync_all_stocks_data(self, mock_group, mock_data_service, mock_get_influxdb):
+        """测试收盘日线由快照生成，仅对需重拉的股票派发任务"""
         # Mock data service
         mock_service = Mock()
-        mock_service.get_all_stock_codes = AsyncMock(
-            return_value=['000001', '000002', '000003']
-        )
+        mock_service.synthesize_eod_bars = AsyncMock(return_value={
+            'appended': 2, 'refetch': ['000003'],
+            'bars': [{'stock_code': '000001'}, {'stock_code': '000002'}],
+        })
         mock_data_service.return_value = mock_service
+        mock_get_influxdb.return_value.write_daily_bars = AsyncMock()
 
         # Mock Celery group
         mock_job = Mock()
@@ -218,6 +226,7 @@ class TestBatchSync:
         result = await _sync_all_stocks_data()
 
         # Verify
-        assert result == "Syncing 3 stocks"
+        assert result == "Appended 2 bars, refetching 1 stocks"
+        mock_get_influxdb.return_value.write_daily_bars.assert_awaited_once()
         mock_group.assert_called_once()
         mock_job.apply_async.assert_called_once()
@@ -0,0 +1,48 @@
+# backend/tests/unit/test_executors.py
+import asyncio
+import threading
+import time
+
+import pytest
+
+from app.core.executors import NamedExecutor
+from app.core.metrics import executor_queue_depth
+
+
+@pytest.mark.asyncio
+async def test_admission_is_bounded_and_queue_depth_exported():
+    executor = NamedExecutor("test-threads", max_workers=2)
+    running = peak = 0
+    lock = threading.Lock()
+    depths = []
+
+    def work():
+        nonlocal running, peak
+        with lock:
+            running += 1
+            peak = max(peak, running)
+        time.sleep(0.02)
+        with lock:
+            running -= 1
+        return threading.current_thread().name
+
+    async def sample_depth():
+        await asyncio.sleep(0.005)
+        depths.append(executor_queue_depth.labels(executor="test-threads")._value.get())
+
+    names, _ = await asyncio.gather(asyncio.gather(*(executor.run(work) for _ in range(6))), sample_depth())
+    executor.shutdown(wait=True)
+
+    assert peak == 2
+    assert all(name.startswith("test-threads-pool") for name in names)
+    assert depths[0] == 4
+    assert executor_queue_depth.labels(executor="test-threads")._value.get() == 0
+
+
+@pytest.mark.asyncio
+async def test_process_pool_runs_picklable_work():
+    executor = NamedExecutor("test-processes", max_workers=1, kind="process")
+    try:
+        assert await executor.run(pow, 2, 10) == 1024
+    finally:
+        executor.shutdown(wait=True)
@@ -0,0 +1,128 @@
+# backend/tests/unit/test_financial_factors.py
+from datetime import date
+
+import pandas as pd
+import pytest
+from unittest.mock import AsyncMock, patch
+
+from app.engines.stock_filter import StockFilter
+from app.schemas.strategy import ConditionOperator, FilterCondition
+from app.services import data_service as data_service_module
+from app.services.data_service import DataService
+from app.services.factor_store import FactorStore
+from app.services.financial_factors import (
+    financial_factor_frame,
+    join_financial_factors,
+    choose_period,
+    merge_with_previous,
+    report_periods,
+)
+
+
+@pytest.fixture(autouse=True)
+def isolate_factor_store(tmp_path):
+    with patch.object(data_service_module, "factor_store", FactorStore(str(tmp_path))):
+        yield
+    data_service_module.upstream.governor.reset()
+
+
+def _reports(codes, roe):
+    return pd.DataFrame({
+        "序号": range(1, len(codes) + 1),
+        "股票代码": codes,
+        "每股收益": [1.0] * len(codes),
+        "营业总收入-营业总收入": [1e9] * len(codes),
+        "营业总收入-同比增长": [12.0] * len(codes),
+        "净利润-净利润": [2e8] * len(codes),
+        "净利润-同比增长": [8.0] * len(codes),
+        "每股净资产": [6.0] * len(codes),
+        "净资产收益率": roe,
+        "销售毛利率": [35.0] * len(codes),
+    })
+
+
+def _balance(codes):
+    return pd.DataFrame({"股票代码": codes, "资产负债率": [40.0] * len(codes)})
+
+
+def _dividends(codes):
+    return pd.DataFrame({"代码": codes, "现金分红-现金分红比例": [5.0] * len(codes)})
+
+
+def test_report_periods():
+    assert report_periods(date(2026, 10, 17)) == ["20260930", "20260630"]
+    assert report_periods(date(2026, 1, 5), 3) == ["20251231", "20250930", "20250630"]
+
+
+def test_choose_period_waits_for_coverage():
+    assert choose_period({"20260930": 12, "20260630": 5100}, 5300) == "20260630"
+    assert choose_period({"20260930": 5000, "20260630": 5100}, 5300) == "20260930"
+    assert choose_period({"20260930": 12, "20260630": 300}, 5300) == "20260630"
+    assert choose_period({}, 5300) is None
+
+
+def test_factor_frame_keeps_unreported_stocks_from_previous_period():
+    previous = financial_factor_frame(_reports(["600519", "000001"], [30.0, 10.0]), None, None, "20260630")
+    latest = financial_factor_frame(
+        _reports(["600519"], [25.0]), _balance(["600519"]), _dividends(["600519"]), "20260930"
+    )
+    merged = merge_with_previous(latest, previous)
+
+    # Year-to-date ROE is annualized: Q3 x 12/9, H1 x 2
+    assert merged.loc["600519", "roe"] == pytest.approx(25.0 * 12 / 9)
+    assert merged.loc["600519", "report_date"] == "2026-09-30"
+    assert merged.loc["600519", "net_margin"] == pytest.approx(20.0)
+    assert merged.loc["000001", "report_date"] == "2026-06-30"
+    assert merged.loc["000001", "roe"] == pytest.approx(20.0)
+
+    snapshot = pd.DataFrame([{"stock_code": "600519", "price": 25.0}, {"stock_code": "300750", "price": 200.0}])
+    joined = join_financial_factors(snapshot, merged).set_index("stock_code")
+    assert joined.loc["600519", "dividend_yield"] == pytest.approx(2.0)
+    assert pd.isna(joined.loc["300750", "roe"])
+
+
+@pytest.mark.asyncio
+@patch('app.services.data_service.ak.stock_fhps_em')
+@patch('app.services.data_service.ak.stock_zcfz_em')
+@patch('app.services.data_service.ak.stock_yjbb_em')
+async def test_sync_rebuilds_only_on_new_reports_and_feeds_filters(mock_yjbb, mock_zcfz, mock_fhps):
+    mock_yjbb.return_value = _reports(["600519", "000001"], [30.0, 8.0])
+    mock_zcfz.return_value = _balance(["600519", "000001"])
+    mock_fhps.return_value = _dividends(["600519"])
+    service = DataService()
+    service.get_all_stock_codes = AsyncMock(return_value=["600519", "000001"])
+
+    assert (await service.sync_financial_factors())["updated"]
+    assert not (await service.sync_financial_factors())["updated"]
+    assert mock_zcfz.call_count == 1
+
+    stock_filter = StockFilter()
+    stock_filter.data_service = service
+    service.fetch_market_snapshot = AsyncMock(return_value=[
+        {"stock_code": "600519", "price": 1500.0},
+        {"stock_code": "000001", "price": 11.0},
+    ])
+    result = await stock_filter.apply_filter(
+        [FilterCondition(field="roe", operator=ConditionOperator.GTE, value=15)], apply_risk_filters=False
+    )
+    assert [r["stock_code"] for r in result] == ["600519"]
+
+
+@pytest.mark.asyncio
+@patch('app.services.data_service.date')
+@patch('app.services.data_service.ak.stock_fhps_em')
+@patch('app.services.data_service.ak.stock_zcfz_em')
+@patch('app.services.data_service.ak.stock_yjbb_em')
+async def test_fresh_host_is_seeded_from_the_last_complete_period(mock_yjbb, mock_zcfz, mock_fhps, mock_date):
+    mock_date.today.return_value = date(2026, 10, 17)
+    codes = [f"60{i:04d}" for i in range(10)]
+    by_period = {"20260930": _reports(codes[:1], [20.0]), "20260630": _reports(codes, [10.0] * 10)}
+    mock_yjbb.side_effect = lambda date: by_period[date]
+    mock_zcfz.return_value = _balance(codes)
+    mock_fhps.return_value = _dividends(codes)
+    service = DataService()
+    service.get_all_stock_codes = AsyncMock(return_value=codes)
+
+    meta = await service.sync_financial_factors()
+    assert meta["period"] == "20260630" and meta["rows"] == 10
+    assert mock_zcfz.call_args.kwargs["date"] == "20260630"
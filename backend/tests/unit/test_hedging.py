@@ -0,0 +1,68 @@
+# backend/tests/unit/test_hedging.py
+import asyncio
+
+import pytest
+from unittest.mock import patch
+
+from app.core.hedging import HedgePolicy
+
+
+@pytest.fixture(autouse=True)
+def short_delays():
+    with patch('app.core.hedging.settings.HEDGE_MIN_DELAY', 0.01), \
+            patch('app.core.hedging.settings.HEDGE_MAX_DELAY', 5.0):
+        yield
+
+
+def _source(value, delay=0.0, error=None, log=None, name=None):
+    async def fetch():
+        if log is not None:
+            log.append(name)
+        await asyncio.sleep(delay)
+        if error:
+            raise error
+        return value
+    return fetch
+
+
+@pytest.mark.asyncio
+async def test_slow_primary_is_hedged_and_loser_cancelled():
+    policy = HedgePolicy("test", initial_delay=0.05)
+    started = []
+    result = await policy.run([
+        ("primary", _source(["slow"], delay=1.0, log=started, name="primary")),
+        ("backup", _source(["fast"], delay=0.01, log=started, name="backup")),
+    ])
+    assert result == ["fast"]
+    assert started == ["primary", "backup"]
+
+    # A fast primary never starts the backup
+    started.clear()
+    result = await policy.run([
+        ("primary", _source(["ok"], log=started, name="primary")),
+        ("backup", _source(["fast"], log=started, name="backup")),
+    ])
+    assert result == ["ok"]
+    assert started == ["primary"]
+
+
+@pytest.mark.asyncio
+async def test_failed_or_empty_primary_starts_backup_immediately():
+    policy = HedgePolicy("test", initial_delay=5.0)
+    loop = asyncio.get_running_loop()
+    began = loop.time()
+    assert await policy.run([("a", _source(None, error=ConnectionError("down"))), ("b", _source(["b"]))]) == ["b"]
+    assert await policy.run([("a", _source([])), ("b", _source(["b"]))]) == ["b"]
+    assert loop.time() - began < 1.0
+
+    assert await policy.run([("a", _source([])), ("b", _source([]))]) == []
+    with pytest.raises(TimeoutError):
+        await policy.run([("a", _source(None, error=ConnectionError("x"))), ("b", _source(None, error=TimeoutError()))])
+
+
+def test_delay_tracks_primary_p90():
+    policy = HedgePolicy("test", initial_delay=3.0)
+    assert policy.delay() == 3.0
+    for latency in range(1, 101):
+        policy.observe("primary", latency / 100, primary=True)
+    assert policy.delay() == pytest.approx(0.91)
@@ -0,0 +1,120 @@
+# backend/tests/unit/test_indicator_panel.py
+from datetime import date, timedelta
+
+import numpy as np
+import pandas as pd
+import pytest
+from unittest.mock import AsyncMock
+
+from app.engines.strategies.volume_breakout import VolumeBreakoutStrategy
+from app.services.indicator_panel import IndicatorPanel, load_panel
+from app.services.kline_store import FACTOR_DTYPE, KlineStore, bars_from_frame
+from app.utils import indicators
+
+
+def _frame(days, closes, volumes=None):
+    closes = np.asarray(closes, dtype=float)
+    return pd.DataFrame({
+        '日期': [d.isoformat() for d in days],
+        '开盘': closes, '最高': closes * 1.01, '最低': closes * 0.99, '收盘': closes,
+        '成交量': volumes if volumes is not None else [100] * len(days), '成交额': [1000.0] * len(days),
+    })
+
+
+def _days(n, end=None):
+    end = end or date.today() - timedelta(days=1)
+    return [end - timedelta(days=n - 1 - i) for i in range(n)]
+
+
+def _panel(histories):
+    """Right-aligned panel from {code: DataFrame(high, low, close, volume)} of differing lengths"""
+    rows = max(len(h) for h in histories.values())
+    fields = {name: np.full((rows, len(histories)), np.nan) for name in ("open", "high", "low", "close", "volume")}
+    for i, h in enumerate(histories.values()):
+        for name in ("high", "low", "close", "volume"):
+            fields[name][rows - len(h):, i] = h[name].to_numpy()
+    fields["open"] = fields["close"]
+    return IndicatorPanel(list(histories), np.empty((rows, len(histories)), dtype="datetime64[D]"), fields)
+
+
+def test_panel_indicators_match_per_stock_indicators():
+    rng = np.random.default_rng(7)
+    histories = {}
+    for code, n in (("600001", 90), ("600002", 40), ("600003", 12)):
+        close = pd.Series(10 + rng.normal(0, 0.3, n).cumsum())
+        histories[code] = pd.DataFrame({
+            "close": close, "high": close + rng.uniform(0, 0.5, n), "low": close - rng.uniform(0, 0.5, n),
+            "volume": pd.Series(rng.integers(100, 1000, n).astype(float)),
+        })
+    panel = _panel(histories)
+
+    for code, h in histories.items():
+        expected = {
+            "ma20": indicators.calculate_ma(h["close"], [20])["ma20"],
+            "rsi": indicators.calculate_rsi(h["close"], [14])["rsi14"],
+            "dif": indicators.calculate_macd(h["close"])["dif"],
+            "dea": indicators.calculate_macd(h["close"])["dea"],
+            "k": indicators.calculate_kdj(h["high"], h["low"], h["close"])["k"],
+            "upper": indicators.calculate_boll(h["close"])["upper"],
+            "atr": indicators.calculate_atr(h["high"], h["low"], h["close"]),
+            "adx": indicators.calculate_adx(h["high"], h["low"], h["close"])["adx"],
+            "vol_ma5": indicators.calculate_volume_ma(h["volume"], [5])["vol_ma5"],
+        }
+        actual = {
+            "ma20": panel.ma(20), "rsi": panel.rsi(14), "dif": panel.macd()["dif"], "dea": panel.macd()["dea"],
+            "k": panel.kdj()["k"], "upper": panel.boll()["upper"], "atr": panel.atr(14),
+            "adx": panel.adx(14)["adx"], "vol_ma5": panel.volume_ma(5),
+        }
+        for name, series in expected.items():
+            np.testing.assert_allclose(
+                panel.series(actual[name], code), series.to_numpy(dtype=float), rtol=1e-9, err_msg=f"{code} {name}"
+            )
+
+    latest = panel.latest(panel.ma(20), ["600003", "600001", "000000"])
+    assert np.isnan(latest[0]) and np.isnan(latest[2])
+    assert latest[1] == pytest.approx(histories["600001"]["close"].tail(20).mean())
+
+
+def test_load_panel_adjusts_history_and_appends_live_bar(tmp_path):
+    store = KlineStore(str(tmp_path))
+    days = _days(5)
+    store.write("600001", "1d", bars_from_frame(_frame(days, [10, 11, 12, 13, 14])), days[0])
+    store.write("600002", "1d", bars_from_frame(_frame(days[2:], [5, 6, 7])), days[0])
+    factors = np.array([(np.datetime64(days[0], "D"), 1.0), (np.datetime64(days[3], "D"), 2.0)], dtype=FACTOR_DTYPE)
+    store.write_factors("600001", factors)
+
+    today = date.today()
+    quotes = {
+        "600001": {"price": 15.0, "pre_close": 14.0, "volume": 500},
+        "600002": {"price": 7.5, "pre_close": 6.9, "volume": 500},  # does not follow the stored close
+    }
+    panel = load_panel(store, ["600001", "600002", "600003"], days[0], "qfq", quotes, today)
+
+    assert panel.codes == ["600001", "600002"]
+    assert panel.series(panel.close, "600001").tolist() == [5.0, 5.5, 6.0, 13.0, 14.0, 15.0]
+    assert panel.dates[-1, 0] == np.datetime64(today, "D")
+    assert panel.series(panel.close, "600002").tolist() == [5.0, 6.0, 7.0]
+    assert np.isnan(panel.close[:3, 1]).all()
+
+
+@pytest.mark.asyncio
+async def test_volume_breakout_scores_from_panel(tmp_path):
+    store = KlineStore(str(tmp_path))
+    days = _days(30)
+    flat = [10.0] * 29
+    store.write("600001", "1d", bars_from_frame(_frame(days, flat + [11.0], [100] * 29 + [500])), days[0])
+    store.write("600002", "1d", bars_from_frame(_frame(days, flat + [10.05], [100] * 29 + [500])), days[0])
+
+    strategy = VolumeBreakoutStrategy()
+    strategy.data_service.fetch_market_snapshot = AsyncMock(return_value=[
+        {"stock_code": code, "stock_name": "x", "price": 11.0, "market_cap": 5e9, "volume": 500, "pct_change": 5.0}
+        for code in ("600001", "600002")
+    ])
+    strategy.data_service.fetch_indicator_panel = AsyncMock(
+        side_effect=lambda codes, days: load_panel(store, codes, date.today() - timedelta(days=days))
+    )
+
+    results = await strategy.execute()
+
+    assert [r["stock_code"] for r in results] == ["600001"]
+    assert results[0]["score"] == pytest.approx(50.0 + min((11.0 - 10.1) / 10.1 * 100 * 5, 25) + 25)
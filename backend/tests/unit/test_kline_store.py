@@ -0,0 +1,200 @@
+# backend/tests/unit/test_kline_store.py
+import json
+from datetime import date, datetime, timedelta
+
+import numpy as np
+import pandas as pd
+import pytest
+from unittest.mock import patch
+
+from app.services import data_service as data_service_module
+from app.services.data_service import DataService
+from app.services.kline_store import KlineStore, adjust_bars, bars_from_frame, bars_to_records, factors_from_frame, period_start
+
+
+def _frame(days, closes):
+    return pd.DataFrame({
+        '日期': [d.isoformat() for d in days],
+        '开盘': closes, '最高': closes, '最低': closes, '收盘': closes,
+        '成交量': [100] * len(days), '成交额': [1000.0] * len(days),
+    })
+
+
+def _trading_days(n):
+    today = date.today()
+    return [today - timedelta(days=n - 1 - i) for i in range(n)]
+
+
+@pytest.fixture
+def store(tmp_path, monkeypatch):
+    s = KlineStore(str(tmp_path))
+    monkeypatch.setattr(data_service_module, "kline_store", s)
+    with patch('app.services.data_service.ak.stock_zh_a_daily', return_value=pd.DataFrame()):
+        yield s
+
+
+@pytest.fixture
+def every_day_trades(monkeypatch):
+    """The helpers above treat consecutive calendar days as sessions"""
+    monkeypatch.setattr(
+        data_service_module, "latest_trade_date", lambda now=None: (now or datetime.now()).date().isoformat()
+    )
+
+
+def test_round_trip_and_window(store):
+    days = _trading_days(5)
+    store.write("600519", "1d", bars_from_frame(_frame(days, [1.0, 2.0, 3.0, 4.0, 5.0])), days[0])
+
+    window = store.window("600519", "1d", days[3])
+    records = bars_to_records(window)
+    assert [r["date"] for r in records] == [d.isoformat() for d in days[3:]]
+    assert records[0] == {"date": days[3].isoformat(), "open": 4.0, "high": 4.0, "low": 4.0,
+                          "close": 4.0, "volume": 100, "amount": 1000.0}
+    assert store.covers("600519", "1d", days[1])
+    assert not store.covers("600519", "1d", days[0] - timedelta(days=1))
+
+
+def test_merge_replaces_partial_bar_and_detects_readjustment(store):
+    days = _trading_days(4)
+    store.write("600519", "1d", bars_from_frame(_frame(days[:3], [1.0, 2.0, 3.0])), days[0])
+    assert store.sync_start("600519", "1d") == days[1]
+
+    # Overlap matches: last (partial) bar is replaced, new bar appended
+    merged = store.merge("600519", "1d", bars_from_frame(_frame(days[1:], [2.0, 3.5, 4.0])))
+    assert merged["close"].tolist() == [1.0, 2.0, 3.5, 4.0]
+
+    # Overlapping closed bar changed → adjusted history moved, caller must refetch
+    assert store.merge("600519", "1d", bars_from_frame(_frame(days[1:], [1.8, 3.5, 4.0]))) is None
+
+
+def test_period_start():
+    assert period_start(date(2024, 5, 16), "1w") == date(2024, 5, 13)
+    assert period_start(date(2024, 5, 16), "1M") == date(2024, 5, 1)
+    assert period_start(date(2024, 5, 16), "1d") == date(2024, 5, 16)
+
+
+@pytest.mark.asyncio
+@patch('app.services.data_service.ak.stock_zh_a_hist')
+async def test_fetch_kline_data_fills_once_then_slices(mock_hist, store):
+    days = _trading_days(10)
+    mock_hist.return_value = _frame(days, [float(i) for i in range(10)])
+    service = DataService()
+
+    long_window = await service.fetch_kline_data("600519", days=9)
+    short_window = await service.fetch_kline_data("600519", days=3)
+
+    assert mock_hist.call_count == 1
+    assert len(long_window) == 10
+    assert [r["date"] for r in short_window] == [d.isoformat() for d in days[-4:]]
+
+
+@pytest.mark.asyncio
+@patch('app.services.data_service.ak.stock_zh_a_hist')
+async def test_fetch_kline_data_syncs_incrementally(mock_hist, store):
+    days = _trading_days(10)
+    mock_hist.return_value = _frame(days[:9], [float(i) for i in range(9)])
+    service = DataService()
+    await service.fetch_kline_data("600519", days=9)
+
+    # Age the sync marker past KLINE_TTL
+    meta = store.meta("600519", "1d")
+    store._meta_path("600519", "1d").write_text(json.dumps({**meta, "synced_at": 0}))
+
+    mock_hist.return_value = _frame(days[7:], [7.0, 8.0, 9.0])
+    bars = await service.fetch_kline_data("600519", days=9)
+
+    assert mock_hist.call_args.kwargs["start_date"] == days[7].strftime('%Y%m%d')
+    assert [b["close"] for b in bars] == [float(i) for i in range(10)]
+
+
+@pytest.mark.asyncio
+async def test_eod_bars_appended_from_snapshot_and_readjusted_stocks_flagged(store, every_day_trades):
+    days = _trading_days(4)
+    for code in ("600519", "000001"):
+        store.write(code, "1d", bars_from_frame(_frame(days[:3], [1.0, 2.0, 3.0])), days[0])
+    quote = {"open": 3.1, "high": 3.3, "low": 3.0, "price": 3.2, "volume": 500, "amount": 9000.0}
+    view = data_service_module.MarketSnapshot([
+        {"stock_code": "600519", "pre_close": 3.0, **quote},
+        {"stock_code": "000001", "pre_close": 2.7, **quote},   # ex-dividend: qfq history moved
+        {"stock_code": "300750", "pre_close": 3.0, **quote},   # nothing stored yet
+        {"stock_code": "601318", "pre_close": 3.0, **quote, "volume": 0},  # suspended
+    ], "v1")
+
+    summary = await DataService().synthesize_eod_bars(view)
+
+    assert summary["refetch"] == ["000001"]
+    assert (summary["appended"], summary["missing"], summary["suspended"]) == (1, 1, 1)
+    bars = bars_to_records(store.load("600519", "1d"))
+    assert bars[-1] == {"date": days[3].isoformat(), "open": 3.1, "high": 3.3, "low": 3.0,
+                        "close": 3.2, "volume": 500, "amount": 9000.0}
+    assert store.meta("600519", "1d")["start"] == days[0].isoformat()
+
+    # Re-running on the same snapshot leaves the stored session alone
+    rerun = await DataService().synthesize_eod_bars(view)
+    assert (rerun["appended"], rerun["unchanged"]) == (0, 1)
+    assert len(store.load("600519", "1d")) == 4
+
+
+@pytest.mark.asyncio
+async def test_eod_bars_dated_by_trade_date_and_holiday_snapshots_skipped(store):
+    # Stored through Thursday 2026-10-15; Friday's run failed and the job runs on Saturday
+    days = [date(2026, 10, 12) + timedelta(days=i) for i in range(4)]
+    store.write("600519", "1d", bars_from_frame(_frame(days, [1.0, 2.0, 3.0, 4.0])), days[0])
+    saturday = datetime(2026, 10, 17, 16, 0).timestamp()
+    quote = {"stock_code": "600519", "open": 4.1, "high": 4.3, "low": 4.0, "price": 4.2,
+             "volume": 500, "amount": 9000.0, "pre_close": 4.0}
+    view = data_service_module.MarketSnapshot([quote], "v1", fetched_at=saturday)
+
+    assert (await DataService().synthesize_eod_bars(view))["appended"] == 1
+    assert store.load("600519", "1d")["date"][-1] == np.datetime64("2026-10-16")
+
+    # A weekday holiday serves Friday's session again (volume resynced from
+    # stock_zh_a_hist may differ): nothing is appended or refetched
+    holiday = datetime(2026, 10, 19, 16, 0).timestamp()
+    view = data_service_module.MarketSnapshot([{**quote, "volume": 499}], "v2", fetched_at=holiday)
+    summary = await DataService().synthesize_eod_bars(view)
+    assert (summary["appended"], summary["refetch"]) == (0, [])
+    assert len(store.load("600519", "1d")) == 5
+
+
+def test_adjust_bars_from_hfq_factors():
+    days = _trading_days(4)
+    bars = bars_from_frame(_frame(days, [10.0, 10.0, 9.0, 9.5]))
+    # Ex-dividend on days[2]: 1 yuan cash on a 10 yuan stock
+    factors = factors_from_frame(pd.DataFrame({
+        "date": ["1900-01-01", days[2].isoformat()],
+        "hfq_factor": [1.0, 10.0 / 9.0],
+    }))
+
+    assert adjust_bars(bars, factors, "")["close"].tolist() == [10.0, 10.0, 9.0, 9.5]
+    assert adjust_bars(bars, factors, "qfq")["close"] == pytest.approx([9.0, 9.0, 9.0, 9.5])
+    assert adjust_bars(bars, factors, "hfq")["close"] == pytest.approx([10.0, 10.0, 10.0, 9.5 * 10 / 9])
+    assert adjust_bars(bars, factors, "qfq")["volume"].tolist() == [100] * 4
+
+
+@pytest.mark.asyncio
+@patch('app.services.data_service.ak.stock_zh_a_hist')
+async def test_dividend_refreshes_factors_without_refetching_history(mock_hist, store, every_day_trades):
+    days = _trading_days(10)
+    mock_hist.return_value = _frame(days[:9], [10.0] * 9)
+    service = DataService()
+    await service.fetch_kline_data("600519", days=9)
+    assert mock_hist.call_args.kwargs["adjust"] == ""
+
+    # The EOD snapshot shows the ex-dividend previous close: only factors are invalidated
+    quote = {"open": 9.0, "high": 9.2, "low": 8.9, "price": 9.1, "volume": 100, "amount": 1000.0}
+    view = data_service_module.MarketSnapshot([{"stock_code": "600519", "pre_close": 9.0, **quote}], "v1")
+    assert (await service.synthesize_eod_bars(view))["refetch"] == ["600519"]
+    meta = store.meta("600519", "1d")
+    store._meta_path("600519", "1d").write_text(json.dumps({**meta, "synced_at": 0}))
+
+    mock_hist.return_value = _frame(days[7:], [10.0, 10.0, 9.1])
+    with patch('app.services.data_service.ak.stock_zh_a_daily', return_value=pd.DataFrame({
+        "date": ["1900-01-01", days[9].isoformat()], "hfq_factor": [1.0, 10.0 / 9.0],
+    })):
+        bars = await service.fetch_kline_data("600519", days=9)
+
+    assert mock_hist.call_args.kwargs["start_date"] == days[7].strftime('%Y%m%d')
+    assert [b["close"] for b in bars] == pytest.approx([9.0] * 9 + [9.1])
+    raw = await service.fetch_kline_data("600519", days=9, adjust="")
+    assert [b["close"] for b in raw] == [10.0] * 9 + [9.1]
@@ -0,0 +1,56 @@
+# backend/tests/unit/test_market_gateway.py
+import pytest
+from unittest.mock import AsyncMock, MagicMock, patch
+
+from app.services import data_service as data_service_module
+from app.services import market_gateway as gateway_module
+from app.services.data_service import DataService
+from app.services.market_gateway import MarketGateway
+from app.services.market_snapshot import snapshot_holder
+
+
+@pytest.fixture(autouse=True)
+def isolate_snapshot():
+    yield
+    data_service_module._memory_cache.clear()
+    data_service_module.upstream.governor.reset()
+    snapshot_holder.clear()
+
+
+def _redis(heartbeat: bool) -> MagicMock:
+    redis = MagicMock()
+    redis.get = AsyncMock(return_value=None)
+    redis.exists = AsyncMock(return_value=int(heartbeat))
+    return redis
+
+
+@pytest.mark.asyncio
+@patch('app.services.data_service.ak.stock_zh_a_spot_em')
+async def test_consumer_never_fetches_while_gateway_is_alive(mock_ak):
+    service = DataService()
+    service._redis = _redis(heartbeat=True)
+
+    with patch.object(data_service_module.settings, "MARKET_DATA_MODE", "consumer"):
+        assert await service.fetch_snapshot_view() is None
+        stale = snapshot_holder.publish([{"stock_code": "600519", "stock_name": "贵州茅台"}], "1")
+        assert await service.fetch_realtime_quote("600519") == stale.get("600519")
+
+    mock_ak.assert_not_called()
+
+
+@pytest.mark.asyncio
+async def test_gateway_poll_publishes_snapshot_and_realtime_quotes():
+    view = snapshot_holder.publish([{"stock_code": "600519", "price": 1800.0}], "1")
+    service = MagicMock()
+    service.refresh_snapshot = AsyncMock(return_value=view)
+    gateway = MarketGateway(service)
+
+    with patch.object(MarketGateway, "_trading", return_value=True), \
+            patch.object(gateway_module, "write_realtime_quotes", new=AsyncMock()) as mock_write:
+        assert await gateway.poll_once() is view
+        mock_write.assert_awaited_once_with(view.rows)
+
+        # Upstream failures are logged; the loop keeps running
+        service.refresh_snapshot.side_effect = ConnectionError("down")
+        assert await gateway.poll_once() is None
+        assert mock_write.await_count == 1
@@ -0,0 +1,71 @@
+# backend/tests/unit/test_market_snapshot.py
+import json
+import pytest
+from unittest.mock import AsyncMock, MagicMock
+from app.services.data_service import DataService, SNAPSHOT_CACHE_KEY, SNAPSHOT_VERSION_KEY
+from app.services.market_snapshot import MarketSnapshot, snapshot_holder
+
+
+ROWS = [
+    {"stock_code": "600519", "stock_name": "贵州茅台", "price": 1800.0},
+    {"stock_code": "000001", "stock_name": "平安银行", "price": 11.2},
+]
+
+
+@pytest.fixture(autouse=True)
+def reset_holder():
+    snapshot_holder.clear()
+    yield
+    snapshot_holder.clear()
+
+
+@pytest.fixture
+def fake_redis():
+    store = {SNAPSHOT_VERSION_KEY: "v1", SNAPSHOT_CACHE_KEY: json.dumps(ROWS)}
+    redis = MagicMock()
+    redis.get = AsyncMock(side_effect=lambda key: store.get(key))
+    redis.store = store
+    return redis
+
+
+def _payload_reads(redis):
+    return sum(1 for c in redis.get.call_args_list if c.args[0] == SNAPSHOT_CACHE_KEY)
+
+
+def test_snapshot_indexes():
+    view = MarketSnapshot(ROWS, "v1")
+    assert view.get("600519")["price"] == 1800.0
+    assert view.by_name["平安银行"]["stock_code"] == "000001"
+    assert [r["stock_code"] for r in view.get_many(["000001", "999999", "600519"])] == ["000001", "600519"]
+    assert view.search("茅台")[0]["stock_code"] == "600519"
+    assert view.frame.loc["000001", "price"] == 11.2
+
+
+@pytest.mark.asyncio
+async def test_snapshot_decoded_once_per_version(fake_redis):
+    service = DataService()
+    service._redis = fake_redis
+
+    quote = await service.fetch_realtime_quote("600519")
+    assert quote["price"] == 1800.0
+    await service.fetch_realtime_quote("000001")
+    await service.fetch_realtime_quotes_batch(["600519", "000001"])
+    assert _payload_reads(fake_redis) == 1
+
+    # Another process publishes a new version → decoded exactly once more
+    fake_redis.store[SNAPSHOT_VERSION_KEY] = "v2"
+    fake_redis.store[SNAPSHOT_CACHE_KEY] = json.dumps([{**ROWS[0], "price": 1810.0}])
+    quote = await service.fetch_realtime_quote("600519")
+    assert quote["price"] == 1810.0
+    await service.fetch_realtime_quote("600519")
+    assert _payload_reads(fake_redis) == 2
+
+
+@pytest.mark.asyncio
+async def test_realtime_quote_returns_copy(fake_redis):
+    service = DataService()
+    service._redis = fake_redis
+
+    quote = await service.fetch_realtime_quote("600519")
+    quote["price"] = 0
+    assert (await service.fetch_realtime_quote("600519"))["price"] == 1800.0
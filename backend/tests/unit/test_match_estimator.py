@@ -0,0 +1,98 @@
+# backend/tests/unit/test_match_estimator.py
+import numpy as np
+import pandas as pd
+import pytest
+from unittest.mock import AsyncMock
+
+from app.engines.condition_expr import compile_conditions
+from app.engines.match_estimator import MatchIndex, match_index_cache
+from app.engines.stock_filter import StockFilter
+from app.schemas.strategy import StrategyConditions
+from app.services.market_snapshot import MarketSnapshot
+
+
+@pytest.fixture
+def frame():
+    rng = np.random.default_rng(11)
+    n = 3000
+    pe = rng.integers(-5, 60, n).astype(float)
+    pe[rng.random(n) < 0.1] = np.nan
+    return pd.DataFrame({
+        "stock_code": [f"{i:06d}" for i in range(n)],
+        "pe": pe,
+        "roe": rng.uniform(-5, 30, n),
+        "ma5": rng.uniform(9, 11, n),
+        "ma20": rng.uniform(9, 11, n),
+    })
+
+
+def test_counts_match_the_compiled_screen(frame):
+    conditions = StrategyConditions(conditions=[
+        {"field": "pe", "operator": "<=", "value": 20},
+        {"field": "pe", "operator": "in", "value": [5, 10, 10]},
+        {"field": "pe", "operator": "!=", "value": 7, "negate": True},
+        {"field": "roe", "operator": "between", "value": [10, 20]},
+        {"field": "ma5", "operator": ">", "value_field": "ma20"},
+        {"logic": "OR", "conditions": [
+            {"field": "roe", "operator": ">", "value": 25},
+            {"field": "pe", "operator": "==", "value": 0},
+        ]},
+    ], logic="OR").conditions
+    index = MatchIndex(frame, "v1")
+
+    result = index.estimate(conditions, "OR")
+
+    for condition, estimate in zip(conditions, result["conditions"]):
+        assert estimate["matches"] == compile_conditions([condition]).mask(frame).sum()
+    assert result["conditions"][0]["known"] == frame["pe"].notna().sum()
+    assert result["matches"] == compile_conditions(conditions, "OR").mask(frame).sum()
+    assert result["selectivity"] == round(result["matches"] / len(frame), 4)
+
+
+@pytest.mark.asyncio
+async def test_index_is_built_once_per_snapshot_version():
+    match_index_cache.clear()
+    rows = [{"stock_code": f"60000{i}", "pe": float(i)} for i in range(5)]
+    stock_filter = StockFilter()
+    stock_filter.data_service.fetch_technical_factors = AsyncMock(return_value=None)
+    stock_filter.data_service.fetch_financial_factors = AsyncMock(return_value=None)
+
+    stock_filter.data_service.fetch_snapshot_view = AsyncMock(return_value=MarketSnapshot(rows, "1"))
+    first = await stock_filter.match_index(apply_risk_filters=False)
+    assert await stock_filter.match_index(apply_risk_filters=False) is first
+    assert first.estimate(StrategyConditions(conditions=[{"field": "pe", "operator": ">=", "value": 3}]).conditions)["matches"] == 2
+
+    stock_filter.data_service.fetch_snapshot_view = AsyncMock(return_value=MarketSnapshot(rows[:2], "2"))
+    second = await stock_filter.match_index(apply_risk_filters=False)
+    assert second is not first and second.size == 2
+
+
+@pytest.mark.asyncio
+async def test_estimate_never_builds_factor_tables():
+    match_index_cache.clear()
+    stock_filter = StockFilter()
+    service = stock_filter.data_service
+    service.fetch_snapshot_view = AsyncMock(return_value=MarketSnapshot(
+        [{"stock_code": "600001", "pe": 8.0}, {"stock_code": "600002", "pe": 30.0}], "1"
+    ))
+    service.fetch_technical_factors = AsyncMock(return_value=None)
+    service.fetch_financial_factors = AsyncMock(return_value=None)
+    conditions = StrategyConditions(conditions=[
+        {"field": "pe", "operator": "<", "value": 10},
+        {"field": "roe", "operator": ">", "value": 15},
+    ]).conditions
+
+    result = (await stock_filter.match_index(apply_risk_filters=False)).estimate(conditions)
+
+    service.fetch_technical_factors.assert_awaited_with(build=False)
+    service.fetch_financial_factors.assert_awaited_with(build=False)
+    assert [c["available"] for c in result["conditions"]] == [True, False]
+    assert result["conditions"][0]["matches"] == 1
+    assert result["matches"] is None and result["unavailable_fields"] == ["roe"]
+
+    # Once the table exists, the next estimate picks it up
+    service.fetch_financial_factors = AsyncMock(return_value=pd.DataFrame(
+        {"stock_code": ["600001"], "roe": [20.0]}
+    ).set_index("stock_code", drop=False))
+    result = (await stock_filter.match_index(apply_risk_filters=False)).estimate(conditions)
+    assert result["matches"] == 1 and result["unavailable_fields"] == []
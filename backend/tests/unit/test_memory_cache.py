@@ -0,0 +1,60 @@
+# backend/tests/unit/test_memory_cache.py
+from app.core.memory_cache import BoundedMemoryCache, namespace_of
+
+
+def _cache(**kwargs):
+    return BoundedMemoryCache(max_bytes=kwargs.pop("max_bytes", 1000), default_ttl=60, **kwargs)
+
+
+def test_namespace_of():
+    assert namespace_of("data:financial:600519:5") == "data:financial"
+    assert namespace_of("data:stock_list") == "data:stock_list"
+
+
+def test_get_respects_max_age_and_counts_hits():
+    cache = _cache()
+    cache.set("data:x:1", {"v": 1})
+    assert cache.get("data:x:1") == {"v": 1}
+    cache._entries["data:x:1"].ts -= 30
+    assert cache.get("data:x:1", max_age=10) is None
+    assert cache.get("data:x:2") is None
+    assert (cache.hits, cache.misses) == (2, 1)
+
+
+def test_expired_entries_are_dropped():
+    cache = _cache()
+    cache.set("data:x:1", "value", ttl=1)
+    cache._entries["data:x:1"].expires_at -= 2
+    assert cache.get("data:x:1") is None
+    assert len(cache) == 0 and cache.total_bytes == 0
+    assert cache.evictions == 1
+
+
+def test_lru_eviction_over_capacity():
+    cache = _cache(max_bytes=300)
+    for i in range(3):
+        cache.set(f"data:x:{i}", "a", size=100)
+    cache.get("data:x:0")  # touch → most recently used
+    cache.set("data:x:3", "a", size=100)
+
+    assert "data:x:1" not in cache
+    assert "data:x:0" in cache and "data:x:3" in cache
+    assert cache.total_bytes == 300
+
+
+def test_namespace_quota_evicts_only_that_namespace():
+    cache = _cache(max_bytes=1000, namespace_quotas={"data:news": 200})
+    cache.set("data:stock_list", "keep", size=100)
+    for i in range(4):
+        cache.set(f"data:news:{i}", "n", size=100)
+
+    stats = cache.stats()
+    assert stats["namespaces"] == {"data:stock_list": 100, "data:news": 200}
+    assert "data:stock_list" in cache
+    assert "data:news:3" in cache and "data:news:0" not in cache
+
+
+def test_oversized_value_is_not_cached():
+    cache = _cache(max_bytes=100)
+    cache.set("data:x:1", "v", size=500)
+    assert len(cache) == 0
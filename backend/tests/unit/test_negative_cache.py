@@ -0,0 +1,76 @@
+# backend/tests/unit/test_negative_cache.py
+import time
+
+import pandas as pd
+import pytest
+from unittest.mock import patch
+
+from app.core.upstream import governor
+from app.services import data_service as data_service_module
+from app.services.data_service import DataService
+from app.services.negative_cache import NegativeCache, negative_cache
+
+
+@pytest.fixture(autouse=True)
+def isolate_caches():
+    negative_cache.clear()
+    yield
+    negative_cache.clear()
+    governor.reset()
+    data_service_module._memory_cache.clear()
+
+
+@pytest.mark.asyncio
+async def test_repeated_misses_promote_to_known_bad():
+    cache = NegativeCache(ttl=60, bad_after=2, bad_ttl=3600)
+
+    await cache.record_miss("financial", "600001")
+    assert await cache.is_negative("financial", "600001")
+    assert cache._local[("financial", "600001")] <= time.time() + 60
+
+    await cache.record_miss("financial", "600001")
+    assert cache._misses[("financial", "600001")] == 2
+    # Known-bad entries outlive the short miss TTL
+    assert cache._local[("financial", "600001")] > time.time() + 60
+
+    await cache.record_hit("financial", "600001")
+    assert not await cache.is_negative("financial", "600001")
+
+
+@pytest.mark.asyncio
+async def test_static_gap_skips_bse_northbound():
+    assert await negative_cache.negatives("northbound_hold", ["830799", "600519"]) == {"830799"}
+    assert not await negative_cache.is_negative("financial", "830799")
+
+
+@pytest.mark.asyncio
+@patch('app.services.data_service.ak.stock_financial_analysis_indicator')
+@patch('app.services.data_service.ak.stock_financial_abstract_ths')
+async def test_empty_financials_are_not_refetched(mock_ths, mock_sina):
+    mock_ths.return_value = pd.DataFrame()
+    mock_sina.return_value = pd.DataFrame()
+    service = DataService()
+    service._redis = False
+
+    assert await service.fetch_financial_data("688999") == []
+    assert await service.fetch_financial_data("688999") == []
+
+    assert mock_ths.call_count == 1
+    assert mock_sina.call_count == 1
+
+
+@pytest.mark.asyncio
+@patch('app.services.data_service.ak.stock_financial_analysis_indicator')
+@patch('app.services.data_service.ak.stock_financial_abstract_ths')
+async def test_transient_errors_are_not_cached(mock_ths, mock_sina):
+    mock_ths.side_effect = ConnectionError("reset by peer")
+    mock_sina.side_effect = ConnectionError("reset by peer")
+    service = DataService()
+    service._redis = False
+
+    assert await service.fetch_financial_data("600519") == []
+    assert not await negative_cache.is_negative("financial", "600519")
+    governor.reset()  # close the breaker the failures opened
+    calls = mock_ths.call_count
+    assert await service.fetch_financial_data("600519") == []
+    assert mock_ths.call_count > calls
@@ -0,0 +1,74 @@
+# backend/tests/unit/test_northbound_holdings.py
+import pandas as pd
+import pytest
+from unittest.mock import AsyncMock, patch
+
+from app.engines.strategies.shareholder_increase import ShareholderIncreaseStrategy
+from app.services import data_service as data_service_module
+from app.services.data_service import DataService
+from app.services.northbound_holdings import NorthboundHoldingTable, holdings_frame, northbound_holder
+
+
+@pytest.fixture(autouse=True)
+def isolate_holdings():
+    northbound_holder.clear()
+    yield
+    northbound_holder.clear()
+    data_service_module.upstream.governor.reset()
+
+
+def _ranking():
+    return pd.DataFrame({
+        "序号": [1, 2, 3],
+        "代码": ["600519", "000001", "300750"],
+        "名称": ["贵州茅台", "平安银行", "宁德时代"],
+        "今日持股-股数": [7000.0, 30000.0, 15000.0],
+        "今日持股-市值": [1.2e7, 3.3e5, 2.9e6],
+        "今日持股-占流通股比": [5.6, 1.5, 3.6],
+        "今日持股-占总股本比": [5.6, 1.5, 3.4],
+        "今日增持估计-股数": [12.5, -40.0, 300.0],
+        "今日增持估计-市值": [2.1e4, -4.4e2, 5.8e4],
+        "日期": ["2026-10-15"] * 3,
+    })
+
+
+@pytest.mark.asyncio
+@patch('app.services.data_service.ak.stock_hsgt_hold_stock_em')
+async def test_holdings_served_from_one_market_wide_call(mock_rank):
+    mock_rank.return_value = _ranking()
+    service = DataService()
+    service._redis = False
+
+    holding = await service.fetch_northbound_stock_holding("600519")
+    assert holding["date"] == "2026-10-15"
+    assert holding["hold_shares"] == 70_000_000
+    assert holding["change_shares"] == 125_000
+    assert (await service.fetch_northbound_stock_holding("000001"))["change_shares"] < 0
+    assert await service.fetch_northbound_stock_holding("830799") == {}
+    assert mock_rank.call_count == 1
+
+
+@pytest.mark.asyncio
+async def test_strategy_only_checks_klines_for_net_increases():
+    table = NorthboundHoldingTable.from_frame(holdings_frame(_ranking()), "2026-10-15")
+    strategy = ShareholderIncreaseStrategy()
+    strategy.filter_engine.apply_filter = AsyncMock(return_value=[
+        {"stock_code": code, "stock_name": "x", "pe": 12.0, "market_cap": 5e10}
+        for code in ("600519", "000001", "300750", "601318")
+    ])
+    strategy.data_service.fetch_northbound_holding_table = AsyncMock(return_value=table)
+    requested = []
+
+    async def fake_klines(codes, period, days):
+        requested.extend(codes)
+        for code in codes:
+            yield code, [{"close": 100.0 - i} for i in range(60)]  # falling: now at the 60d low
+
+    strategy.data_service.fetch_kline_batch = fake_klines
+
+    results = await strategy.execute()
+
+    assert sorted(requested) == ["300750", "600519"]
+    assert {r["stock_code"] for r in results} == {"300750", "600519"}
+    assert all(r["low_position_increase"] for r in results)
+    assert "change_shares" not in results[0]
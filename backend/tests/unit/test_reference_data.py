@@ -0,0 +1,81 @@
+# backend/tests/unit/test_reference_data.py
+import asyncio
+
+import pandas as pd
+import pytest
+from unittest.mock import AsyncMock, patch
+
+from app.core.upstream import governor
+from app.engines.risk_filter import RiskFilter
+from app.services import reference_data as reference_module
+from app.services.reference_data import ReferenceData, ReferenceRegistry, reference_registry
+
+
+STOCKS = [
+    {"stock_code": "600519", "stock_name": "贵州茅台", "list_date": "2001-08-27"},
+    {"stock_code": "300750", "stock_name": "宁德时代", "list_date": "2018-06-11"},
+    {"stock_code": "000004", "stock_name": "*ST国华", "list_date": "1991-01-14"},
+]
+MEMBERSHIPS = {"酿酒行业": ["600519"], "电池": ["300750"]}
+
+
+@pytest.fixture(autouse=True)
+def isolate_registry():
+    reference_registry.clear()
+    yield
+    reference_registry.clear()
+    governor.reset()
+
+
+def test_indices_and_metadata():
+    ref = ReferenceData(STOCKS, MEMBERSHIPS, built_at=0)
+
+    assert ref.industry_of("300750") == "电池"
+    assert ref.constituents("酿酒行业") == ["600519"]
+    assert ref.industries() == ["电池", "酿酒行业"]
+    assert ref.codes_in(["电池", "不存在"]) == {"300750"}
+    assert ref.info("300750")["board"] == "chinext"
+    assert ref.info("600519")["industry"] == "酿酒行业"
+    assert ref.is_st("000004") and not ref.is_st("600519")
+    assert ReferenceData.from_payload(ref.to_payload()).industry_of("600519") == "酿酒行业"
+
+
+@pytest.mark.asyncio
+async def test_registry_builds_once_from_upstream():
+    registry = ReferenceRegistry()
+
+    def sz_listing():
+        return pd.DataFrame({"A股代码": ["300750"], "A股简称": ["宁德时代"], "A股上市日期": ["2018-06-11"]})
+
+    async def fake_call(func, **kwargs):
+        if func.__name__ == "stock_board_industry_name_em":
+            return pd.DataFrame({"板块名称": list(MEMBERSHIPS)})
+        if func.__name__ == "stock_board_industry_cons_em":
+            return pd.DataFrame({"代码": MEMBERSHIPS[kwargs["symbol"]]})
+        return func(**kwargs)
+
+    with patch.object(reference_module.upstream, "call", new=AsyncMock(side_effect=fake_call)) as mock_call, \
+            patch.object(reference_module, "_LISTINGS", [(sz_listing, {}, "A股代码", "A股简称", "A股上市日期")]), \
+            patch.object(ReferenceRegistry, "_read_shared", new=AsyncMock(return_value=None)), \
+            patch.object(ReferenceRegistry, "_write_shared", new=AsyncMock()) as mock_write:
+        first, second = await asyncio.gather(registry.get(), registry.get())
+        third = await registry.get()
+
+    assert first is second is third
+    assert first.industry_of("600519") == "酿酒行业"
+    assert first.info("300750")["list_date"] == "2018-06-11"
+    # 1 listing + 1 board list + 2 constituent calls, all from a single build
+    assert mock_call.await_count == 4
+    mock_write.assert_awaited_once()
+
+
+@pytest.mark.asyncio
+async def test_risk_filter_uses_registry_for_industries():
+    reference_registry.publish(ReferenceData(STOCKS, MEMBERSHIPS, built_at=0))
+    risk_filter = RiskFilter()
+    risk_filter.set_industry_filter(exclude=["电池"])
+
+    df = pd.DataFrame([{"stock_code": "600519"}, {"stock_code": "300750"}, {"stock_code": "000004"}])
+    result = await risk_filter._filter_by_industry(df)
+
+    assert result["stock_code"].tolist() == ["600519", "000004"]
@@ -0,0 +1,105 @@
+# backend/tests/unit/test_singleflight.py
+import asyncio
+import threading
+import time
+from datetime import date
+
+import pandas as pd
+import pytest
+from unittest.mock import patch
+
+from app.services import data_service as data_service_module
+from app.services.data_service import DataService
+from app.services.kline_store import KlineStore
+from app.utils.singleflight import SingleFlight
+
+
+@pytest.fixture(autouse=True)
+def isolate_memory_cache():
+    yield
+    data_service_module._memory_cache.clear()
+    data_service_module.negative_cache.clear()
+    data_service_module.upstream.governor.reset()
+
+
+@pytest.mark.asyncio
+async def test_concurrent_callers_share_one_call():
+    flight = SingleFlight()
+    calls = 0
+
+    async def load():
+        nonlocal calls
+        calls += 1
+        await asyncio.sleep(0.01)
+        return {"value": 42}
+
+    results = await asyncio.gather(*(flight.do("k", load) for _ in range(10)))
+
+    assert calls == 1
+    assert all(r == {"value": 42} for r in results)
+    assert not flight.in_flight("k")
+
+
+@pytest.mark.asyncio
+async def test_errors_fan_out_and_next_call_retries():
+    flight = SingleFlight()
+    calls = 0
+
+    async def boom():
+        nonlocal calls
+        calls += 1
+        await asyncio.sleep(0.01)
+        raise ValueError("upstream down")
+
+    results = await asyncio.gather(*(flight.do("k", boom) for _ in range(3)), return_exceptions=True)
+    assert calls == 1
+    assert all(isinstance(r, ValueError) for r in results)
+
+    # The failed call is not memoized
+    with pytest.raises(ValueError):
+        await flight.do("k", boom)
+    assert calls == 2
+
+
+@pytest.mark.asyncio
+async def test_cancelled_waiter_does_not_cancel_shared_call():
+    flight = SingleFlight()
+
+    async def load():
+        await asyncio.sleep(0.02)
+        return "ok"
+
+    first = asyncio.ensure_future(flight.do("k", load))
+    second = asyncio.ensure_future(flight.do("k", load))
+    await asyncio.sleep(0)
+    first.cancel()
+
+    assert await second == "ok"
+
+
+@pytest.mark.asyncio
+@patch('app.services.data_service.ak.stock_zh_a_daily', return_value=pd.DataFrame())
+@patch('app.services.data_service.ak.stock_zh_a_hist')
+async def test_fetch_kline_data_coalesces_upstream_calls(mock_hist, _mock_factors, tmp_path, monkeypatch):
+    monkeypatch.setattr(data_service_module, "kline_store", KlineStore(str(tmp_path)))
+    calls = []
+    lock = threading.Lock()
+
+    def slow_hist(**kwargs):
+        with lock:
+            calls.append(kwargs["symbol"])
+        time.sleep(0.05)
+        return pd.DataFrame({
+            '日期': [date.today().isoformat()], '开盘': [10.0], '最高': [10.5], '最低': [9.8],
+            '收盘': [10.2], '成交量': [1000], '成交额': [10200.0],
+        })
+
+    mock_hist.side_effect = slow_hist
+    service = DataService()
+    service._redis = False
+
+    results = await asyncio.gather(*(service.fetch_kline_data("600519", days=60) for _ in range(5)))
+
+    assert calls == ["600519"]
+    assert all(r == results[0] for r in results)
+    assert results[0][0]["close"] == 10.2
@@ -0,0 +1,106 @@
+# backend/tests/unit/test_strategy_pipeline.py
+import pandas as pd
+import pytest
+from unittest.mock import AsyncMock
+
+from app.engines.strategies.buffett import BuffettStrategy
+from app.engines.strategies.peg import PEGStrategy
+from app.engines.strategies.rs_momentum import RSMomentumStrategy
+from app.engines.strategy_pipeline import FINANCIAL, KLINE, PipelineStrategy
+
+
+class _Both(PipelineStrategy):
+    top_k = 3
+
+    def series(self, p):
+        return {KLINE: 30, FINANCIAL: 2}
+
+    def score(self, stock, data, p):
+        if data[FINANCIAL] is None:
+            return None
+        return {"score": float(data[KLINE]["close"].iloc[-1]) + data[FINANCIAL][0]["roe"]}
+
+
+def _batches(strategy, calls):
+    async def klines(codes, period, days):
+        calls.append((KLINE, list(codes), days))
+        for code in codes:
+            yield code, [{"close": 1.0}, {"close": float(int(code) % 10)}]
+
+    async def financials(codes, years):
+        calls.append((FINANCIAL, list(codes), years))
+        for code in codes:
+            yield code, None if code.endswith("0") else [{"roe": 1.0}]
+
+    strategy.data_service.fetch_kline_batch = klines
+    strategy.data_service.fetch_financial_batch = financials
+
+
+@pytest.mark.asyncio
+async def test_one_batch_per_dataset_over_every_candidate():
+    strategy = _Both()
+    snapshot = [{"stock_code": f"{600000 + i}", "stock_name": "x", "price": 10.0} for i in range(500)]
+    strategy.data_service.fetch_market_snapshot = AsyncMock(return_value=snapshot)
+    calls = []
+    _batches(strategy, calls)
+
+    results = await strategy.execute()
+
+    assert sorted((name, len(codes)) for name, codes, _ in calls) == [(FINANCIAL, 500), (KLINE, 500)]
+    assert [r["score"] for r in results] == [10.0, 10.0, 10.0]
+    assert all(r["stock_code"].endswith("9") for r in results)
+
+
+@pytest.mark.asyncio
+async def test_frame_scoring_and_ascending_rank():
+    strategy = RSMomentumStrategy()
+    strategy.filter_engine.apply_filter = AsyncMock(return_value=[
+        {"stock_code": f"{i:06d}", "change_60d": 20.0 + i % 40, "change_ytd": 5.0, "volume_ratio": 1.0}
+        for i in range(400)
+    ])
+    results = await strategy.execute()
+    assert len(results) == 50
+    assert results[0]["score"] >= results[-1]["score"]
+    assert all(r["risk_level"] == ("high" if r["change_60d"] > 50 else "medium") for r in results)
+
+    peg = PEGStrategy()
+    peg.filter_engine.apply_filter = AsyncMock(return_value=[
+        {"stock_code": "600001", "pe": 10.0}, {"stock_code": "600002", "pe": 5.0},
+    ])
+    peg.data_service.fetch_financial_factors = AsyncMock(return_value=_factors({
+        "600001": {"net_profit_growth": 25.0, "roe": 15.0},
+        "600002": {"net_profit_growth": 25.0, "roe": 15.0},
+    }))
+    results = await peg.execute()
+    assert [r["stock_code"] for r in results] == ["600002", "600001"]
+    assert results[0]["peg"] == 0.2
+
+
+def _factors(rows):
+    frame = pd.DataFrame.from_dict(rows, orient="index")
+    frame.index.name = "stock_code"
+    return frame
+
+
+@pytest.mark.asyncio
+async def test_financial_history_only_for_table_prefiltered_candidates():
+    strategy = BuffettStrategy()
+    strategy.filter_engine.apply_filter = AsyncMock(return_value=[
+        {"stock_code": f"{600000 + i}", "pe": 10.0, "market_cap": 2e10} for i in range(1000)
+    ])
+    # Only every 100th stock has a high ROE in the latest reports
+    strategy.data_service.fetch_financial_factors = AsyncMock(return_value=_factors({
+        f"{600000 + i}": {"roe": 20.0 if i % 100 == 0 else 5.0, "debt_ratio": 30.0} for i in range(1000)
+    }))
+    calls = []
+
+    async def financials(codes, years):
+        calls.append(list(codes))
+        for code in codes:
+            yield code, [{"roe": 20.0, "debt_ratio": 30.0}] * 4
+
+    strategy.data_service.fetch_financial_batch = financials
+
+    results = await strategy.execute()
+    assert [len(codes) for codes in calls] == [10]
+    assert len(results) == 10 and all(r["roe"] == 20.0 for r in results)
@@ -0,0 +1,90 @@
+# backend/tests/unit/test_technical_factors.py
+from datetime import date, timedelta
+
+import numpy as np
+import pandas as pd
+import pytest
+from unittest.mock import AsyncMock, patch
+
+from app.engines.stock_filter import StockFilter
+from app.schemas.strategy import ConditionOperator, FilterCondition
+from app.services import data_service as data_service_module
+from app.services.data_service import DataService
+from app.services.factor_store import FactorStore
+from app.services.kline_store import KlineStore, bars_from_frame
+from app.utils import indicators
+
+
+def _frame(closes):
+    end = date.today() - timedelta(days=1)
+    days = [end - timedelta(days=len(closes) - 1 - i) for i in range(len(closes))]
+    return pd.DataFrame({
+        '日期': [d.isoformat() for d in days],
+        '开盘': closes, '最高': closes, '最低': closes, '收盘': closes,
+        '成交量': [100] * len(days), '成交额': [1000.0] * len(days),
+    })
+
+
+@pytest.fixture
+def stores(tmp_path):
+    kline = KlineStore(str(tmp_path / "kline"))
+    factors = FactorStore(str(tmp_path / "factors"))
+    with patch.object(data_service_module, "kline_store", kline), \
+            patch.object(data_service_module, "factor_store", factors):
+        yield kline
+
+
+def test_technical_fields_are_filterable():
+    condition = FilterCondition(field="rsi", operator=ConditionOperator.LT, value=30)
+    assert condition.field == "rsi"
+    with pytest.raises(ValueError):
+        FilterCondition(field="rsi_99", operator=ConditionOperator.LT, value=30)
+
+
+@pytest.mark.asyncio
+async def test_factor_table_built_from_store_feeds_filters(stores):
+    rising = list(np.linspace(10, 20, 120))
+    falling = list(np.linspace(20, 10, 120))
+    start = date.today() - timedelta(days=400)
+    stores.write("600001", "1d", bars_from_frame(_frame(rising)), start)
+    stores.write("600002", "1d", bars_from_frame(_frame(falling)), start)
+
+    service = DataService()
+    service.get_all_stock_codes = AsyncMock(return_value=["600001", "600002", "600003"])
+    meta = await service.sync_technical_factors(sync=False)
+    assert meta["rows"] == 2
+    assert meta["trade_date"] == (date.today() - timedelta(days=1)).isoformat()
+
+    table = await service.fetch_technical_factors()
+    assert table.loc["600001", "ma5"] == pytest.approx(np.mean(rising[-5:]))
+    assert table.loc["600002", "rsi"] == pytest.approx(
+        indicators.calculate_rsi(pd.Series(falling), [14])["rsi14"].iloc[-1]
+    )
+
+    stock_filter = StockFilter()
+    stock_filter.data_service = service
+    service.fetch_market_snapshot = AsyncMock(return_value=[
+        {"stock_code": code, "price": 10.0} for code in ("600001", "600002", "600003")
+    ])
+    result = await stock_filter.apply_filter(
+        [FilterCondition(field="ma5", operator=ConditionOperator.GT, value=15)], apply_risk_filters=False
+    )
+    assert [r["stock_code"] for r in result] == ["600001"]
+
+
+@pytest.mark.asyncio
+async def test_empty_store_builds_an_empty_table(stores):
+    service = DataService()
+    service.get_all_stock_codes = AsyncMock(return_value=["600001", "600002"])
+
+    table = await service.fetch_technical_factors()
+    assert table is not None and table.empty
+    assert data_service_module.factor_store.meta("technical")["trade_date"] is None
+
+    stock_filter = StockFilter()
+    stock_filter.data_service = service
+    service.fetch_market_snapshot = AsyncMock(return_value=[{"stock_code": "600001", "price": 10.0}])
+    result = await stock_filter.apply_filter(
+        [FilterCondition(field="rsi", operator=ConditionOperator.LT, value=30)], apply_risk_filters=False
+    )
+    assert result == []
@@ -0,0 +1,172 @@
+# backend/tests/unit/test_upstream.py
+import asyncio
+import time
+
+import pytest
+
+from app.core.upstream import (
+    CircuitOpenError,
+    UpstreamGovernor,
+    UpstreamPolicy,
+    family_of,
+)
+from app.utils.retry import RetryBudget, retry_on_failure
+
+
+def _governor(**policy) -> UpstreamGovernor:
+    defaults = dict(rate=1000, burst=1000, max_concurrency=4, failure_threshold=2, reset_timeout=60, max_retries=0)
+    defaults.update(policy)
+    governor = UpstreamGovernor({"default": UpstreamPolicy(**defaults)})
+    governor._redis_down_until = float("inf")  # local limits only
+    return governor
+
+
+def stock_zh_a_hist():
+    pass
+
+
+def test_family_of():
+    assert family_of(stock_zh_a_hist) == "eastmoney"
+    assert family_of(lambda: None) == "default"
+
+
+@pytest.mark.asyncio
+async def test_circuit_opens_and_fails_fast():
+    governor = _governor()
+    calls = 0
+
+    def down():
+        nonlocal calls
+        calls += 1
+        raise ConnectionError("refused")
+
+    for _ in range(2):
+        with pytest.raises(ConnectionError):
+            await governor.call(down)
+    with pytest.raises(CircuitOpenError):
+        await governor.call(down)
+    assert calls == 2
+
+
+@pytest.mark.asyncio
+async def test_symbol_errors_do_not_trip_the_breaker():
+    governor = _governor()
+
+    def bad_symbol():
+        raise KeyError("代码")
+
+    for _ in range(5):
+        with pytest.raises(KeyError):
+            await governor.call(bad_symbol)
+    assert governor.family("default").breaker.state == "closed"
+
+
+@pytest.mark.asyncio
+async def test_cancelled_calls_do_not_trip_the_breaker():
+    governor = _governor()
+    family = governor.family("default")
+
+    for _ in range(3):
+        task = asyncio.ensure_future(governor.call(time.sleep, 0.2))
+        await asyncio.sleep(0.05)
+        task.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await task
+    assert family.breaker.state == "closed"
+    assert family.limiter._for_loop().in_flight == 0
+
+
+def _half_open(family):
+    family.breaker.state = "open"
+    family.breaker.opened_at = time.monotonic() - family.breaker.reset_timeout
+
+
+@pytest.mark.asyncio
+async def test_probe_rejected_before_calling_is_released():
+    governor = _governor()
+    family = governor.family("default")
+    _half_open(family)
+
+    async def shared_circuit_open(_family):
+        raise CircuitOpenError("open (shared)")
+
+    take_token = governor._take_token
+    governor._take_token = shared_circuit_open
+    with pytest.raises(CircuitOpenError):
+        await governor.call(lambda: "ok")
+    assert family.breaker.state == "half_open"
+
+    governor._take_token = take_token
+    assert await governor.call(lambda: "ok") == "ok"
+    assert family.breaker.state == "closed"
+
+
+@pytest.mark.asyncio
+async def test_cancelled_probe_is_released():
+    governor = _governor()
+    family = governor.family("default")
+    _half_open(family)
+
+    task = asyncio.ensure_future(governor.call(time.sleep, 0.2))
+    await asyncio.sleep(0.05)
+    task.cancel()
+    with pytest.raises(asyncio.CancelledError):
+        await task
+
+    assert await governor.call(lambda: "ok") == "ok"
+    assert family.breaker.state == "closed"
+
+
+@pytest.mark.asyncio
+async def test_concurrency_backs_off_on_errors_and_caps_in_flight():
+    governor = _governor(failure_threshold=100)
+    limiter = governor.family("default").limiter
+
+    with pytest.raises(TimeoutError):
+        await governor.call(lambda: (_ for _ in ()).throw(TimeoutError()))
+    assert limiter.limit == 2
+
+    running = peak = 0
+
+    def work():
+        nonlocal running, peak
+        running += 1
+        peak = max(peak, running)
+        import time
+        time.sleep(0.02)
+        running -= 1
+
+    await asyncio.gather(*(governor.call(work) for _ in range(8)))
+    assert peak <= 3
+
+
+@pytest.mark.asyncio
+async def test_transient_errors_are_retried():
+    governor = _governor(max_retries=2)
+    attempts = 0
+
+    def flaky():
+        nonlocal attempts
+        attempts += 1
+        if attempts < 2:
+            raise ConnectionResetError()
+        return "ok"
+
+    assert await governor.call(flaky) == "ok"
+    assert attempts == 2
+
+
+@pytest.mark.asyncio
+async def test_retry_decorator_respects_budget():
+    budget = RetryBudget(ratio=0, min_retries=1)
+    attempts = 0
+
+    @retry_on_failure(max_retries=5, delay=0.001, budget=budget)
+    async def always_fails():
+        nonlocal attempts
+        attempts += 1
+        raise ValueError("boom")
+
+    with pytest.raises(ValueError):
+        await always_fails()
+    assert attempts == 2
@@ -7,6 +7,23 @@ export interface UserStrategyPayload {
   conditions: Record<string, any>
 }
 
+export interface StrategyEstimate {
+  version: string
+  universe: number
+  logic: 'AND' | 'OR'
+  matches: number | null
+  selectivity: number | null
+  conditions: {
+    condition: Record<string, any>
+    matches: number | null
+    known: number | null
+    selectivity: number | null
+    available: boolean
+  }[]
+  // Fields whose factor table is not built yet (their conditions are not counted)
+  unavailable_fields: string[]
+}
+
 export const strategyApi = {
   execute: (params: {
     strategy_type: string
@@ -15,6 +32,15 @@ export const strategyApi = {
   }): Promise<ApiResponse<Stock[]>> =>
     api.post('/strategies/execute', params),
 
+  // Match counts for a condition set (per condition + combined), without executing it
+  estimate: (params: {
+    conditions: Record<string, any>
+    apply_risk_filters?: boolean
+    include_industries?: string[]
+    exclude_industries?: string[]
+  }): Promise<ApiResponse<StrategyEstimate>> =>
+    api.post('/strategies/estimate', params),
+
   parse: (description: string): Promise<ApiResponse<{ conditions: Record<string, any> }>> =>
     api.post('/strategies/parse', { description }),
 